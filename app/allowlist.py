@@ -0,0 +1,82 @@
+SUFFIX_RULE_PREFIX = "*."
+
+
+class Allowlist:
+    """
+    Sites that must never be blocked, as exact names or whole domains.
+
+    A rule written as '*.example.com' allows example.com and every subdomain
+    of it; any other rule allows just that name. Suffix rules are kept in a
+    set and matched by walking the parent domains of a site, so a lookup
+    costs one set probe per label no matter how many rules there are.
+    """
+
+    def __init__(self, exact=(), suffix=()):
+        self.exact = set(exact)
+        self.suffix = set(suffix)
+
+    def __len__(self):
+        return len(self.exact) + len(self.suffix)
+
+    def __bool__(self):
+        return bool(self.exact or self.suffix)
+
+    @staticmethod
+    def parse_rule(rule: str):
+        """
+        Splits a rule into its name and whether it covers subdomains.
+
+        Returns:
+            tuple: (name, is_suffix_rule)
+        """
+        if rule.startswith(SUFFIX_RULE_PREFIX):
+            return rule[len(SUFFIX_RULE_PREFIX):], True
+        return rule, False
+
+    def add(self, rule: str):
+        name, suffix = self.parse_rule(rule)
+        (self.suffix if suffix else self.exact).add(name)
+
+    def remove(self, rule: str) -> bool:
+        """Drops a rule, returning whether it was present."""
+        name, suffix = self.parse_rule(rule)
+        rules = self.suffix if suffix else self.exact
+        if name not in rules:
+            return False
+        rules.discard(name)
+        return True
+
+    def rules(self):
+        """Returns every rule in the form it was added, sorted."""
+        return sorted(
+            [*self.exact, *(f"{SUFFIX_RULE_PREFIX}{name}" for name in self.suffix)]
+        )
+
+    def allows(self, site: str) -> bool:
+        if site in self.exact:
+            return True
+        suffix = self.suffix
+        if not suffix:
+            return False
+        if site in suffix:
+            return True
+        dot = site.find(".")
+        while dot != -1:
+            if site[dot + 1:] in suffix:
+                return True
+            dot = site.find(".", dot + 1)
+        return False
+
+    def blockable(self, sites):
+        """Yields the sites no rule allows, keeping their order."""
+        if not self:
+            return iter(sites)
+        allows = self.allows
+        return (site for site in sites if not allows(site))
+
+    def to_state(self) -> dict:
+        return {"exact": sorted(self.exact), "suffix": sorted(self.suffix)}
+
+    @classmethod
+    def from_state(cls, state: dict):
+        return cls(state.get("exact", ()), state.get("suffix", ()))
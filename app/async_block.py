@@ -0,0 +1,191 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from block import BlockingManager
+
+
+class _WriteRequest(NamedTuple):
+    add: tuple[str, ...]
+    remove: tuple[str, ...]
+    duration: int
+    future: asyncio.Future
+
+
+class AsyncBlockingManager:
+    """
+    An asyncio front end to a BlockingManager, for embedding in async services.
+
+    Hosts file I/O runs on a dedicated single-thread executor, so the event
+    loop never waits on the disk or the inter-process lock. Writes go
+    through a queue drained by one writer task: every request queued while
+    the previous write was running is merged into the next one, so many
+    concurrent blocks and unblocks cost a single hosts write. Reads are
+    served from the manager's in-memory snapshot.
+
+    Parsing, locking and state all stay in the wrapped BlockingManager.
+    """
+
+    def __init__(self, blocking_manager, executor=None):
+        self.blocking_manager = blocking_manager
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="blanc-all-io"
+        )
+        self._owns_executor = executor is None
+        self._queue = None
+        self._writer = None
+
+    @classmethod
+    async def open(cls, hosts_path, executor=None, **options):
+        """
+        Loads a hosts file without blocking the event loop.
+
+        Args:
+            hosts_path (str): The hosts file.
+            executor (concurrent.futures.Executor, optional): Runs the file
+                I/O; defaults to a dedicated single thread.
+            **options: Passed on to BlockingManager.
+        """
+        manager = cls(None, executor)
+        loop = asyncio.get_running_loop()
+        manager.blocking_manager = await loop.run_in_executor(
+            manager._executor, lambda: BlockingManager(hosts_path, **options)
+        )
+        return manager
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Finishes the queued writes and releases the executor."""
+        if self._writer is not None:
+            self._queue.put_nowait(None)
+            await self._writer
+            self._writer = None
+        if self._owns_executor:
+            await asyncio.get_running_loop().run_in_executor(
+                None, self._executor.shutdown
+            )
+
+    def _submit(self, add=(), remove=(), duration=0):
+        if self._writer is None:
+            self._queue = asyncio.Queue()
+            self._writer = asyncio.create_task(self._write_batches())
+        future = asyncio.get_running_loop().create_future()
+        request = _WriteRequest(tuple(add), tuple(remove), duration, future)
+        self._queue.put_nowait(request)
+        return future
+
+    async def _write_batches(self):
+        loop = asyncio.get_running_loop()
+        queue = self._queue
+        closing = False
+        while not closing:
+            batch = [await queue.get()]
+            while not queue.empty():
+                batch.append(queue.get_nowait())
+            closing = None in batch
+            batch = [request for request in batch if request is not None]
+            if not batch:
+                continue
+            try:
+                added, removed, failed = await loop.run_in_executor(
+                    self._executor, self._apply_batch, batch
+                )
+            except Exception as e:
+                for request in batch:
+                    if not request.future.done():
+                        request.future.set_exception(e)
+                continue
+            for request in batch:
+                if request.future.done():
+                    continue
+                if failed.intersection(request.add) or failed.intersection(
+                    request.remove
+                ):
+                    request.future.set_result(None)
+                    continue
+                request.future.set_result(
+                    (
+                        [site for site in request.add if site in added],
+                        {site for site in request.remove if site in removed},
+                    )
+                )
+
+    def _apply_batch(self, batch):
+        """
+        Merges queued requests into as few hosts writes as possible.
+
+        A later request for a site overrides an earlier one. Blocks for
+        different durations need one write each; the first also carries
+        every unblock.
+
+        Returns:
+            tuple: (added sites, removed sites, sites of failed writes)
+        """
+        changes = {}  # {site: duration to block for, or None to unblock}
+        for request in batch:
+            for site in request.remove:
+                changes[site] = None
+            for site in request.add:
+                changes[site] = request.duration
+        remove = [site for site, duration in changes.items() if duration is None]
+        by_duration = {}
+        for site, duration in changes.items():
+            if duration is not None:
+                by_duration.setdefault(duration, []).append(site)
+        writes = list(by_duration.items()) or [(0, [])]
+        added, removed, failed = set(), set(), set()
+        for index, (duration, add) in enumerate(writes):
+            write_remove = remove if index == 0 else []
+            result = self.blocking_manager.apply_changes(add, write_remove, duration)
+            if result is None:
+                failed.update(add, write_remove)
+            else:
+                added.update(result[0])
+                removed.update(result[1])
+        return added, removed, failed
+
+    async def block(self, site, duration=0):
+        """
+        Blocks a site, sharing the hosts write with concurrent requests.
+
+        Returns:
+            tuple or None: The (added, removed) sites of this request, or None
+            if the hosts file could not be written.
+        """
+        return await self._submit(add=[site], duration=duration)
+
+    async def unblock(self, site):
+        return await self._submit(remove=[site])
+
+    async def block_many(self, sites, duration=0):
+        return await self._submit(add=sites, duration=duration)
+
+    async def unblock_many(self, sites):
+        return await self._submit(remove=sites)
+
+    async def apply_changes(self, add=(), remove=()):
+        return await self._submit(add=add, remove=remove)
+
+    async def contains(self, site) -> bool:
+        return self.blocking_manager.contains(site)
+
+    async def count(self) -> int:
+        return self.blocking_manager.count()
+
+    async def list_blocked(self, prefix=None, offset=0, limit=None, sort=False):
+        """
+        Returns a page of the blocked sites, see BlockingManager.iter_blocked.
+
+        The page is collected on a worker thread, since the first sorted page
+        of a snapshot sorts every site.
+        """
+        return await asyncio.to_thread(
+            lambda: list(
+                self.blocking_manager.iter_blocked(prefix, offset, limit, sort)
+            )
+        )
@@ -1,63 +1,1237 @@
-from utils import extract_blocked_site
+import datetime
+import functools
+import hashlib
+import itertools
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from types import MappingProxyType
+
+from allowlist import Allowlist
+from events import ADDED
+from events import EXPIRED
+from events import LOADED
+from events import RELOADED
+from events import REMOVED
+from events import EventHub
+from provenance import MANUAL
+from provenance import SCHEDULE_PREFIX
+from provenance import SUBSCRIPTION_PREFIX
+from provenance import SourceRefs
+from redirect import DEFAULT_REDIRECT
+from redirect import resolve_redirect
+from schedule import GROUP_PREFIX
+from schedule import Scheduler
+from schedule import make_rule
+from utils import BLOCK_MARKER
+from utils import parse_blocked_sites
+from utils import parse_hosts
+
+try:
+    import msvcrt
+except ImportError:
+    msvcrt = None
+    import fcntl
+
+BLOCK_COMMENT = f"# {BLOCK_MARKER}"
+STATE_FILE_NAME = "blanc-all.json"
+SUBSCRIPTIONS_DIR_NAME = "subscriptions"
+LOCK_TIMEOUT = 5.0
+LOCK_RETRY_INTERVAL = 0.01
+# A write landing in the same mtime tick as the last stamp can go unnoticed,
+# so stamps this recent are confirmed against the content hash.
+RACY_WINDOW = 2.0
+# Characters of the hosts file parsed per batch by a background load
+LOAD_BATCH_SIZE = 1 << 18
+# Upper bound on a single scheduler sleep, so wall clock jumps (suspend,
+# clock changes) are noticed without polling every minute.
+MAX_SCHEDULE_SLEEP = 300.0
+
+
+def _try_lock(lock_file):
+    if msvcrt:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_NBLCK, 1)
+    else:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+
+def _unlock(lock_file):
+    if msvcrt:
+        lock_file.seek(0)
+        msvcrt.locking(lock_file.fileno(), msvcrt.LK_UNLCK, 1)
+    else:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
+
+
+def _file_version(file):
+    stat = os.fstat(file.fileno())
+    return stat.st_mtime_ns, stat.st_size
+
+
+def _blocked_among(content, start, sites):
+    """
+    Returns which of the given sites hosts content from `start`, a line
+    start, blocks.
+
+    The content is scanned once for the sites as words; only the lines
+    mentioning one are parsed, so the content a background load has yet
+    to reach can be checked without parsing it.
+    """
+    text = content[start:]
+    present = set(sites).intersection(text.replace("#", " ").split())
+    if not present:
+        return set()
+    blocked = set()
+    for line in text.splitlines():
+        if not present.isdisjoint(line.replace("#", " ").split()):
+            blocked.update(present.intersection(parse_blocked_sites(line)))
+    return blocked
+
+
+_MISSING = object()
+
+
+def _merge_state(base, ours, theirs):
+    """
+    Three-way merges a value of the state file.
+
+    Whichever side changed a value since `base` wins; when both did, dicts
+    merge key by key and lists keep the other side's items plus the items
+    this side added, minus the ones it removed. Otherwise this side wins.
+    """
+    if ours == base:
+        return theirs
+    if theirs == base or ours is _MISSING or theirs is _MISSING:
+        return ours
+    if isinstance(ours, dict) and isinstance(theirs, dict):
+        base = base if isinstance(base, dict) else {}
+        merged = {}
+        for key in [*theirs, *(key for key in ours if key not in theirs)]:
+            value = _merge_state(
+                base.get(key, _MISSING),
+                ours.get(key, _MISSING),
+                theirs.get(key, _MISSING),
+            )
+            if value is not _MISSING:
+                merged[key] = value
+        return merged
+    if isinstance(ours, list) and isinstance(theirs, list):
+        base = base if isinstance(base, list) else []
+
+        def identity(item):
+            return json.dumps(item, sort_keys=True)
+
+        base_items = {identity(item) for item in base}
+        ours_items = {identity(item) for item in ours}
+        removed = base_items - ours_items
+        merged = [item for item in theirs if identity(item) not in removed]
+        seen = {identity(item) for item in merged}
+        merged.extend(
+            item
+            for item in ours
+            if identity(item) not in base_items and identity(item) not in seen
+        )
+        return merged
+    return ours
+
+
+def _synchronized(method):
+    """
+    Runs a method under the manager's writer lock, once the blocked sites
+    are fully loaded.
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        self._loaded.wait()
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _synchronized_while_loading(method):
+    """Runs a method under the writer lock, even during a background load."""
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._write_lock:
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def _remove_sites(content, sites):
+    """
+    Drops the given names from the block entries of a hosts file.
+
+    Untouched lines are copied verbatim; a line blocking several names
+    keeps the ones not being removed.
+    """
+    pieces = []
+    position = 0
+    for entry in parse_hosts(content):
+        if sites.isdisjoint(entry.names) or not entry.is_block():
+            continue
+        start, end = entry.span
+        pieces.append(content[position:start])
+        position = end
+        names = [name for name in entry.names if name not in sites]
+        if names:
+            line = content[start:end]
+            ending = line[len(line.rstrip("\r\n")):]
+            comment = f"  # {entry.comment}" if entry.comment else ""
+            pieces.append(f"{entry.address} {' '.join(names)}{comment}{ending}")
+    pieces.append(content[position:])
+    return "".join(pieces)
 
 
 class BlockingManager:
-    def __init__(self, hosts_path, redirect="127.0.0.1"):
+    """
+    Blocks sites through the hosts file.
+
+    The manager is safe to share between threads. Mutations are serialized
+    by a writer lock (on top of the inter-process file lock), while
+    `blocked` is an immutable snapshot that each write replaces as a whole,
+    read-copy-update style: readers never take a lock, never wait behind a
+    write, and always see the state of one completed write.
+
+    With `background=True` the hosts file is not parsed up front; see
+    load_in_background().
+    """
+
+    def __init__(
+        self,
+        hosts_path,
+        redirect=None,
+        lock_timeout=LOCK_TIMEOUT,
+        state_file=None,
+        background=False,
+    ):
         self.hosts_path = hosts_path
+        self.lock_path = f"{hosts_path}.lock"
+        self.state_file = state_file or os.path.join(
+            os.path.dirname(os.path.abspath(hosts_path)), STATE_FILE_NAME
+        )
+        # A redirect strategy, see redirect.resolve_redirect; None takes the
+        # one saved in the state file, if any
         self.redirect = redirect
-        self.blocked = {}  # {site: unblock_timestamp}
-        self._load_cache()
+        self.site_redirects = {}  # {site: strategy overriding self.redirect}
+        self.lock_timeout = lock_timeout
+        self._write_lock = threading.RLock()
+        # {site: unblock_timestamp}, read-only; replaced on every change
+        self.blocked = MappingProxyType({})
+        self._sorted_cache = (None, [])  # (snapshot, its sites sorted)
+        self.events = EventHub()  # see events.EventHub.subscribe
+        self.groups = {}  # {group: [sites]}
+        self.active_groups = set()
+        self._sources = None  # SourceRefs, built on first use
+        self._manual_state = []  # saved manual references, see SourceRefs
+        self._source_state = {}  # {import or schedule source: sites}, likewise
+        self.schedules = []  # weekly block windows, see schedule.make_rule
+        self._scheduler = None
+        self.subscriptions = {}  # {name: {source, etag, last_modified}}
+        self.allowlist = Allowlist()  # sites that are never written as blocked
+        self.subscriptions_dir = os.path.join(
+            os.path.dirname(self.state_file), SUBSCRIPTIONS_DIR_NAME
+        )
+        self._version = None  # (mtime_ns, size) of the hosts file when last synced
+        self._digest = None  # running hash of the hosts file content
+        self._loaded = threading.Event()  # set once `blocked` is complete
+        self._load_lock = threading.Lock()  # guards the two below while loading
+        self._chunks = []  # batches published by a background load
+        self._early = {}  # {site: duration} appended during a background load
+        self._early_text = []  # what those appends wrote
+        self._unparsed = None  # (content, offset) a background load has yet to parse
+        self._marked = set()  # blocked sites whose entries carry BLOCK_MARKER
+        if not background:
+            self._load_cache()
+            self._loaded.set()
+        self._load_state()
+        self.redirect = self.redirect or DEFAULT_REDIRECT
+        self._addresses = {None: resolve_redirect(self.redirect)}
+        # The state as far as this manager knows it was saved, so that a save
+        # can tell its own changes from another process's
+        self._state_base = json.loads(json.dumps(self._state_dict()))
 
     def _load_cache(self):
         try:
             with open(self.hosts_path, "r") as file:
-                lines = file.readlines()
-                for line in lines:
-                    blocked_site = extract_blocked_site(line)
-                    if blocked_site:
-                        self.blocked[blocked_site] = 0
+                # Stamp before reading: a write slipping in between makes the
+                # next mutation see a stale stamp and reload, never the reverse.
+                self._version = _file_version(file)
+                self._sync_cache(file.read())
+        except FileNotFoundError:
+            print("Hosts file is missing.")
+        except IOError as e:
+            print(f"Error accessing the hosts file: {e}")
+
+    @property
+    def loaded(self) -> bool:
+        return self._loaded.is_set()
+
+    def wait_loaded(self, timeout=None) -> bool:
+        return self._loaded.wait(timeout)
+
+    def load_in_background(self, batch_size=LOAD_BATCH_SIZE):
+        """
+        Parses the hosts file on a worker thread, in batches.
+
+        The file is read up front, then each parsed batch is published as
+        a 'loaded' event and becomes visible to iter_blocked() and count(),
+        so a first page can be shown long before the whole file is parsed.
+        Blocking new sites proceeds meanwhile by appending to the file;
+        every other mutation waits until loading has finished. Subscribe
+        to events before calling this to see every batch.
+
+        Returns:
+            threading.Thread or None: The loader, or None if the file could
+            not be read.
+        """
+        try:
+            with self._write_lock, open(self.hosts_path, "r") as file:
+                self._version = _file_version(file)
+                content = file.read()
         except FileNotFoundError:
             print("Hosts file is missing.")
+            self._loaded.set()
+            return None
         except IOError as e:
             print(f"Error accessing the hosts file: {e}")
+            self._loaded.set()
+            return None
+        self._unparsed = (content, 0)
+        thread = threading.Thread(
+            target=self._load_batches, args=(content, batch_size), daemon=True
+        )
+        thread.start()
+        return thread
+
+    def _load_batches(self, content, batch_size):
+        digest = hashlib.sha1()
+        blocked = {}
+        marked = set()
+        start = 0
+        while start < len(content):
+            end = content.find("\n", start + batch_size)
+            end = len(content) if end == -1 else end + 1
+            piece = content[start:end]
+            digest.update(piece.encode())
+            batch = {
+                site: 0
+                for site in parse_blocked_sites(piece, marked)
+                if site not in blocked
+            }
+            blocked.update(batch)
+            with self._load_lock:
+                self._chunks.append(batch)
+                self._unparsed = (content, end)
+            self.events.publish(LOADED, batch)
+            start = end
+        with self._load_lock:
+            # Early appends landed after the content read above, in order
+            for text in self._early_text:
+                digest.update(text.encode())
+            for site, duration in self._early.items():
+                if duration or site not in blocked:
+                    blocked[site] = duration
+            self._digest = digest
+            self.blocked = MappingProxyType(blocked)
+            self._marked = marked.union(self._early)
+            self._chunks, self._early, self._early_text = [], {}, []
+            self._unparsed = None
+            self._loaded.set()
 
-    def _add_to_hosts(self, site):
-        comment = "# blocked by blanc-all"
+    def _append_while_loading(self, add, duration):
+        """
+        Appends blocks before a background load has finished.
+
+        Returns:
+            tuple, None or False: The (added, removed) sites, None on
+            failure, or False if loading finished or the file changed in the
+            meantime and the regular write path must be taken.
+        """
         try:
-            with open(self.hosts_path, "a") as file:
-                file.write(f"\n{self.redirect} {site}  {comment}")
+            with self._load_lock, self._locked(), open(
+                self.hosts_path, "r+"
+            ) as file:
+                # Only the stamp can be checked: the content hash is not
+                # known until the load completes
+                if self._loaded.is_set() or _file_version(file) != self._version:
+                    return False
+                chunks = self._chunks
+                content, offset = self._unparsed
+                added = [
+                    site
+                    for site in self.allowlist.blockable(add)
+                    if site not in self._early
+                    and not any(site in chunk for chunk in chunks)
+                ]
+                # One scan of the unparsed rest for the whole batch
+                unparsed = _blocked_among(content, offset, added)
+                added = [site for site in added if site not in unparsed]
+                appended = "".join(map(self._block_lines, added))
+                if appended:
+                    file.seek(0, os.SEEK_END)
+                    file.write(appended)
+                    file.flush()
+                    self._version = _file_version(file)
+                    self._early_text.append(appended)
+                for site in added:
+                    self._early[site] = duration
         except FileNotFoundError:
             print("Hosts file is missing.")
+            return None
         except IOError as e:
             print(f"Error accessing the hosts file: {e}")
+            return None
+        self.events.publish(ADDED, added)
+        return added, set()
+
+    def _loading_sites(self):
+        """Returns the sites loaded so far, or None once loading is complete."""
+        with self._load_lock:
+            if self._loaded.is_set():
+                return None
+            return itertools.chain(*self._chunks, tuple(self._early))
 
-    def _remove_from_hosts(self, site):
+    def _read_state(self):
+        """
+        Returns:
+            tuple: (the state file content or None, its (mtime_ns, size)
+            stamp or None if it does not exist)
+        """
         try:
-            with open(self.hosts_path, "r+") as file:
-                lines = file.readlines()
-                file.seek(0)
-                file.truncate()
-                for line in lines:
-                    if site not in line.split():
-                        file.write(line)
+            with open(self.state_file, "r", encoding="utf-8") as file:
+                return json.load(file), _file_version(file)
+        except FileNotFoundError:
+            return None, None
+        except (IOError, json.JSONDecodeError) as e:
+            print(f"Error reading the state file: {e}")
+            return None, None
+
+    def _load_state(self):
+        state, self._state_version = self._read_state()
+        if state is not None:
+            redirect = self.redirect
+            self._apply_state(state)
+            self.redirect = redirect or self.redirect
+
+    def _apply_state(self, state):
+        self.groups = state.get("groups", {})
+        self.active_groups = set(state.get("active_groups", [])) & self.groups.keys()
+        self.schedules = state.get("schedules", [])
+        self.subscriptions = state.get("subscriptions", {})
+        self.allowlist = Allowlist.from_state(state.get("allowlist", {}))
+        self.redirect = state.get("redirect") or self.redirect
+        self.site_redirects = state.get("site_redirects", {})
+        self._manual_state = state.get("manual", [])
+        self._source_state = state.get("sources", {})
+
+    def _state_dict(self):
+        manual, sources = self._manual_state, self._source_state
+        if self._sources is not None:
+            manual, sources = self._sources.to_state()
+        return {
+            "groups": self.groups,
+            "active_groups": sorted(self.active_groups),
+            "schedules": self.schedules,
+            "subscriptions": self.subscriptions,
+            "allowlist": self.allowlist.to_state(),
+            "redirect": self.redirect,
+            "site_redirects": self.site_redirects,
+            "manual": manual,
+            "sources": sources,
+        }
+
+    def _save_state(self):
+        """
+        Writes the state file under its own inter-process lock.
+
+        If another process saved it since this manager last read or wrote
+        it, the file is reloaded and this manager's changes are merged on
+        top (see _merge_state), so neither side's changes are lost.
+        """
+        state = json.loads(json.dumps(self._state_dict()))
+        temp_path = f"{self.state_file}.tmp"
+        try:
+            with self._locked(f"{self.state_file}.lock"):
+                theirs, version = self._read_state()
+                if theirs is not None and version != self._state_version:
+                    state = _merge_state(self._state_base, state, theirs)
+                    self._apply_state(state)
+                    self._addresses = {None: resolve_redirect(self.redirect)}
+                    self._sources = None  # rebuilt from the merged state
+                with open(temp_path, "w", encoding="utf-8") as file:
+                    json.dump(state, file, indent=2)
+                os.replace(temp_path, self.state_file)
+                with open(self.state_file, "r", encoding="utf-8") as file:
+                    self._state_version = _file_version(file)
+            self._state_base = state
+        except IOError as e:
+            print(f"Error writing the state file: {e}")
+
+    def _source_refs(self):
+        """
+        Returns who holds each site, rebuilt on first use from the active
+        groups, the subscription files and the saved manual and import
+        references.
+        """
+        if self._sources is None:
+            with self._write_lock:
+                if self._sources is None:
+                    add = [
+                        (f"{GROUP_PREFIX}{group}", self.groups[group])
+                        for group in self.active_groups
+                    ]
+                    add.extend(
+                        (
+                            f"{SUBSCRIPTION_PREFIX}{name}",
+                            self._read_subscription_sites(name),
+                        )
+                        for name in self.subscriptions
+                    )
+                    add.extend(self._source_state.items())
+                    add.append((MANUAL, self._manual_state))
+                    sources = SourceRefs()
+                    sources.commit(sources.plan(add))
+                    self._sources = sources
+        return self._sources
+
+    def _sync_cache(self, content):
+        previous = self.blocked
+        marked = set()
+        blocked = parse_blocked_sites(content, marked)
+        self._marked = marked
+        blocked.update(
+            (site, duration)
+            for site, duration in previous.items()
+            if duration and site in blocked
+        )
+        self.blocked = MappingProxyType(blocked)
+        if self.events:
+            self.events.publish(RELOADED, previous.keys() ^ blocked.keys())
+        self._digest = hashlib.sha1(content.encode())
+
+    def _is_stale(self, file):
+        version = _file_version(file)
+        if version != self._version:
+            return True
+        if time.time() - version[0] / 1e9 < RACY_WINDOW:
+            file.seek(0)
+            digest = hashlib.sha1(file.read().encode()).digest()
+            return digest != self._digest.digest()
+        return False
+
+    @contextmanager
+    def _locked(self, lock_path=None):
+        """
+        Holds the advisory inter-process lock guarding hosts file writes, or
+        the one at `lock_path`.
+        """
+        with open(lock_path or self.lock_path, "a+b") as lock_file:
+            deadline = time.monotonic() + self.lock_timeout
+            while True:
+                try:
+                    _try_lock(lock_file)
+                    break
+                except OSError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError(
+                            f"Timed out waiting for the lock {lock_file.name}."
+                        )
+                    time.sleep(LOCK_RETRY_INTERVAL)
+            try:
+                yield
+            finally:
+                _unlock(lock_file)
+
+    def _block_lines(self, site):
+        """Renders the hosts lines blocking a site, one per redirect address."""
+        redirect = self.site_redirects.get(site)
+        addresses = self._addresses.get(redirect)
+        if addresses is None:
+            addresses = self._addresses[redirect] = resolve_redirect(redirect)
+        return "".join(f"\n{address} {site}  {BLOCK_COMMENT}" for address in addresses)
+
+    @_synchronized_while_loading
+    def _update_hosts(
+        self,
+        add=(),
+        remove=(),
+        duration=0,
+        expired=False,
+        rewrite=(),
+        masks=None,
+        keep=None,
+    ):
+        """
+        Applies additions and removals to the hosts file in one locked write.
+
+        If another process changed the file since it was last seen, the cache
+        is reloaded from disk first and the changes are merged on top of it.
+        The lock only covers this read-modify-write, so bulk callers should
+        batch their changes into a single call rather than hold it longer.
+        Sites matching the allowlist are never added, whoever asks for them.
+        The new `blocked` snapshot is published only after the write, then
+        the changes are announced as one event per kind, removals as
+        'expired' when `expired` is set.
+
+        Blocked sites listed in `rewrite` have their entries replaced with
+        ones for their current redirect strategy, in the same write.
+
+        With `keep`, every site blanc-all blocked itself (its entry carries
+        BLOCK_MARKER) that is not in `keep` is removed too, decided under
+        the lock once the cache is fresh.
+
+        `masks`, planned by _plan_sources, records who holds the sites once
+        the write succeeds. Without it the changes are manual: added sites
+        that a group or subscription holds gain a manual reference, and
+        Either way, removed sites lose every reference.
+
+        Returns:
+            tuple or None: The (added, removed) sites, or None on failure.
+        """
+        add = list(dict.fromkeys(add))
+        remove = set(remove)
+        if not add and not remove and not rewrite and keep is None:
+            if masks:
+                self._commit_sources(masks)
+            return [], set()
+        if not self._loaded.is_set():
+            if not remove and not rewrite and keep is None:
+                result = self._append_while_loading(add, duration)
+                if result is not False:
+                    return result
+            self._loaded.wait()
+        try:
+            with self._locked(), open(self.hosts_path, "r+") as file:
+                stale = self._is_stale(file)
+                if stale:
+                    file.seek(0)
+                    content = file.read()
+                    self._sync_cache(content)
+                if keep is not None:
+                    remove |= {
+                        site
+                        for site in self._marked
+                        if site not in keep and site in self.blocked
+                    }
+                if not stale and (remove or rewrite):
+                    file.seek(0)
+                    content = file.read()
+                added = list(
+                    self.allowlist.blockable(
+                        site for site in add if site not in self.blocked
+                    )
+                )
+                removed = {site for site in remove if site in self.blocked}
+                rewritten = [
+                    site
+                    for site in rewrite
+                    if site in self.blocked and site not in removed
+                ]
+                appended = "".join(map(self._block_lines, rewritten + added))
+                if removed or rewritten:
+                    content = (
+                        _remove_sites(content, removed.union(rewritten)) + appended
+                    )
+                    file.seek(0)
+                    file.truncate()
+                    file.write(content)
+                    self._digest = hashlib.sha1(content.encode())
+                elif appended:
+                    file.seek(0, os.SEEK_END)
+                    file.write(appended)
+                    self._digest.update(appended.encode())
+                file.flush()
+                self._version = _file_version(file)
         except FileNotFoundError:
             print("Hosts file is missing.")
+            return None
         except IOError as e:
             print(f"Error accessing the hosts file: {e}")
+            return None
+        if added or removed:
+            blocked = dict(self.blocked)
+            for site in added:
+                blocked[site] = duration
+            for site in removed:
+                del blocked[site]
+            self.blocked = MappingProxyType(blocked)
+            self._marked.difference_update(removed)
+            self._marked.update(added)
+            self.events.publish(ADDED, added)
+            self.events.publish(EXPIRED if expired else REMOVED, removed)
+        self._marked.update(rewritten)
+        sources = self._source_refs()
+        if masks is None:
+            held = [site for site in add if site in sources and site in self.blocked]
+            masks = sources.plan(add=[(MANUAL, held)])
+        masks.update((site, 0) for site in removed if site in sources)
+        self._commit_sources(masks)
+        return added, removed
+
+    def _commit_sources(self, masks):
+        if self._source_refs().commit(masks):
+            self._save_state()
 
     def get_blocked_sites(self):
         return list(self.blocked.keys())
 
+    def count(self) -> int:
+        """The number of blocked sites, so far if still loading."""
+        sites = self._loading_sites()
+        if sites is not None:
+            return sum(1 for _ in sites)
+        return len(self.blocked)
+
+    def contains(self, site) -> bool:
+        """Whether a site is blocked, as far as known if still loading."""
+        if not self._loaded.is_set():
+            with self._load_lock:
+                if not self._loaded.is_set():
+                    return site in self._early or any(
+                        site in chunk for chunk in self._chunks
+                    )
+        return site in self.blocked
+
+    def _sorted_sites(self, blocked):
+        snapshot, sites = self._sorted_cache
+        if snapshot is not blocked:
+            sites = sorted(blocked, key=str.lower)
+            self._sorted_cache = (blocked, sites)
+        return sites
+
+    def iter_blocked(self, prefix=None, offset=0, limit=None, sort=False):
+        """
+        Lazily yields a page of the blocked sites.
+
+        Iteration runs over one snapshot, so concurrent writes never disturb
+        it; during a background load, it covers the sites loaded so far.
+        Sorted order is computed once per snapshot and reused by later
+        pages; a prefix is then located by bisection, so a sorted page costs
+        only the sites it returns.
+
+        Args:
+            prefix (str, optional): Only sites starting with this prefix,
+                ignoring case like the patterns of compile_site_pattern.
+            offset (int): The number of matching sites to skip.
+            limit (int, optional): The maximum number of sites to yield.
+            sort (bool): Yield the sites in case-insensitive alphabetical
+                order instead of the order they were blocked in.
+
+        Returns:
+            Iterator[str]: The requested sites.
+
+        Raises:
+            ValueError: If offset or limit is negative.
+        """
+        if offset < 0 or (limit is not None and limit < 0):
+            raise ValueError("offset and limit must not be negative")
+        # Hosts entries written by hand keep their case
+        prefix = prefix.lower() if prefix else None
+        loading = self._loading_sites()
+        blocked = self.blocked if loading is None else loading
+        if sort:
+            if loading is None:
+                sites = self._sorted_sites(blocked)
+            else:
+                sites = sorted(loading, key=str.lower)
+            start, end = 0, len(sites)
+            if prefix:
+                following = prefix[:-1] + chr(ord(prefix[-1]) + 1)
+                start = bisect_left(sites, prefix, key=str.lower)
+                end = bisect_left(sites, following, key=str.lower)
+            start = min(start + offset, end)
+            if limit is not None:
+                end = min(end, start + limit)
+            return iter(sites[start:end])
+        sites = iter(blocked)
+        if prefix:
+            sites = (site for site in sites if site.lower().startswith(prefix))
+        stop = None if limit is None else offset + limit
+        return itertools.islice(sites, offset, stop)
+
+    @_synchronized_while_loading
     def block(self, site: str, duration: int = 0):
         if site in self.blocked:
             print("Site is already blocked.")
+        elif self.allowlist.allows(site):
+            print("Site is on the allowlist.")
         else:
-            self._add_to_hosts(site)
-            self.blocked[site] = duration
+            self._update_hosts(add=[site], duration=duration)
 
+    @_synchronized
+    def expire_sites(self, now=None):
+        """
+        Unblocks, in one write, the sites whose unblock time has passed.
+
+        Returns:
+            tuple or None: The (added, removed) sites, or None on failure.
+        """
+        now = time.time() if now is None else now
+        expired = [
+            site for site, until in self.blocked.items() if until and until <= now
+        ]
+        return self._update_hosts(remove=expired, expired=True)
+
+    @_synchronized
     def unblock(self, site):
         if site in self.blocked:
-            self._remove_from_hosts(site)
-            del self.blocked[site]
+            self._update_hosts(remove=[site])
         else:
             print("Site is not blocked.")
+
+    @_synchronized_while_loading
+    def block_many(self, sites):
+        """Blocks several sites with a single hosts file write."""
+        return self._update_hosts(add=sites)
+
+    @_synchronized
+    def unblock_many(self, sites):
+        """Unblocks several sites with a single hosts file write."""
+        return self._update_hosts(remove=sites)
+
+    @_synchronized_while_loading
+    def apply_changes(self, add=(), remove=(), duration=0):
+        """
+        Blocks and unblocks sites with a single hosts file write.
+
+        Like block_many, additions alone are appended even while a
+        background load is running; removals wait for it to finish.
+        """
+        return self._update_hosts(add=add, remove=remove, duration=duration)
+
+    @_synchronized
+    def reconcile(self, sites, dry_run=False, source=None):
+        """
+        Converges the blocked sites to exactly the given set.
+
+        Only the difference to the current state is written, in a single
+        hosts write; an unchanged set writes nothing. Allowlisted sites are
+        left out of the desired set, so they are unblocked if present.
+        Only entries blanc-all wrote itself (marked with BLOCK_MARKER) are
+        ever removed, so the machine's own name mappings survive.
+
+        Args:
+            sites (Iterable[str]): The sites that should be blocked.
+            dry_run (bool): Only compute the difference.
+            source (str, optional): Who the sites come from, e.g.
+                'import:<file>', recorded as holding them instead of a
+                manual block (see why()).
+
+        Returns:
+            tuple or None: The (to_add, to_remove) sorted site lists, or None
+            if the hosts file could not be written.
+        """
+        desired = set(self.allowlist.blockable(sites))
+        current = self.blocked
+        to_add = sorted(desired - current.keys())
+        to_remove = sorted(site for site in self._marked - desired if site in current)
+        if dry_run or not (to_add or to_remove):
+            return to_add, to_remove
+        # The write recomputes the removals under the lock, in case another
+        # process changed the file since it was last read
+        masks = None
+        if source:
+            masks = self._source_refs().plan(add=[(source, desired)], blocked=current)
+        result = self._update_hosts(add=sorted(desired), keep=desired, masks=masks)
+        if result is None:
+            return None
+        return result[0], sorted(result[1])
+
+    @_synchronized
+    def set_group(self, group, sites):
+        """
+        Defines or redefines a named group of sites.
+
+        If the group is active, only the sites that joined or left it are
+        written to the hosts file.
+        """
+        sites = list(dict.fromkeys(sites))
+        if group in self.active_groups:
+            old = set(self.groups[group])
+            new = set(sites)
+            source = f"{GROUP_PREFIX}{group}"
+            self._apply_sources(add=[(source, new - old)], remove=[(source, old - new)])
+        self.groups[group] = sites
+        self._save_state()
+
+    @_synchronized
+    def delete_group(self, group):
+        if group not in self.groups:
+            print(f"Group {group} does not exist.")
+            return
+        if group in self.active_groups:
+            self.unblock_group(group)
+        del self.groups[group]
+        self._save_state()
+
+    @_synchronized
+    def block_group(self, group):
+        if group not in self.groups:
+            print(f"Group {group} does not exist.")
+        elif group in self.active_groups:
+            print(f"Group {group} is already blocked.")
+        elif (
+            self._apply_sources(add=[(f"{GROUP_PREFIX}{group}", self.groups[group])])
+            is not None
+        ):
+            self.active_groups.add(group)
+            self._save_state()
+
+    @_synchronized
+    def unblock_group(self, group):
+        if group not in self.active_groups:
+            print(f"Group {group} is not blocked.")
+        elif (
+            self._apply_sources(
+                remove=[(f"{GROUP_PREFIX}{group}", self.groups[group])]
+            )
+            is not None
+        ):
+            self.active_groups.discard(group)
+            self._save_state()
+
+    def _plan_sources(self, add=(), remove=()):
+        """
+        Computes who holds each site after sources take or release sites.
+
+        Only the sites of the changed sources are visited. Sites that no
+        source holds any more are the ones to unblock, so a site stays
+        blocked until the last group, subscription or manual block holding
+        it is released.
+
+        Args:
+            add (Iterable[tuple]): (source, sites) pairs to take.
+            remove (Iterable[tuple]): (source, sites) pairs to release.
+
+        Returns:
+            tuple: ({site: new mask}, sites to add, sites to remove)
+        """
+        blocked = self.blocked
+        masks = self._source_refs().plan(add, remove, blocked)
+        to_add = [site for site, mask in masks.items() if mask and site not in blocked]
+        to_remove = [
+            site for site, mask in masks.items() if not mask and site in blocked
+        ]
+        return masks, to_add, to_remove
+
+    def _apply_sources(self, add=(), remove=()):
+        masks, to_add, to_remove = self._plan_sources(add, remove)
+        return self._update_hosts(add=to_add, remove=to_remove, masks=masks)
+
+    @_synchronized
+    def why(self, site) -> list[str]:
+        """
+        Tells which sources block a site.
+
+        Returns:
+            list[str]: 'manual', 'group:<name>', 'import:<file>',
+            'schedule:<site>' and 'subscription:<name>' sources, sorted;
+            empty if the site is not blocked.
+        """
+        if site not in self.blocked:
+            return []
+        return self._source_refs().sources(site) or [MANUAL]
+
+    @_synchronized
+    def add_schedule(self, target, days, start, end):
+        """
+        Adds a weekly window during which a site or group is blocked.
+
+        Args:
+            target (str): A site, or 'group:<name>' for a group.
+            days (str): Weekdays, e.g. 'mon-fri'.
+            start (str): Window start as 'HH:MM'.
+            end (str): Window end as 'HH:MM'; windows may run past midnight.
+
+        Raises:
+            ValueError: If the days or times are invalid.
+        """
+        self.schedules.append(make_rule(target, days, start, end))
+        self._save_state()
+
+    @_synchronized
+    def remove_schedules(self, target):
+        remaining = [rule for rule in self.schedules if rule["target"] != target]
+        removed = len(self.schedules) - len(remaining)
+        self.schedules = remaining
+        self._save_state()
+        return removed
+
+    @_synchronized
+    def apply_schedules(self, moment=None, changes=None):
+        """
+        Brings scheduled targets to their state at `moment` in one write.
+
+        Without `changes` every target is re-evaluated, which is how the
+        correct state is recovered after a restart.
+
+        Args:
+            moment (datetime.datetime, optional): Defaults to now.
+            changes (dict, optional): {target: active} to apply.
+        """
+        moment = moment or datetime.datetime.now()
+        if changes is None:
+            self._scheduler = Scheduler(self.schedules)
+            changes = self._scheduler.reset(moment)
+        site_add, site_remove, activate, deactivate = [], [], [], []
+        for target, active in changes.items():
+            if target.startswith(GROUP_PREFIX):
+                group = target[len(GROUP_PREFIX):]
+                if group not in self.groups:
+                    continue
+                if active and group not in self.active_groups:
+                    activate.append(group)
+                elif not active and group in self.active_groups:
+                    deactivate.append(group)
+            elif active:
+                site_add.append(target)
+            else:
+                site_remove.append(target)
+        # Each scheduled site is its own source, so closing its window only
+        # releases the window's reference: a manual block, an active group
+        # or another target of the batch keeps the site blocked.
+        masks, to_add, to_remove = self._plan_sources(
+            add=[(f"{SCHEDULE_PREFIX}{site}", [site]) for site in site_add]
+            + [(f"{GROUP_PREFIX}{group}", self.groups[group]) for group in activate],
+            remove=[(f"{SCHEDULE_PREFIX}{site}", [site]) for site in site_remove]
+            + [(f"{GROUP_PREFIX}{group}", self.groups[group]) for group in deactivate],
+        )
+        if self._update_hosts(add=to_add, remove=to_remove, masks=masks) is None:
+            return
+        if activate or deactivate:
+            self.active_groups.update(activate)
+            self.active_groups.difference_update(deactivate)
+            self._save_state()
+
+    def run_schedules(self, stop_event=None):
+        """
+        Keeps scheduled targets in sync until `stop_event` is set.
+
+        Sleeps until the earliest pending transition and applies every
+        transition due at that instant as one batch.
+        """
+        stop_event = stop_event or threading.Event()
+        self.apply_schedules()
+        while not stop_event.is_set():
+            when = self._scheduler.peek()
+            timeout = MAX_SCHEDULE_SLEEP
+            if when is not None:
+                delay = (when - datetime.datetime.now()).total_seconds()
+                timeout = min(max(delay, 0), MAX_SCHEDULE_SLEEP)
+            if stop_event.wait(timeout):
+                break
+            now = datetime.datetime.now()
+            self.apply_schedules(now, self._scheduler.pop_due(now))
+
+    @_synchronized
+    def add_subscription(self, name, source):
+        self.subscriptions[name] = {"source": source}
+        self._save_state()
+
+    @_synchronized
+    def remove_subscription(self, name):
+        """Drops a subscription and unblocks the sites it contributed."""
+        if name not in self.subscriptions:
+            print(f"Subscription {name} does not exist.")
+            return
+        if self.apply_subscription(name, set()) is None:
+            return
+        del self.subscriptions[name]
+        try:
+            os.remove(self._subscription_path(name))
+        except FileNotFoundError:
+            pass
+        self._save_state()
+
+    def _subscription_path(self, name):
+        return os.path.join(self.subscriptions_dir, f"{name}.txt")
+
+    def _read_subscription_sites(self, name):
+        try:
+            with open(self._subscription_path(name), "r", encoding="utf-8") as file:
+                return set(file.read().split())
+        except FileNotFoundError:
+            return set()
+
+    @_synchronized
+    def apply_subscription(self, name, sites, etag=None, last_modified=None):
+        """
+        Applies only the change in what a subscription contributes.
+
+        The sites the subscription contributed last time are kept in a file
+        per subscription, so a refresh writes just the added and removed
+        sites, in a single hosts write.
+
+        Args:
+            name (str): The subscription name.
+            sites (set[str]): Every site the source lists now.
+            etag (str, optional): Validator to send on the next fetch.
+            last_modified (str, optional): Validator to send on the next fetch.
+
+        Returns:
+            tuple or None: The (added, removed) sites, counting only those
+            the hosts file gained or lost, or None on failure.
+        """
+        # Only what the subscription actually blocks counts as its
+        # contribution, so allowlisted sites never enter the diff.
+        sites = set(self.allowlist.blockable(sites))
+        previous = self._read_subscription_sites(name)
+        listed = sites - previous
+        source = f"{SUBSCRIPTION_PREFIX}{name}"
+        masks, to_add, removed = self._plan_sources(
+            add=[(source, sorted(listed))], remove=[(source, previous - sites)]
+        )
+        if self._update_hosts(add=to_add, remove=removed, masks=masks) is None:
+            return None
+        try:
+            os.makedirs(self.subscriptions_dir, exist_ok=True)
+            temp_path = f"{self._subscription_path(name)}.tmp"
+            with open(temp_path, "w", encoding="utf-8") as file:
+                file.writelines(f"{site}\n" for site in sorted(sites))
+            os.replace(temp_path, self._subscription_path(name))
+        except IOError as e:
+            print(f"Error writing the subscription file: {e}")
+            return None
+        if name in self.subscriptions:
+            self.subscriptions[name].update(etag=etag, last_modified=last_modified)
+            self._save_state()
+        return set(to_add), set(removed)
+
+    @_synchronized
+    def add_allow_rule(self, rule):
+        """
+        Adds an allowlist rule; see allowlist.Allowlist for the syntax.
+
+        Sites already blocked stay blocked until purge_allowed() is called.
+        """
+        self.allowlist.add(rule)
+        self._save_state()
+
+    @_synchronized
+    def remove_allow_rule(self, rule):
+        if not self.allowlist.remove(rule):
+            return False
+        self._save_state()
+        return True
+
+    @_synchronized
+    def purge_allowed(self, dry_run=False):
+        """
+        Unblocks every blocked site the allowlist matches, in one write.
+
+        Args:
+            dry_run (bool): Only find the sites that would be unblocked.
+
+        Returns:
+            list or None: The sorted matching sites, or None if the hosts
+            file could not be written.
+        """
+        allows = self.allowlist.allows
+        sites = sorted(site for site in self.blocked if allows(site))
+        if not dry_run and self._update_hosts(remove=sites) is None:
+            return None
+        return sites
+
+    @_synchronized
+    def block_matching(self, sites, matches, dry_run=False, source=None):
+        """
+        Blocks the sites of an input list that match a pattern, in one write.
+
+        Args:
+            sites (Iterable[str]): The candidate sites.
+            matches (Callable[[str], bool]): The compiled pattern, e.g. from
+                utils.compile_site_pattern.
+            dry_run (bool): Only find the sites that would be blocked.
+            source (str, optional): Who the sites come from, e.g.
+                'import:<file>', recorded as holding every matching site
+                instead of a manual block (see why()).
+
+        Returns:
+            list or None: The newly blocked sites, or None if the hosts file
+            could not be written.
+        """
+        candidates = dict.fromkeys(site for site in sites if matches(site))
+        if dry_run:
+            return list(
+                self.allowlist.blockable(
+                    site for site in candidates if site not in self.blocked
+                )
+            )
+        if not source:
+            result = self._update_hosts(add=candidates)
+        else:
+            blockable = list(self.allowlist.blockable(candidates))
+            masks, to_add, _ = self._plan_sources(add=[(source, blockable)])
+            result = self._update_hosts(add=to_add, masks=masks)
+        return None if result is None else result[0]
+
+    @_synchronized
+    def unblock_matching(self, matches, dry_run=False):
+        """
+        Unblocks every blocked site that matches a pattern, in one write.
+
+        Args:
+            matches (Callable[[str], bool]): The compiled pattern, e.g. from
+                utils.compile_site_pattern.
+            dry_run (bool): Only find the sites that would be unblocked.
+
+        Returns:
+            list or None: The sorted matching sites, or None if the hosts
+            file could not be written.
+        """
+        sites = sorted(filter(matches, self.blocked))
+        if not dry_run and self._update_hosts(remove=sites) is None:
+            return None
+        return sites
+
+    @_synchronized
+    def set_redirect(self, redirect, sites=None):
+        """
+        Changes the redirect strategy and migrates the existing entries.
+
+        Every affected entry is rewritten in a single hosts write.
+
+        Args:
+            redirect (str or None): A strategy for redirect.resolve_redirect;
+                None, for sites, returns them to the manager's strategy.
+            sites (Iterable[str], optional): Only change these sites;
+                otherwise the manager's strategy changes, migrating every
+                site without a strategy of its own.
+
+        Returns:
+            list or None: The rewritten blocked sites, or None if the hosts
+            file could not be written.
+
+        Raises:
+            ValueError: If the strategy is invalid.
+        """
+        if redirect is not None:
+            resolve_redirect(redirect)
+        previous = (self.redirect, dict(self.site_redirects))
+        if sites is None:
+            if redirect is None:
+                raise ValueError("A redirect strategy is required.")
+            self.redirect = redirect
+            self._addresses[None] = resolve_redirect(redirect)
+            sites = [site for site in self.blocked if site not in self.site_redirects]
+        else:
+            sites = list(sites)
+            for site in sites:
+                if redirect is None:
+                    self.site_redirects.pop(site, None)
+                else:
+                    self.site_redirects[site] = redirect
+        if self._update_hosts(rewrite=sites) is None:
+            self.redirect, self.site_redirects = previous
+            self._addresses[None] = resolve_redirect(self.redirect)
+            return None
+        self._save_state()
+        return [site for site in sites if site in self.blocked]
@@ -0,0 +1,57 @@
+from typing import NamedTuple
+
+from subscriptions import parse_blocklist
+
+# Lines validated between two progress reports
+PROGRESS_INTERVAL = 500
+
+
+class BulkResult(NamedTuple):
+    """The outcome of validating pasted lines."""
+
+    accepted: list[str]
+    rejected: list[str]
+
+
+def validate_lines(lines, progress=None, cancel_event=None):
+    """
+    Normalizes and validates pasted domains, URLs or hosts file lines.
+
+    Blank and comment lines are skipped. A line without any site, or with
+    a name that is not a valid site, is rejected; its valid names are
+    still accepted.
+
+    Args:
+        lines (Sequence[str]): The pasted lines.
+        progress (Callable[[int, int], None], optional): Called with
+            (lines done, total lines) every PROGRESS_INTERVAL lines and once
+            at the end.
+        cancel_event (threading.Event, optional): Stops the validation when
+            set.
+
+    Returns:
+        BulkResult or None: The deduplicated accepted sites and the rejected
+        lines, or None if cancelled.
+    """
+    accepted = {}
+    rejected = []
+    total = len(lines)
+    for number, line in enumerate(lines, 1):
+        if number % PROGRESS_INTERVAL == 0:
+            if cancel_event is not None and cancel_event.is_set():
+                return None
+            if progress:
+                progress(number, total)
+        content = line.split("#", 1)[0].strip()
+        if not content or content.startswith("!"):
+            continue
+        invalid = []
+        sites = list(parse_blocklist([content], invalid))
+        accepted.update(dict.fromkeys(sites))
+        if invalid or not sites:
+            rejected.append(line.strip())
+    if cancel_event is not None and cancel_event.is_set():
+        return None
+    if progress:
+        progress(total, total)
+    return BulkResult(list(accepted), rejected)
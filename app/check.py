@@ -0,0 +1,66 @@
+class BlockedSiteIndex:
+    """
+    Answers "is this domain blocked?" for large streams of domains.
+
+    Lookups hit a frozenset of the blocked sites and, unless only exact
+    matches are wanted, walk up the parent domains so 'a.ads.com' is covered
+    by a block of 'ads.com'. Any blocked parent of a domain ends in the same
+    last two labels, so domains whose last two labels no blocked site ends
+    in are rejected before the walk; that keeps the common negative case to
+    a few set lookups.
+    """
+
+    def __init__(self, sites, subdomains=True):
+        self._sites = frozenset(sites)
+        self._subdomains = subdomains
+        self._tails = frozenset(_last_two_labels(site) for site in self._sites)
+
+    def __len__(self):
+        return len(self._sites)
+
+    def contains(self, domain: str) -> bool:
+        sites = self._sites
+        if domain in sites:
+            return True
+        if not self._subdomains:
+            return False
+        last = domain.rfind(".")
+        if last == -1:
+            return False
+        if domain[last + 1:] in sites:
+            return True
+        second = domain.rfind(".", 0, last)
+        if second == -1 or domain[second + 1:] not in self._tails:
+            return False
+        dot = domain.find(".")
+        while dot < second:
+            if domain[dot + 1:] in sites:
+                return True
+            dot = domain.find(".", dot + 1)
+        return domain[second + 1:] in sites
+
+    def filter(self, domains, invert=False):
+        """
+        Yields the domains that are blocked, or the ones that are not.
+
+        Args:
+            domains (Iterable[str]): Lowercase hostnames.
+            invert (bool): Yield the domains that are not blocked instead.
+        """
+        contains = self.contains
+        if invert:
+            return (domain for domain in domains if not contains(domain))
+        return (domain for domain in domains if contains(domain))
+
+
+def _last_two_labels(site):
+    last = site.rfind(".")
+    return site[site.rfind(".", 0, last) + 1:] if last != -1 else site
+
+
+def read_domains(lines):
+    """Turns input lines into lowercase hostnames, skipping blank lines."""
+    for line in lines:
+        domain = line.strip().rstrip(".").lower()
+        if domain:
+            yield domain
@@ -1,7 +1,54 @@
+import asyncio
+import itertools
 import os
+import re
+import sys
 from abc import ABC, abstractmethod
+from allowlist import Allowlist
+from allowlist import SUFFIX_RULE_PREFIX
+from check import BlockedSiteIndex
+from check import read_domains
+from export import EXPORT_FORMATS
+from export import LIST_FORMATS
+from export import WRITE_BUFFER_SIZE
+from export import export_sites
+from export import format_lines
+from export import write_sites
+from fleet import push_fleet
+from landing import LandingPageServer
+from merge import MERGE_MEMORY_MB
+from merge import merge_blocklists
+from provenance import IMPORT_PREFIX
+from prune import ALIVE
+from prune import DEAD
+from prune import DNS_CACHE_FILE_NAME
+from prune import DnsCache
+from prune import UNKNOWN
+from prune import check_domains
+from prune import system_resolver
+from redirect import REDIRECT_STRATEGIES
+from redirect import resolve_redirect
+from schedule import WEEKDAYS
+from subscriptions import is_url
+from subscriptions import parse_blocklist
+from subscriptions import refresh_subscription
+from utils import compile_site_pattern
 from utils import copy_file
 from utils import is_valid_site
+from utils import normalize_site
+from utils import normalize_sites
+
+
+# Invalid names listed when a blocklist is read
+REJECTED_SHOWN = 5
+
+
+def _report_rejected(rejected, file=None):
+    """Tells how many names of a blocklist were skipped, and the first few."""
+    if rejected:
+        shown = ", ".join(rejected[:REJECTED_SHOWN])
+        more = "..." if len(rejected) > REJECTED_SHOWN else ""
+        print(f"Skipped {len(rejected)} invalid names: {shown}{more}", file=file)
 
 
 class Command(ABC):
@@ -16,9 +63,12 @@ class BlockSiteCommand(Command):
         self.blocking_manager = blocking_manager
 
     def execute(self):
-        if is_valid_site(self.site):
-            self.blocking_manager.block(self.site)
-            print(f"Access to {self.site} has been blocked.")
+        site = normalize_site(self.site)
+        if site and self.blocking_manager.allowlist.allows(site):
+            print(f"{site} is on the allowlist and will not be blocked.")
+        elif is_valid_site(site):
+            self.blocking_manager.block(site)
+            print(f"Access to {site} has been blocked.")
         else:
             print("Please specify a valid website to block.")
 
@@ -29,8 +79,227 @@ class UnblockSiteCommand(Command):
         self.blocking_manager = blocking_manager
 
     def execute(self):
-        self.blocking_manager.unblock(self.site)
-        print(f"Access to {self.site} has been unblocked.")
+        # Entries written before normalization may not be canonical hostnames
+        site = self.site
+        if not self.blocking_manager.contains(site):
+            site = normalize_site(site) or site
+        self.blocking_manager.unblock(site)
+        print(f"Access to {site} has been unblocked.")
+
+
+class WhyBlockedCommand(Command):
+    def __init__(self, blocking_manager, site):
+        self.site = site
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        site = self.site
+        if not self.blocking_manager.contains(site):
+            site = normalize_site(site) or site
+        sources = self.blocking_manager.why(site)
+        if sources:
+            print(f"{site} is blocked by: {', '.join(sources)}.")
+        elif self.blocking_manager.allowlist.allows(site):
+            print(f"{site} is not blocked; it is on the allowlist.")
+        else:
+            print(f"{site} is not blocked.")
+
+
+class BlockMatchingCommand(Command):
+    def __init__(
+        self, blocking_manager, pattern, path=None, regex=False, dry_run=False
+    ):
+        self.pattern = pattern
+        self.path = path
+        self.regex = regex
+        self.dry_run = dry_run
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        try:
+            matches = compile_site_pattern(self.pattern, self.regex)
+        except ValueError as e:
+            print(e)
+            return
+        rejected = []
+        try:
+            if not self.path or self.path == "-":
+                sites = list(parse_blocklist(sys.stdin, rejected))
+            else:
+                with open(self.path, "r", encoding="utf-8") as file:
+                    sites = list(parse_blocklist(file, rejected))
+        except IOError as e:
+            print(f"Error reading {self.path}: {e}")
+            return
+        _report_rejected(rejected)
+        source = None
+        if self.path and self.path != "-":
+            source = f"{IMPORT_PREFIX}{os.path.basename(self.path)}"
+        added = self.blocking_manager.block_matching(
+            sites, matches, self.dry_run, source
+        )
+        if added is None:
+            return
+        if self.dry_run:
+            for site in added:
+                print(f"+ {site}")
+            print(f"Would block {len(added)} sites matching {self.pattern}.")
+        else:
+            print(f"Blocked {len(added)} sites matching {self.pattern}.")
+
+
+class UnblockMatchingCommand(Command):
+    def __init__(self, blocking_manager, pattern, regex=False, dry_run=False):
+        self.pattern = pattern
+        self.regex = regex
+        self.dry_run = dry_run
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        try:
+            matches = compile_site_pattern(self.pattern, self.regex)
+        except ValueError as e:
+            print(e)
+            return
+        removed = self.blocking_manager.unblock_matching(matches, self.dry_run)
+        if removed is None:
+            return
+        if self.dry_run:
+            for site in removed:
+                print(f"- {site}")
+            print(f"Would unblock {len(removed)} sites matching {self.pattern}.")
+        else:
+            print(f"Unblocked {len(removed)} sites matching {self.pattern}.")
+
+
+class BlockGroupCommand(Command):
+    def __init__(self, blocking_manager, group):
+        self.group = group
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        if self.group in self.blocking_manager.groups:
+            self.blocking_manager.block_group(self.group)
+            print(f"Access to the sites in group {self.group} has been blocked.")
+        else:
+            print(f"Group {self.group} does not exist.")
+
+
+class UnblockGroupCommand(Command):
+    def __init__(self, blocking_manager, group):
+        self.group = group
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        if self.group in self.blocking_manager.active_groups:
+            self.blocking_manager.unblock_group(self.group)
+            print(f"Access to the sites in group {self.group} has been unblocked.")
+        else:
+            print(f"Group {self.group} is not blocked.")
+
+
+class SetGroupCommand(Command):
+    def __init__(self, blocking_manager, group, sites):
+        self.group = group
+        self.sites = sites
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        invalid_sites = [
+            site for site in self.sites if not is_valid_site(normalize_site(site))
+        ]
+        if invalid_sites:
+            print(f"Invalid websites: {', '.join(invalid_sites)}")
+        elif not self.sites:
+            self.blocking_manager.delete_group(self.group)
+            print(f"Group {self.group} has been deleted.")
+        else:
+            sites = list(normalize_sites(self.sites))
+            self.blocking_manager.set_group(self.group, sites)
+            print(f"Group {self.group} now contains {len(sites)} sites.")
+
+
+class ListGroupsCommand(Command):
+    def __init__(self, blocking_manager):
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        groups = self.blocking_manager.groups
+        if groups:
+            print("Site groups:")
+            for group, sites in groups.items():
+                status = (
+                    "blocked"
+                    if group in self.blocking_manager.active_groups
+                    else "unblocked"
+                )
+                print(f"- {group} ({len(sites)} sites, {status})")
+        else:
+            print("No site groups are defined.")
+
+
+class AddScheduleCommand(Command):
+    def __init__(self, blocking_manager, target, days, start, end):
+        self.target = target
+        self.days = days
+        self.start = start
+        self.end = end
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        if not self.target.startswith("group:"):
+            self.target = normalize_site(self.target)
+            if not is_valid_site(self.target):
+                print("Please specify a valid website or group to schedule.")
+                return
+        try:
+            self.blocking_manager.add_schedule(
+                self.target, self.days, self.start, self.end
+            )
+        except ValueError as e:
+            print(f"Invalid schedule: {e}")
+            return
+        print(f"{self.target} will be blocked on {self.days} {self.start}-{self.end}.")
+
+
+class RemoveSchedulesCommand(Command):
+    def __init__(self, blocking_manager, target):
+        self.target = target
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        removed = self.blocking_manager.remove_schedules(self.target)
+        print(f"Removed {removed} schedules for {self.target}.")
+
+
+class ListSchedulesCommand(Command):
+    def __init__(self, blocking_manager):
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        schedules = self.blocking_manager.schedules
+        if schedules:
+            print("Block schedules:")
+            for rule in schedules:
+                days = ",".join(WEEKDAYS[day] for day in rule["days"])
+                print(f"- {rule['target']}: {days} {rule['start']}-{rule['end']}")
+        else:
+            print("No block schedules are defined.")
+
+
+class RunSchedulesCommand(Command):
+    def __init__(self, blocking_manager):
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        if not self.blocking_manager.schedules:
+            print("No block schedules are defined.")
+            return
+        print("Applying block schedules, press Ctrl+C to stop.")
+        try:
+            self.blocking_manager.run_schedules()
+        except KeyboardInterrupt:
+            print("Stopped applying block schedules.")
 
 
 class UnblockAllSitesCommand(Command):
@@ -38,10 +307,9 @@ class UnblockAllSitesCommand(Command):
         self.blocking_manager = blocking_manager
 
     def execute(self):
-        blocked_sites = self.blocking_manager.get_blocked_sites()
-        if blocked_sites:
-            for site in blocked_sites:
-                self.blocking_manager.unblock(site)
+        sites = list(self.blocking_manager.iter_blocked())
+        if self.blocking_manager.unblock_many(sites) is None:
+            return
         print("Access to all sites has been unblocked.")
 
 
@@ -58,15 +326,489 @@ class RestoreHostsCommand(Command):
                 print(f"An error occured during restore: {e}")
 
 
+def _is_prefix_glob(pattern):
+    return pattern.endswith("*") and not any(char in pattern[:-1] for char in "*?[")
+
+
 class ListBlockedSitesCommand(Command):
-    def __init__(self, blocking_manager):
+    def __init__(
+        self,
+        blocking_manager,
+        output_format="text",
+        limit=None,
+        offset=0,
+        pattern=None,
+        regex=False,
+        sort=False,
+        count=False,
+    ):
+        self.output_format = output_format or "text"
+        self.limit = limit
+        self.offset = offset or 0
+        self.pattern = pattern
+        self.regex = regex
+        self.sort = sort
+        self.count = count
         self.blocking_manager = blocking_manager
 
     def execute(self):
-        blocked_sites = self.blocking_manager.get_blocked_sites()
-        if blocked_sites:
+        if self.output_format not in LIST_FORMATS:
+            print(f"Please specify a list format: {', '.join(LIST_FORMATS)}.")
+            return
+        if self.offset < 0 or (self.limit is not None and self.limit < 0):
+            print("The offset and limit cannot be negative.")
+            return
+        pattern = self.pattern
+        prefix = None
+        if pattern and not self.regex and _is_prefix_glob(pattern):
+            # 'ads*' needs no pattern matching at all
+            prefix, pattern = pattern[:-1], None
+        if pattern:
+            try:
+                matches = compile_site_pattern(pattern, self.regex)
+            except ValueError as e:
+                print(e)
+                return
+            sites = filter(matches, self.blocking_manager.iter_blocked(sort=self.sort))
+            stop = None if self.limit is None else self.offset + self.limit
+            sites = itertools.islice(sites, self.offset, stop)
+        else:
+            sites = self.blocking_manager.iter_blocked(
+                prefix, self.offset, self.limit, self.sort
+            )
+        if self.count:
+            if pattern or prefix:
+                print(sum(1 for _ in sites))
+            else:
+                # The size of the page without walking it
+                remaining = max(self.blocking_manager.count() - self.offset, 0)
+                print(remaining if self.limit is None else min(remaining, self.limit))
+            return
+        if self.output_format == "text":
+            first = next(sites, None)
+            if first is None:
+                print("No sites are currently blocked.")
+                return
             print("Currently blocked sites:")
-            for site in blocked_sites:
+            sites = itertools.chain([first], sites)
+        try:
+            # writelines streams through stdout's buffer instead of one
+            # print() per site
+            sys.stdout.writelines(format_lines(sites, self.output_format))
+            sys.stdout.flush()
+        except BrokenPipeError:
+            # The reader (e.g. `head`) went away; silence the flush at exit
+            sys.stdout = open(os.devnull, "w")
+
+
+class ExportCommand(Command):
+    def __init__(self, blocking_manager, export_format, output=None, collapse=False):
+        self.export_format = export_format
+        self.output = output
+        self.collapse = collapse
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        if self.export_format not in EXPORT_FORMATS:
+            print(f"Please specify an export format: {', '.join(EXPORT_FORMATS)}.")
+            return
+        if not self.output or self.output == "-":
+            export_sites(
+                self.blocking_manager.blocked,
+                sys.stdout,
+                self.export_format,
+                collapse=self.collapse,
+            )
+            return
+        try:
+            with open(
+                self.output, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE
+            ) as file:
+                count = export_sites(
+                    self.blocking_manager.blocked,
+                    file,
+                    self.export_format,
+                    collapse=self.collapse,
+                )
+            print(f"Exported {count} sites to {self.output}.")
+        except IOError as e:
+            print(f"Error writing the export file: {e}")
+
+
+class MergeCommand(Command):
+    def __init__(
+        self,
+        paths,
+        output=None,
+        export_format=None,
+        collapse=False,
+        memory_mb=MERGE_MEMORY_MB,
+    ):
+        self.paths = paths
+        self.output = output
+        self.export_format = export_format
+        self.collapse = collapse
+        self.memory_mb = memory_mb or MERGE_MEMORY_MB
+
+    def _sources(self):
+        for path in self.paths:
+            if path == "-":
+                yield sys.stdin
+            else:
+                with open(path, "r", encoding="utf-8", errors="replace") as file:
+                    yield file
+
+    def _write(self, file, rejected):
+        sites = merge_blocklists(
+            self._sources(), self.collapse, self.memory_mb, rejected=rejected
+        )
+        return write_sites(sites, file, self.export_format)
+
+    def execute(self):
+        if self.export_format and self.export_format not in EXPORT_FORMATS:
+            print(f"Please specify an export format: {', '.join(EXPORT_FORMATS)}.")
+            return
+        rejected = []
+        try:
+            if not self.output or self.output == "-":
+                self._write(sys.stdout, rejected)
+                sys.stdout.flush()
+                # Standard output holds the merged list
+                _report_rejected(rejected, sys.stderr)
+                return
+            with open(
+                self.output, "w", encoding="utf-8", buffering=WRITE_BUFFER_SIZE
+            ) as file:
+                count = self._write(file, rejected)
+            _report_rejected(rejected)
+            print(
+                f"Merged {len(self.paths)} lists into {count} sites in {self.output}."
+            )
+        except BrokenPipeError:
+            sys.stdout = open(os.devnull, "w")
+        except IOError as e:
+            print(f"Error merging the blocklists: {e}")
+
+
+class AddSubscriptionCommand(Command):
+    def __init__(self, blocking_manager, name, source):
+        self.name = name
+        self.source = source
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        if not re.fullmatch(r"[\w-]+", self.name):
+            print("Subscription names may only contain letters, digits, '_' and '-'.")
+        elif not is_url(self.source) and not os.path.isfile(self.source):
+            print("Please specify a blocklist URL or an existing file.")
+        else:
+            self.blocking_manager.add_subscription(self.name, self.source)
+            print(f"Subscribed to {self.source} as {self.name}.")
+
+
+class RemoveSubscriptionCommand(Command):
+    def __init__(self, blocking_manager, name):
+        self.name = name
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        if self.name in self.blocking_manager.subscriptions:
+            self.blocking_manager.remove_subscription(self.name)
+            print(f"Subscription {self.name} has been removed.")
+        else:
+            print(f"Subscription {self.name} does not exist.")
+
+
+class ListSubscriptionsCommand(Command):
+    def __init__(self, blocking_manager):
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        subscriptions = self.blocking_manager.subscriptions
+        if subscriptions:
+            print("Subscriptions:")
+            for name, subscription in subscriptions.items():
+                print(f"- {name}: {subscription['source']}")
+        else:
+            print("No subscriptions are defined.")
+
+
+class RefreshSubscriptionsCommand(Command):
+    def __init__(self, blocking_manager, name=None):
+        self.name = name
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        subscriptions = self.blocking_manager.subscriptions
+        if self.name and self.name not in subscriptions:
+            print(f"Subscription {self.name} does not exist.")
+            return
+        for name in [self.name] if self.name else list(subscriptions):
+            try:
+                result = refresh_subscription(self.blocking_manager, name)
+            except (OSError, ValueError) as e:
+                print(f"Could not refresh {name}: {e}")
+                continue
+            if result is False:
+                print(f"{name} is up to date.")
+            elif result is None:
+                print(f"Could not apply {name}.")
+            else:
+                added, removed = result
+                print(f"{name}: {len(added)} sites added, {len(removed)} removed.")
+
+
+class ApplyCommand(Command):
+    def __init__(self, blocking_manager, path, dry_run=False):
+        self.path = path
+        self.dry_run = dry_run
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        rejected = []
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                desired = set(parse_blocklist(file, rejected))
+        except IOError as e:
+            print(f"Error reading {self.path}: {e}")
+            return
+        _report_rejected(rejected)
+        result = self.blocking_manager.reconcile(
+            desired,
+            dry_run=self.dry_run,
+            source=f"{IMPORT_PREFIX}{os.path.basename(self.path)}",
+        )
+        if result is None:
+            return
+        to_add, to_remove = result
+        if self.dry_run:
+            for site in to_add:
+                print(f"+ {site}")
+            for site in to_remove:
+                print(f"- {site}")
+            print(f"Would block {len(to_add)} and unblock {len(to_remove)} sites.")
+        elif to_add or to_remove:
+            print(f"Blocked {len(to_add)} and unblocked {len(to_remove)} sites.")
+        else:
+            print("The blocked sites already match.")
+
+
+class PushFleetCommand(Command):
+    def __init__(self, path, targets, workers, retries, dry_run=False):
+        self.path = path
+        self.targets = targets
+        self.workers = workers
+        self.retries = retries
+        self.dry_run = dry_run
+
+    def execute(self):
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                desired = set(parse_blocklist(file))
+        except IOError as e:
+            print(f"Error reading {self.path}: {e}")
+            return
+        failed = 0
+        for result in push_fleet(
+            self.targets, desired, self.workers, self.retries, self.dry_run
+        ):
+            if result.error:
+                failed += 1
+                print(
+                    f"{result.target}: failed after {result.attempts} attempts, "
+                    f"{result.error}."
+                )
+            else:
+                print(
+                    f"{result.target}: {len(result.added)} blocked, "
+                    f"{len(result.removed)} unblocked."
+                )
+        print(f"Pushed to {len(self.targets) - failed} of {len(self.targets)} targets.")
+
+
+class CheckSitesCommand(Command):
+    def __init__(self, blocking_manager, path=None, invert=False, exact=False):
+        self.path = path
+        self.invert = invert
+        self.exact = exact
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        index = BlockedSiteIndex(self.blocking_manager.blocked, not self.exact)
+        try:
+            if not self.path or self.path == "-":
+                self._check(index, sys.stdin)
+            else:
+                with open(self.path, "r", encoding="utf-8", errors="replace") as file:
+                    self._check(index, file)
+        except IOError as e:
+            print(f"Error reading {self.path}: {e}")
+
+    def _check(self, index, file):
+        matches = index.filter(read_domains(file), self.invert)
+        try:
+            sys.stdout.writelines(f"{domain}\n" for domain in matches)
+            sys.stdout.flush()
+        except BrokenPipeError:
+            sys.stdout = open(os.devnull, "w")
+
+
+class AllowSiteCommand(Command):
+    def __init__(self, blocking_manager, rule):
+        self.rule = rule
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        name, suffix = Allowlist.parse_rule(self.rule)
+        name = normalize_site(name)
+        if not is_valid_site(name):
+            print("Please specify a valid website or '*.domain' to allow.")
+            return
+        rule = f"{SUFFIX_RULE_PREFIX}{name}" if suffix else name
+        self.blocking_manager.add_allow_rule(rule)
+        print(f"{rule} has been added to the allowlist.")
+        print("Run 'purge' to unblock the matching sites that are already blocked.")
+
+
+class DisallowSiteCommand(Command):
+    def __init__(self, blocking_manager, rule):
+        self.rule = rule
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        if self.blocking_manager.remove_allow_rule(self.rule):
+            print(f"{self.rule} has been removed from the allowlist.")
+        else:
+            print(f"{self.rule} is not on the allowlist.")
+
+
+class ListAllowlistCommand(Command):
+    def __init__(self, blocking_manager):
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        rules = self.blocking_manager.allowlist.rules()
+        if rules:
+            print("Allowlist:")
+            for rule in rules:
+                print(f"- {rule}")
+        else:
+            print("The allowlist is empty.")
+
+
+class PurgeAllowedCommand(Command):
+    def __init__(self, blocking_manager, dry_run=False):
+        self.dry_run = dry_run
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        sites = self.blocking_manager.purge_allowed(self.dry_run)
+        if sites is None:
+            return
+        if self.dry_run:
+            for site in sites:
                 print(f"- {site}")
+            print(f"Would unblock {len(sites)} allowlisted sites.")
         else:
-            print("No sites are currently blocked.")
+            print(f"Unblocked {len(sites)} allowlisted sites.")
+
+
+class ServeLandingPageCommand(Command):
+    def __init__(self, blocking_manager, port):
+        self.port = port
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        # Null addresses are not reachable from outside anyway, but binding
+        # them would listen on every interface
+        host = resolve_redirect(self.blocking_manager.redirect)[0]
+        if host == "0.0.0.0":
+            host = "127.0.0.1"
+        server = LandingPageServer(host, self.port)
+        print(
+            f"Serving the blocked page on http://{host}:{self.port}/, "
+            "press Ctrl+C to stop."
+        )
+        try:
+            asyncio.run(server.serve_forever())
+        except OSError as e:
+            print(f"Could not start the server: {e}")
+        except KeyboardInterrupt:
+            print("Stopped serving the blocked page.")
+
+
+class SetRedirectCommand(Command):
+    def __init__(self, blocking_manager, redirect, sites=None):
+        self.redirect = redirect
+        self.sites = sites
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        redirect = None if self.redirect == "default" else self.redirect
+        sites = None
+        if self.sites:
+            sites = [normalize_site(site) or site for site in self.sites]
+        try:
+            rewritten = self.blocking_manager.set_redirect(redirect, sites)
+        except ValueError as e:
+            print(e)
+            print(f"Strategies: {', '.join(REDIRECT_STRATEGIES)}, or IP addresses.")
+            return
+        if rewritten is not None:
+            print(
+                f"Redirect set to {self.redirect}, "
+                f"{len(rewritten)} entries rewritten."
+            )
+
+
+class ShowRedirectCommand(Command):
+    def __init__(self, blocking_manager):
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        print(f"Redirect strategy: {self.blocking_manager.redirect}")
+        for site, redirect in sorted(self.blocking_manager.site_redirects.items()):
+            print(f"- {site}: {redirect}")
+
+
+class PruneCommand(Command):
+    def __init__(self, blocking_manager, resolver, concurrency, dry_run=False):
+        self.resolver = resolver
+        self.concurrency = concurrency
+        self.dry_run = dry_run
+        self.blocking_manager = blocking_manager
+
+    def execute(self):
+        resolver = self.resolver or system_resolver()
+        if resolver is None:
+            print("Could not find the system's DNS server, pass one with --resolver.")
+            return
+        cache = DnsCache(
+            os.path.join(
+                os.path.dirname(self.blocking_manager.state_file), DNS_CACHE_FILE_NAME
+            )
+        )
+        sites = list(self.blocking_manager.iter_blocked())
+        print(f"Checking {len(sites)} blocked sites using {resolver}...")
+        try:
+            statuses = asyncio.run(
+                check_domains(sites, resolver, self.concurrency, cache)
+            )
+        except (OSError, ValueError) as e:
+            print(f"Could not query the resolver: {e}")
+            return
+        cache.save()
+        counts = {ALIVE: 0, DEAD: 0, UNKNOWN: 0}
+        for status in statuses.values():
+            counts[status] += 1
+        dead = [site for site in sites if statuses[site] == DEAD]
+        print(
+            f"{counts[ALIVE]} resolve, {counts[DEAD]} do not exist, "
+            f"{counts[UNKNOWN]} could not be checked."
+        )
+        if self.dry_run:
+            for site in dead:
+                print(f"- {site}")
+            print(f"Would unblock {len(dead)} dead sites.")
+        elif self.blocking_manager.unblock_many(dead) is not None:
+            print(f"Unblocked {len(dead)} dead sites.")
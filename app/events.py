@@ -0,0 +1,99 @@
+import queue
+import threading
+from typing import NamedTuple
+
+ADDED = "added"
+REMOVED = "removed"
+EXPIRED = "expired"
+RELOADED = "reloaded"
+LOADED = "loaded"
+EVENT_KINDS = (ADDED, REMOVED, EXPIRED, RELOADED, LOADED)
+
+
+class BlockingEvent(NamedTuple):
+    """
+    One batch of changes to the blocked sites.
+
+    For 'reloaded', the hosts file was changed by someone else and `sites`
+    holds every site whose blocked state differs from before the reload;
+    consumers should re-check those sites rather than assume a direction.
+    'loaded' carries one batch of sites found by a background load.
+    """
+
+    kind: str
+    sites: tuple[str, ...]
+
+
+class Subscription:
+    """
+    Delivers events to one callback on its own daemon thread.
+
+    Publishing only puts the event on an unbounded queue, so a slow or
+    stuck callback delays its own later events, never the writer or other
+    subscribers.
+    """
+
+    def __init__(self, hub, callback, kinds):
+        self._hub = hub
+        self.callback = callback
+        self.kinds = frozenset(kinds)
+        self._queue = queue.SimpleQueue()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            event = self._queue.get()
+            if event is None:
+                return
+            try:
+                self.callback(event)
+            except Exception as e:
+                print(f"Error in blocking event subscriber: {e}")
+
+    def deliver(self, event):
+        if event.kind in self.kinds:
+            self._queue.put(event)
+
+    def close(self, wait=False):
+        """Stops delivery once the events already queued are handled."""
+        self._hub.unsubscribe(self)
+        self._queue.put(None)
+        if wait:
+            self._thread.join()
+
+
+class EventHub:
+    def __init__(self):
+        self._subscriptions = ()  # replaced, never mutated, so publish needs no lock
+        self._lock = threading.Lock()
+
+    def __bool__(self):
+        return bool(self._subscriptions)
+
+    def subscribe(self, callback, kinds=EVENT_KINDS) -> Subscription:
+        """
+        Calls `callback(event)` for every event of the given kinds.
+
+        Returns:
+            Subscription: Call close() on it to unsubscribe.
+        """
+        subscription = Subscription(self, callback, kinds)
+        with self._lock:
+            self._subscriptions = (*self._subscriptions, subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions = tuple(
+                existing
+                for existing in self._subscriptions
+                if existing is not subscription
+            )
+
+    def publish(self, kind, sites):
+        if not sites:
+            return
+        event = BlockingEvent(kind, tuple(sites))
+        for subscription in self._subscriptions:
+            subscription.deliver(event)
@@ -0,0 +1,151 @@
+import json
+
+from utils import normalize_sites
+
+EXPORT_FORMATS = ("hosts", "dnsmasq", "unbound", "adblock", "json")
+LIST_FORMATS = ("text", "json", "ndjson", "csv")
+# Formats whose rules also match every subdomain of the listed name
+SUFFIX_FORMATS = ("dnsmasq", "unbound", "adblock")
+WRITE_BUFFER_SIZE = 1 << 20
+
+
+def parent_domains(site: str):
+    """Yields the parent domains of a site, nearest first."""
+    dot = site.find(".")
+    while dot != -1:
+        site = site[dot + 1:]
+        yield site
+        dot = site.find(".")
+
+
+def collapse_subdomains(sites, blocked):
+    """
+    Drops sites already covered by a blocked parent domain.
+
+    Args:
+        sites (Iterable[str]): The sites to filter.
+        blocked (Container[str]): All blocked sites, for parent lookups.
+
+    Yields:
+        str: The sites no blocked parent covers.
+    """
+    for site in sites:
+        if not any(parent in blocked for parent in parent_domains(site)):
+            yield site
+
+
+def format_lines(sites, export_format: str, redirect: str = "0.0.0.0"):
+    """
+    Renders sites as lines of a resolver blocklist.
+
+    Args:
+        sites (Iterable[str]): The hostnames to render.
+        export_format (str): One of EXPORT_FORMATS or LIST_FORMATS.
+        redirect (str): The address used by the hosts and dnsmasq formats.
+
+    Yields:
+        str: Newline terminated lines, headers and footers included.
+
+    Raises:
+        ValueError: If the format is not supported.
+    """
+    if export_format == "hosts":
+        for site in sites:
+            yield f"{redirect} {site}\n"
+    elif export_format == "dnsmasq":
+        for site in sites:
+            yield f"address=/{site}/{redirect}\n"
+    elif export_format == "unbound":
+        yield "server:\n"
+        for site in sites:
+            yield f'    local-zone: "{site}" always_nxdomain\n'
+    elif export_format == "adblock":
+        yield "[Adblock Plus 2.0]\n"
+        for site in sites:
+            yield f"||{site}^\n"
+    elif export_format == "json":
+        separator = "[\n"
+        for site in sites:
+            yield f"{separator}  {json.dumps(site)}"
+            separator = ",\n"
+        yield "[]\n" if separator == "[\n" else "\n]\n"
+    elif export_format == "text":
+        for site in sites:
+            yield f"- {site}\n"
+    elif export_format == "ndjson":
+        for site in sites:
+            yield f"{json.dumps(site)}\n"
+    elif export_format == "csv":
+        yield "site\n"
+        for site in sites:
+            if any(char in site for char in ',"\r\n'):
+                site = '"' + site.replace('"', '""') + '"'
+            yield f"{site}\n"
+    else:
+        raise ValueError(f"Unsupported export format: {export_format}")
+
+
+def write_sites(
+    sites, file, export_format: str = None, redirect: str = "0.0.0.0"
+) -> int:
+    """
+    Streams hostnames into an open text file and counts them on the way.
+
+    Args:
+        sites (Iterable[str]): The hostnames to write.
+        file: A writable text file.
+        export_format (str): One of EXPORT_FORMATS or LIST_FORMATS; without
+            one, the hostnames are written one per line.
+        redirect (str): The address used by the hosts and dnsmasq formats.
+
+    Returns:
+        int: The number of written hostnames.
+    """
+    count = 0
+
+    def counted(items):
+        nonlocal count
+        for item in items:
+            count += 1
+            yield item
+
+    if export_format:
+        lines = format_lines(counted(sites), export_format, redirect)
+    else:
+        lines = (f"{site}\n" for site in counted(sites))
+    file.writelines(lines)
+    return count
+
+
+def export_sites(
+    sites,
+    file,
+    export_format: str,
+    redirect: str = "0.0.0.0",
+    collapse: bool = False,
+) -> int:
+    """
+    Streams blocked sites into an open text file in a resolver format.
+
+    Sites are normalized to hostnames and deduplicated on the way. Output is
+    generated line by line and batched by the file's own buffer, so the
+    rendered export is never held in memory.
+
+    Args:
+        sites (Collection[str]): The blocked sites, e.g. BlockingManager.blocked;
+            also used for parent lookups when collapsing.
+        file: A writable text file.
+        export_format (str): One of EXPORT_FORMATS.
+        redirect (str): The address used by the hosts and dnsmasq formats.
+        collapse (bool): Drop subdomains of blocked parents for formats
+            whose rules cover subdomains.
+
+    Returns:
+        int: The number of exported sites.
+    """
+    if export_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unsupported export format: {export_format}")
+    hostnames = normalize_sites(sites)
+    if collapse and export_format in SUFFIX_FORMATS:
+        hostnames = collapse_subdomains(hostnames, sites)
+    return write_sites(hostnames, file, export_format, redirect)
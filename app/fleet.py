@@ -0,0 +1,72 @@
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple
+
+from block import BlockingManager
+
+FLEET_WORKERS = 8
+FLEET_RETRIES = 2
+RETRY_DELAY = 0.5
+
+
+class PushResult(NamedTuple):
+    """The outcome of pushing the desired sites to one hosts file."""
+
+    target: str
+    added: list[str]
+    removed: list[str]
+    attempts: int
+    error: str | None = None
+
+
+def push_to_target(target, desired, retries=FLEET_RETRIES, dry_run=False):
+    """
+    Reconciles one hosts file to the desired sites, retrying on failure.
+
+    Each attempt parses the target once and writes only its own diff.
+
+    Args:
+        target (str): The path of the hosts file.
+        desired (frozenset[str]): The sites that should be blocked.
+        retries (int): How many times to retry a failed attempt.
+        dry_run (bool): Only compute the diff.
+
+    Returns:
+        PushResult: The diff applied to the target, or the last error.
+    """
+    error = None
+    for attempt in range(1, retries + 2):
+        if attempt > 1:
+            time.sleep(RETRY_DELAY * (attempt - 1))
+        if not os.path.isfile(target):
+            error = "hosts file is missing"
+            continue
+        result = BlockingManager(target).reconcile(desired, dry_run=dry_run)
+        if result is not None:
+            return PushResult(target, result[0], result[1], attempt)
+        error = "hosts file could not be written"
+    return PushResult(target, [], [], retries + 1, error)
+
+
+def push_fleet(
+    targets, desired, workers=FLEET_WORKERS, retries=FLEET_RETRIES, dry_run=False
+):
+    """
+    Pushes the desired sites to many hosts files concurrently.
+
+    Args:
+        targets (Iterable[str]): The hosts file paths, e.g. mounted shares.
+        desired (Iterable[str]): The sites that should be blocked everywhere.
+        workers (int): The size of the thread pool.
+        retries (int): How many times to retry each failed target.
+        dry_run (bool): Only compute the per-target diffs.
+
+    Yields:
+        PushResult: One result per target, in the order of `targets`.
+    """
+    desired = frozenset(desired)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        yield from executor.map(
+            lambda target: push_to_target(target, desired, retries, dry_run), targets
+        )
@@ -1,12 +1,18 @@
 import os
+import threading
 import wx
 import wx.lib.agw.gradientbutton as GB
 from block import BlockingManager
+from bulk import validate_lines
+from events import LOADED
+from events import RELOADED
+from pending import PendingChanges
 from utils import copy_file
 from utils import format_quote
 from utils import get_hosts_path
 from utils import get_quote
 from utils import is_valid_site
+from utils import normalize_site
 
 LOGO_PATH = "logo.png"
 ICON_PATH = "icon.ico"
@@ -14,6 +20,8 @@ MOUNTAIN_SHADOW = wx.Colour(42, 93, 116)
 MOUNTAIN_SHADE = wx.Colour(78, 129, 146)
 MOUNTAIN_SKY = wx.Colour(7, 38, 61)
 MOUNTAIN_SNOW = wx.Colour(245, 235, 223)
+# Quiet period after the last edit before staged changes are written
+FLUSH_DELAY_MS = 1000
 
 
 class BlockingApp(wx.Frame):
@@ -23,7 +31,15 @@ class BlockingApp(wx.Frame):
         # --- Initialization ---
         self.hosts = get_hosts_path()
         self._copy_original_hosts(self.hosts)
-        self.blocking_manager = BlockingManager(self.hosts)
+        # Parsed after the window is up; see load_in_background below
+        self.blocking_manager = BlockingManager(self.hosts, background=True)
+        self.pending = PendingChanges(self.blocking_manager)
+        self.flush_timer = None
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+        # Changes made elsewhere (schedules, other processes) patch the list
+        self.subscription = self.blocking_manager.events.subscribe(
+            lambda event: wx.CallAfter(self.on_blocking_event, event)
+        )
 
         self.panel = wx.Panel(self)
 
@@ -78,17 +94,33 @@ class BlockingApp(wx.Frame):
         self.block_button.SetFont(self.button_font)
         self.block_button.Bind(wx.EVT_BUTTON, self.on_block_button)
 
+        # --- Bulk Block Button ---
+        self.bulk_button = GB.GradientButton(self.panel, label="Bulk...", size=(70, 30))
+        self._colour_gradient_button(self.bulk_button)
+        self.bulk_button.SetFont(self.button_font)
+        self.bulk_button.Bind(wx.EVT_BUTTON, self.on_bulk_button)
+
         # --- Selection Block ---
         self.blocked_list = wx.ListBox(
             self.panel,
             wx.ID_ANY,
-            choices=self.blocking_manager.get_blocked_sites(),
+            choices=list(self.blocking_manager.iter_blocked()),
             style=wx.LB_MULTIPLE,
         )
+        # The sites in the list box, so events are patched in without lookups
+        self.shown_sites = set(self.blocked_list.GetItems())
         self.blocked_list.SetForegroundColour(MOUNTAIN_SKY)
         self.blocked_list.SetFont(self.text_font)
         self.blocked_list.SetMaxClientSize
 
+        # --- Group Checkboxes ---
+        self.group_list = wx.CheckListBox(
+            self.panel, wx.ID_ANY, choices=list(self.blocking_manager.groups)
+        )
+        self.group_list.SetForegroundColour(MOUNTAIN_SKY)
+        self.group_list.SetCheckedStrings(list(self.blocking_manager.active_groups))
+        self.group_list.Bind(wx.EVT_CHECKLISTBOX, self.on_group_toggle)
+
         # --- Unblock Button ---
         self.unblock_button = GB.GradientButton(
             self.panel, label="Unblock", size=(70, 30)
@@ -106,6 +138,8 @@ class BlockingApp(wx.Frame):
         self.unblock_all_button.Bind(wx.EVT_BUTTON, self.on_unblock_all_button)
 
         self._do_layout()
+        # Batches of a large hosts file fill the list as they are parsed
+        self.blocking_manager.load_in_background()
 
     def _copy_original_hosts(self, hosts_file):
         if not os.path.exists(r"../data/original_hosts"):
@@ -140,11 +174,16 @@ class BlockingApp(wx.Frame):
         block_sizer = wx.BoxSizer(wx.HORIZONTAL)
         block_sizer.Add(self.block_input, 1, wx.ALL, 5)
         block_sizer.Add(self.block_button, 0, wx.ALL, 5)
+        block_sizer.Add(self.bulk_button, 0, wx.ALL, 5)
         main_sizer.Add(block_sizer, 0, wx.EXPAND)
 
         # Selection block - takes full width
         main_sizer.Add(self.blocked_list, 1, wx.EXPAND | wx.ALL, 5)
 
+        # Group checkboxes below the block list, hidden when there are none
+        main_sizer.Add(self.group_list, 0, wx.EXPAND | wx.ALL, 5)
+        self.group_list.Show(self.group_list.GetCount() > 0)
+
         # Unblock buttons at the bottom left
         unblock_sizer = wx.BoxSizer(wx.HORIZONTAL)
         unblock_sizer.Add(self.unblock_button, 0, wx.ALL, 5)
@@ -154,15 +193,78 @@ class BlockingApp(wx.Frame):
         self.panel.SetSizer(main_sizer)
         main_sizer.Fit(self)
 
+    def _set_blocked_list(self, sites):
+        self.blocked_list.Set(sites)
+        self.shown_sites = set(sites)
+
+    def _refresh_blocked_list(self):
+        self._set_blocked_list(self.pending.blocked_sites())
+
+    def _show_sites(self, sites):
+        """Appends the sites the list does not show yet, in one batch."""
+        new = [site for site in dict.fromkeys(sites) if site not in self.shown_sites]
+        if new:
+            self.blocked_list.Append(new)
+            self.shown_sites.update(new)
+
+    def _schedule_flush(self):
+        """Restarts the debounce window after an edit."""
+        if self.flush_timer and self.flush_timer.IsRunning():
+            self.flush_timer.Restart(FLUSH_DELAY_MS)
+        else:
+            self.flush_timer = wx.CallLater(FLUSH_DELAY_MS, self.flush_pending)
+
+    def flush_pending(self):
+        if self.flush_timer:
+            self.flush_timer.Stop()
+        if not self.pending:
+            return
+        if self.pending.flush() is None:
+            wx.MessageBox(
+                "The hosts file could not be updated.",
+                "Error",
+                wx.OK | wx.ICON_ERROR,
+            )
+            self._refresh_blocked_list()
+
+    def on_blocking_event(self, event):
+        """Patches the list with the sites an event reports."""
+        if not self:
+            return
+        if event.kind == RELOADED:
+            self._refresh_blocked_list()
+            return
+        is_blocked = self.pending.is_blocked
+        self._show_sites(site for site in event.sites if is_blocked(site))
+        if event.kind == LOADED:
+            return
+        hidden = {
+            site
+            for site in event.sites
+            if site in self.shown_sites and not is_blocked(site)
+        }
+        if hidden:
+            # One pass over the list, however many sites the event removed
+            self._set_blocked_list(
+                [site for site in self.blocked_list.GetItems() if site not in hidden]
+            )
+
+    def on_close(self, event):
+        self.flush_pending()
+        self.subscription.close()
+        event.Skip()
+
     def on_block_button(self, event):
         site_to_block = self.block_input.GetValue().strip()
+        if site_to_block:
+            site_to_block = normalize_site(site_to_block) or site_to_block
         if not site_to_block:
             wx.MessageBox(
                 "Please enter a website to block.",
                 "Info",
                 wx.OK | wx.ICON_INFORMATION,
             )
-        elif site_to_block in self.blocking_manager.get_blocked_sites():
+        elif self.pending.is_blocked(site_to_block):
             wx.MessageBox(
                 f"{site_to_block} is already in the block list.",
                 "Info",
@@ -174,10 +276,36 @@ class BlockingApp(wx.Frame):
                 "Info",
                 wx.OK | wx.ICON_INFORMATION,
             )
+        elif self.blocking_manager.allowlist.allows(site_to_block):
+            wx.MessageBox(
+                f"{site_to_block} is on the allowlist.",
+                "Info",
+                wx.OK | wx.ICON_INFORMATION,
+            )
         else:
-            self.blocking_manager.block(site_to_block)
-            self.blocked_list.Set(self.blocking_manager.get_blocked_sites())
+            self.pending.block(site_to_block)
+            self._show_sites([site_to_block])
             self.block_input.SetValue("")
+            self._schedule_flush()
+
+    def on_bulk_button(self, event):
+        # Modeless, so the main window keeps working while lines are checked
+        BulkBlockDialog(self, self.on_bulk_accepted).Show()
+
+    def on_bulk_accepted(self, sites):
+        for site in sites:
+            self.pending.block(site)
+        self.flush_pending()
+
+    def on_group_toggle(self, event):
+        group = self.group_list.GetString(event.GetInt())
+        # Group reference counts are computed against the written state
+        self.flush_pending()
+        if self.group_list.IsChecked(event.GetInt()):
+            self.blocking_manager.block_group(group)
+        else:
+            self.blocking_manager.unblock_group(group)
+        self.group_list.SetCheckedStrings(list(self.blocking_manager.active_groups))
 
     def on_unblock_button(self, event):
         selected_indices = self.blocked_list.GetSelections()
@@ -188,14 +316,18 @@ class BlockingApp(wx.Frame):
                 wx.OK | wx.ICON_INFORMATION,
             )
         else:
-            sites_to_unblock = [
-                self.blocked_list.GetString(i) for i in reversed(selected_indices)
-            ]
-            for site in sites_to_unblock:
-                self.blocking_manager.unblock(site)
-            self.blocked_list.Set(self.blocking_manager.get_blocked_sites())
+            for index in sorted(selected_indices, reverse=True):
+                site = self.blocked_list.GetString(index)
+                self.pending.unblock(site)
+                self.blocked_list.Delete(index)
+                self.shown_sites.discard(site)
+            self._schedule_flush()
 
     def on_unblock_all_button(self, event):
+        if not self.blocking_manager.loaded:
+            with wx.BusyCursor():
+                self.blocking_manager.wait_loaded()
+            self._refresh_blocked_list()
         sites_to_unblock = self.blocked_list.GetItems()
         if len(sites_to_unblock) > 0:
             dlg = wx.MessageDialog(
@@ -207,8 +339,10 @@ class BlockingApp(wx.Frame):
             result = dlg.ShowModal()
             if result == wx.ID_YES:
                 for site in sites_to_unblock:
-                    self.blocking_manager.unblock(site)
-                    self.blocked_list.Set(self.blocking_manager.get_blocked_sites())
+                    self.pending.unblock(site)
+                self.blocked_list.Clear()
+                self.shown_sites.clear()
+                self._schedule_flush()
             dlg.Destroy()
         else:
             wx.MessageBox(
@@ -218,6 +352,136 @@ class BlockingApp(wx.Frame):
             )
 
 
+class BulkFileDropTarget(wx.FileDropTarget):
+    def __init__(self, text_ctrl):
+        super().__init__()
+        self.text_ctrl = text_ctrl
+
+    def OnDropFiles(self, x, y, filenames):
+        for filename in filenames:
+            try:
+                with open(filename, "r", encoding="utf-8", errors="replace") as file:
+                    self.text_ctrl.AppendText(file.read())
+            except IOError as e:
+                wx.MessageBox(
+                    f"Could not read {filename}: {e}", "Error", wx.OK | wx.ICON_ERROR
+                )
+        return True
+
+
+class BulkBlockDialog(wx.Dialog):
+    """
+    Blocks many pasted or dropped domains at once.
+
+    Lines are validated on a worker thread that reports progress through
+    wx.CallAfter, so neither this dialog nor the main window freezes; the
+    accepted sites are handed to `on_accept` to be written in one go.
+    """
+
+    def __init__(self, parent, on_accept):
+        super().__init__(
+            parent,
+            title="Block many sites",
+            size=(500, 550),
+            style=wx.DEFAULT_DIALOG_STYLE | wx.RESIZE_BORDER,
+        )
+        self.on_accept = on_accept
+        self.cancel_event = None
+
+        self.hint = wx.StaticText(
+            self, label="Paste one site per line, or drop a blocklist file here."
+        )
+        self.text = wx.TextCtrl(self, style=wx.TE_MULTILINE | wx.TE_DONTWRAP)
+        self.text.SetForegroundColour(MOUNTAIN_SKY)
+        self.text.SetDropTarget(BulkFileDropTarget(self.text))
+        self.gauge = wx.Gauge(self, range=100)
+        self.status = wx.StaticText(self, label="")
+        self.rejected_list = wx.ListBox(self)
+        self.rejected_list.SetForegroundColour(MOUNTAIN_SKY)
+        self.block_button = GB.GradientButton(self, label="Block", size=(70, 30))
+        self.block_button.Bind(wx.EVT_BUTTON, self.on_block)
+        self.cancel_button = GB.GradientButton(self, label="Cancel", size=(70, 30))
+        self.cancel_button.Bind(wx.EVT_BUTTON, self.on_cancel)
+        parent._colour_gradient_button(self.block_button)
+        parent._colour_gradient_button(self.cancel_button)
+        self.Bind(wx.EVT_CLOSE, self.on_close)
+
+        sizer = wx.BoxSizer(wx.VERTICAL)
+        sizer.Add(self.hint, 0, wx.ALL, 5)
+        sizer.Add(self.text, 2, wx.EXPAND | wx.ALL, 5)
+        sizer.Add(self.gauge, 0, wx.EXPAND | wx.ALL, 5)
+        sizer.Add(self.status, 0, wx.ALL, 5)
+        sizer.Add(self.rejected_list, 1, wx.EXPAND | wx.ALL, 5)
+        button_sizer = wx.BoxSizer(wx.HORIZONTAL)
+        button_sizer.Add(self.block_button, 0, wx.ALL, 5)
+        button_sizer.Add(self.cancel_button, 0, wx.ALL, 5)
+        sizer.Add(button_sizer, 0, wx.ALIGN_RIGHT)
+        self.SetSizer(sizer)
+
+    def on_block(self, event):
+        if self.cancel_event:
+            return
+        lines = self.text.GetValue().splitlines()
+        if not lines:
+            wx.MessageBox(
+                "Please paste the websites to block.",
+                "Info",
+                wx.OK | wx.ICON_INFORMATION,
+            )
+            return
+        self.cancel_event = threading.Event()
+        self.text.Disable()
+        self.block_button.Disable()
+        self.rejected_list.Clear()
+        self.gauge.SetValue(0)
+        threading.Thread(
+            target=self._validate, args=(lines, self.cancel_event), daemon=True
+        ).start()
+
+    def _validate(self, lines, cancel_event):
+        result = validate_lines(
+            lines,
+            lambda done, total: wx.CallAfter(self._on_progress, done, total),
+            cancel_event,
+        )
+        wx.CallAfter(self._on_done, result, cancel_event)
+
+    def _on_progress(self, done, total):
+        if self:
+            self.gauge.SetValue(done * 100 // max(total, 1))
+            self.status.SetLabel(f"Checked {done} of {total} lines...")
+
+    def _on_done(self, result, cancel_event):
+        if not self or cancel_event is not self.cancel_event:
+            return
+        self.cancel_event = None
+        self.text.Enable()
+        self.block_button.Enable()
+        if result is None:
+            self.gauge.SetValue(0)
+            self.status.SetLabel("Cancelled.")
+            return
+        self.on_accept(result.accepted)
+        self.rejected_list.Set(result.rejected)
+        self.status.SetLabel(
+            f"Blocked {len(result.accepted)} sites, "
+            f"rejected {len(result.rejected)} lines."
+        )
+        if not result.rejected:
+            self.Close()
+
+    def on_cancel(self, event):
+        if self.cancel_event:
+            self.cancel_event.set()
+        else:
+            self.Close()
+
+    def on_close(self, event):
+        if self.cancel_event:
+            self.cancel_event.set()
+        self.Destroy()
+
+
 def run_gui():
     app = wx.App()
     frame = BlockingApp(None, "Blanc")
@@ -0,0 +1,141 @@
+import asyncio
+import datetime
+import html
+import time
+
+from utils import QUOTES_RELATIVE_PATH
+from utils import get_quote
+
+LANDING_PORT = 80
+# How long an idle keep-alive connection is held open
+KEEP_ALIVE_TIMEOUT = 15.0
+MAX_HEADER_SIZE = 8192
+MAX_BODY_SIZE = 65536
+
+PAGE_TEMPLATE = """<!DOCTYPE html>
+<html lang="en">
+<head>
+<meta charset="utf-8">
+<title>Blocked by Blanc</title>
+<style>
+body {{ background: #07263d; color: #f5ebdf; font-family: sans-serif;
+       display: flex; align-items: center; justify-content: center;
+       min-height: 100vh; margin: 0; text-align: center; }}
+blockquote {{ font-size: 1.3em; max-width: 36em; margin: 2em auto; }}
+</style>
+</head>
+<body>
+<main>
+<h1>This site is blocked</h1>
+<blockquote>{quote}</blockquote>
+</main>
+</body>
+</html>
+"""
+
+
+def render_page(quote: str) -> bytes:
+    """Renders the landing page body around a quote from get_quote()."""
+    quote = html.escape(quote).replace("\n", "<br>\n")
+    return PAGE_TEMPLATE.format(quote=quote).encode("utf-8")
+
+
+def _response(body: bytes, head: bool, keep_alive: bool) -> bytes:
+    headers = (
+        "HTTP/1.1 200 OK\r\n"
+        "Content-Type: text/html; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        "Cache-Control: no-store\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+        "\r\n"
+    ).encode("ascii")
+    return headers if head else headers + body
+
+
+def _next_midnight() -> float:
+    tomorrow = datetime.date.today() + datetime.timedelta(days=1)
+    return datetime.datetime.combine(tomorrow, datetime.time()).timestamp()
+
+
+class LandingPageServer:
+    """
+    Serves a static "this site is blocked" page on the redirect address.
+
+    The page, with the quote of the day, is rendered once per day and every
+    response variant is kept as ready-to-send bytes, so a request costs one
+    header read and one write. Connections are kept alive, which absorbs
+    the bursts of retries browsers send for blocked assets. Only plain HTTP
+    can be answered; HTTPS requests still fail at the TLS handshake.
+    """
+
+    def __init__(self, host, port=LANDING_PORT, quote_path=QUOTES_RELATIVE_PATH):
+        self.host = host
+        self.port = port
+        self.quote_path = quote_path
+        self._responses = {}  # {(head, keep_alive): response bytes}
+        self._expires = 0.0
+        self._server = None
+
+    def responses(self) -> dict:
+        """Returns the pre-rendered responses, re-rendering them once a day."""
+        if time.time() >= self._expires:
+            body = render_page(get_quote(self.quote_path))
+            self._responses = {
+                (head, keep_alive): _response(body, head, keep_alive)
+                for head in (False, True)
+                for keep_alive in (False, True)
+            }
+            self._expires = _next_midnight()
+        return self._responses
+
+    async def _handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    header = await asyncio.wait_for(
+                        reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT
+                    )
+                except (
+                    asyncio.IncompleteReadError,
+                    asyncio.LimitOverrunError,
+                    asyncio.TimeoutError,
+                ):
+                    break
+                request_line, _, fields = header.lower().partition(b"\r\n")
+                version = request_line.rsplit(b" ", 1)[-1]
+                if version == b"http/1.1":
+                    keep_alive = b"connection: close" not in fields
+                else:
+                    keep_alive = b"connection: keep-alive" in fields
+                length = 0
+                if b"content-length:" in fields:
+                    value = fields.split(b"content-length:", 1)[1].split(b"\r\n", 1)
+                    try:
+                        length = int(value[0])
+                    except ValueError:
+                        break
+                if length > MAX_BODY_SIZE:
+                    keep_alive = False
+                elif length:
+                    await reader.readexactly(length)
+                head = request_line.startswith(b"head ")
+                writer.write(self.responses()[head, keep_alive])
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def start(self):
+        self.responses()
+        self._server = await asyncio.start_server(
+            self._handle, self.host, self.port, limit=MAX_HEADER_SIZE
+        )
+        return self._server
+
+    async def serve_forever(self):
+        server = await self.start()
+        async with server:
+            await server.serve_forever()
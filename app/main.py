@@ -2,27 +2,223 @@ import argparse
 import os
 
 from block import BlockingManager
+from commands import AddScheduleCommand
+from commands import AllowSiteCommand
+from commands import AddSubscriptionCommand
+from commands import ApplyCommand
+from commands import BlockGroupCommand
+from commands import BlockMatchingCommand
 from commands import BlockSiteCommand
+from commands import CheckSitesCommand
+from commands import DisallowSiteCommand
+from commands import ExportCommand
+from commands import ListAllowlistCommand
 from commands import ListBlockedSitesCommand
+from commands import ListGroupsCommand
+from commands import ListSchedulesCommand
+from commands import ListSubscriptionsCommand
+from commands import MergeCommand
+from commands import PruneCommand
+from commands import PurgeAllowedCommand
+from commands import PushFleetCommand
+from commands import RefreshSubscriptionsCommand
+from commands import RemoveSchedulesCommand
+from commands import RemoveSubscriptionCommand
 from commands import RestoreHostsCommand
+from commands import RunSchedulesCommand
+from commands import ServeLandingPageCommand
+from commands import SetGroupCommand
+from commands import SetRedirectCommand
+from commands import ShowRedirectCommand
+from commands import UnblockGroupCommand
+from commands import UnblockMatchingCommand
 from commands import UnblockSiteCommand
 from commands import UnblockAllSitesCommand
+from commands import WhyBlockedCommand
+from fleet import FLEET_RETRIES
+from fleet import FLEET_WORKERS
+from landing import LANDING_PORT
+from merge import MERGE_MEMORY_MB
+from prune import PRUNE_CONCURRENCY
 from utils import copy_file, get_hosts_path
 
 
+def non_negative_int(value):
+    number = int(value)
+    if number < 0:
+        raise argparse.ArgumentTypeError(f"{value} is negative")
+    return number
+
+
 def run_cli():
     parser = argparse.ArgumentParser(
         description="Block, unblock or list websites via the hosts file."
     )
     parser.add_argument(
         "action",
-        choices=["block", "unblock", "list", "restore"],
+        choices=[
+            "block",
+            "unblock",
+            "list",
+            "restore",
+            "group",
+            "schedule",
+            "watch",
+            "export",
+            "subscribe",
+            "refresh",
+            "apply",
+            "push",
+            "check",
+            "allow",
+            "purge",
+            "serve",
+            "redirect",
+            "prune",
+            "why",
+            "merge",
+        ],
         help="Actions to perform.",
     )
     parser.add_argument(
         "target",
         nargs="?",
-        help="The website to block/unblock (e.g., example.com) or '--all'.",
+        help="The website to block/unblock/explain (e.g., example.com) or '--all'. "
+        "With 'block --match', the list of candidate sites (default: standard "
+        "input).",
+    )
+    parser.add_argument(
+        "--group",
+        help="Block/unblock every site of the named group at once.",
+    )
+    parser.add_argument(
+        "--sites",
+        nargs="*",
+        help="With 'group', the sites making up the group (none deletes it). "
+        "With 'redirect', the sites to use the strategy for.",
+    )
+    parser.add_argument(
+        "--days",
+        help="With 'schedule', the weekdays to block on (e.g., mon-fri).",
+    )
+    parser.add_argument("--start", help="With 'schedule', the window start (HH:MM).")
+    parser.add_argument("--end", help="With 'schedule', the window end (HH:MM).")
+    parser.add_argument(
+        "--format",
+        help="With 'export' or 'merge': hosts, dnsmasq, unbound, adblock or json. "
+        "With 'list': text, json, ndjson or csv.",
+    )
+    parser.add_argument(
+        "--match",
+        help="With 'list', only sites matching this glob (e.g., '*.cdn.*'). "
+        "With 'unblock', unblock every matching site; with 'block', block the "
+        "matching sites of the input list.",
+    )
+    parser.add_argument(
+        "--regex",
+        action="store_true",
+        help="Treat the --match pattern as a regular expression.",
+    )
+    parser.add_argument(
+        "--sort", action="store_true", help="With 'list', sort the sites."
+    )
+    parser.add_argument(
+        "--limit",
+        type=non_negative_int,
+        help="With 'list', the maximum number of sites.",
+    )
+    parser.add_argument(
+        "--offset",
+        type=non_negative_int,
+        default=0,
+        help="With 'list', the sites to skip.",
+    )
+    parser.add_argument(
+        "--invert",
+        action="store_true",
+        help="With 'check', print the domains that are not blocked.",
+    )
+    parser.add_argument(
+        "--exact",
+        action="store_true",
+        help="With 'check', ignore blocks of parent domains.",
+    )
+    parser.add_argument(
+        "--count",
+        action="store_true",
+        help="With 'list', only print the number of matching sites.",
+    )
+    parser.add_argument(
+        "--output",
+        help="With 'export' or 'merge', the file to write (default: standard "
+        "output).",
+    )
+    parser.add_argument(
+        "--collapse",
+        action="store_true",
+        help="With 'export', drop subdomains covered by a blocked parent domain. "
+        "With 'merge', drop subdomains of listed parent domains.",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="With 'apply', 'push', 'purge', 'prune' or --match, only show what "
+        "would change.",
+    )
+    parser.add_argument(
+        "--targets",
+        nargs="+",
+        help="With 'push', the hosts files to reconcile (e.g., mounted shares).",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=FLEET_WORKERS,
+        help="With 'push', how many targets to update concurrently.",
+    )
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=FLEET_RETRIES,
+        help="With 'push', how many times to retry a failed target.",
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=LANDING_PORT,
+        help="With 'serve', the port of the blocked page server.",
+    )
+    parser.add_argument(
+        "--resolver",
+        help="With 'prune', the DNS server as host[:port] (default: the system's, "
+        "required if it cannot be found).",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=PRUNE_CONCURRENCY,
+        help="With 'prune', how many DNS lookups to run at once.",
+    )
+    parser.add_argument(
+        "--inputs",
+        nargs="+",
+        help="With 'merge', the blocklist files to combine ('-' for standard input).",
+    )
+    parser.add_argument(
+        "--memory",
+        type=int,
+        default=MERGE_MEMORY_MB,
+        help="With 'merge', roughly how many MiB of sites to hold in memory.",
+    )
+    parser.add_argument(
+        "--source",
+        help="With 'subscribe', the blocklist URL or file to subscribe to.",
+    )
+    parser.add_argument(
+        "--remove",
+        action="store_true",
+        help="With 'schedule', 'subscribe' or 'allow', remove the schedules, "
+        "subscription or allowlist rule.",
     )
 
     args = parser.parse_args()
@@ -37,7 +233,13 @@ def run_cli():
     blocking_manager = BlockingManager(hosts_file)
 
     if args.action == "block":
-        if args.target:
+        if args.group:
+            command = BlockGroupCommand(blocking_manager, args.group)
+        elif args.match:
+            command = BlockMatchingCommand(
+                blocking_manager, args.match, args.target, args.regex, args.dry_run
+            )
+        elif args.target:
             if args.target == "--all":
                 print("Blocking access to all sites is not supported yet.")
             else:
@@ -46,20 +248,133 @@ def run_cli():
             print("Please specify a website to block.")
 
     elif args.action == "unblock":
-        if args.target:
+        if args.group:
+            command = UnblockGroupCommand(blocking_manager, args.group)
+        elif args.match:
+            command = UnblockMatchingCommand(
+                blocking_manager, args.match, args.regex, args.dry_run
+            )
+        elif args.target:
             if args.target == "--all":
-                command = UnblockAllSitesCommand(args.sites, blocking_manager)
+                command = UnblockAllSitesCommand(blocking_manager)
             else:
                 command = UnblockSiteCommand(blocking_manager, args.target)
         else:
             print("Please specify a website to unblock.")
 
     elif args.action == "list":
-        command = ListBlockedSitesCommand(blocking_manager)
+        command = ListBlockedSitesCommand(
+            blocking_manager,
+            args.format,
+            args.limit,
+            args.offset,
+            args.match,
+            args.regex,
+            args.sort,
+            args.count,
+        )
 
     elif args.action == "restore":
         command = RestoreHostsCommand(blocking_manager)
 
+    elif args.action == "group":
+        if args.target and args.sites is not None:
+            command = SetGroupCommand(blocking_manager, args.target, args.sites)
+        else:
+            command = ListGroupsCommand(blocking_manager)
+
+    elif args.action == "schedule":
+        target = f"group:{args.group}" if args.group else args.target
+        if not target:
+            command = ListSchedulesCommand(blocking_manager)
+        elif args.remove:
+            command = RemoveSchedulesCommand(blocking_manager, target)
+        elif args.days and args.start and args.end:
+            command = AddScheduleCommand(
+                blocking_manager, target, args.days, args.start, args.end
+            )
+        else:
+            print("Please specify --days, --start and --end for the schedule.")
+
+    elif args.action == "watch":
+        command = RunSchedulesCommand(blocking_manager)
+
+    elif args.action == "export":
+        command = ExportCommand(
+            blocking_manager, args.format, args.output, args.collapse
+        )
+
+    elif args.action == "subscribe":
+        if not args.target:
+            command = ListSubscriptionsCommand(blocking_manager)
+        elif args.remove:
+            command = RemoveSubscriptionCommand(blocking_manager, args.target)
+        elif args.source:
+            command = AddSubscriptionCommand(blocking_manager, args.target, args.source)
+        else:
+            print("Please specify the blocklist to subscribe to with --source.")
+
+    elif args.action == "refresh":
+        command = RefreshSubscriptionsCommand(blocking_manager, args.target)
+
+    elif args.action == "apply":
+        if args.target:
+            command = ApplyCommand(blocking_manager, args.target, args.dry_run)
+        else:
+            print("Please specify the file listing the sites to block.")
+
+    elif args.action == "push":
+        if args.target and args.targets:
+            command = PushFleetCommand(
+                args.target, args.targets, args.workers, args.retries, args.dry_run
+            )
+        else:
+            print("Please specify the file listing the sites and --targets.")
+
+    elif args.action == "check":
+        command = CheckSitesCommand(
+            blocking_manager, args.target, args.invert, args.exact
+        )
+
+    elif args.action == "allow":
+        if not args.target:
+            command = ListAllowlistCommand(blocking_manager)
+        elif args.remove:
+            command = DisallowSiteCommand(blocking_manager, args.target)
+        else:
+            command = AllowSiteCommand(blocking_manager, args.target)
+
+    elif args.action == "purge":
+        command = PurgeAllowedCommand(blocking_manager, args.dry_run)
+
+    elif args.action == "serve":
+        command = ServeLandingPageCommand(blocking_manager, args.port)
+
+    elif args.action == "redirect":
+        if args.target:
+            command = SetRedirectCommand(blocking_manager, args.target, args.sites)
+        else:
+            command = ShowRedirectCommand(blocking_manager)
+
+    elif args.action == "prune":
+        command = PruneCommand(
+            blocking_manager, args.resolver, args.concurrency, args.dry_run
+        )
+
+    elif args.action == "merge":
+        if args.inputs:
+            command = MergeCommand(
+                args.inputs, args.output, args.format, args.collapse, args.memory
+            )
+        else:
+            print("Please specify the blocklists to merge with --inputs.")
+
+    elif args.action == "why":
+        if args.target:
+            command = WhyBlockedCommand(blocking_manager, args.target)
+        else:
+            print("Please specify a website to explain.")
+
     if command:
         command.execute()
 
@@ -0,0 +1,121 @@
+import heapq
+import os
+import tempfile
+
+from subscriptions import parse_blocklist
+
+MERGE_MEMORY_MB = 64
+# Rough cost of holding one site in a run besides its characters: the str
+# object header and its slot in the list being sorted
+SITE_OVERHEAD = 64
+# Runs merged at once; each open run only costs its read buffer
+MERGE_FAN_IN = 64
+
+
+def domain_key(site: str) -> str:
+    """
+    Orders a site by its labels from the top-level domain down.
+
+    The trailing dot makes every subdomain's key start with its parent's,
+    so a domain and all of its subdomains sort next to each other.
+    """
+    return ".".join(reversed(site.split("."))) + "."
+
+
+def site_of_key(key: str) -> str:
+    return ".".join(reversed(key[:-1].split(".")))
+
+
+def _unique(lines):
+    previous = None
+    for line in lines:
+        if line != previous:
+            previous = line
+            yield line
+
+
+def _write_run(keys, temp_dir):
+    """Spills sorted keys to a new run file, one per line."""
+    fd, path = tempfile.mkstemp(suffix=".run", dir=temp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as file:
+        file.writelines(f"{key}\n" for key in _unique(keys))
+    return path
+
+
+def _merged_keys(paths):
+    """Yields the distinct keys of sorted run files in order, then deletes them."""
+    files = [open(path, "r", encoding="utf-8") for path in paths]
+    try:
+        # A newline sorts before any character of a key, so whole lines
+        # merge in key order
+        yield from _unique(line[:-1] for line in heapq.merge(*files))
+    finally:
+        for file in files:
+            file.close()
+        for path in paths:
+            os.remove(path)
+
+
+def merge_blocklists(
+    sources, collapse=False, memory_mb=MERGE_MEMORY_MB, temp_dir=None, rejected=None
+):
+    """
+    Combines blocklists into one sorted list of distinct sites, out of core.
+
+    Sites are parsed and normalized like subscriptions, gathered into runs
+    that fit the memory budget, sorted and spilled to temporary files, then
+    k-way merged, MERGE_FAN_IN runs at a time. Peak memory depends on the
+    budget, not on the size of the input; input that fits the budget is
+    never spilled.
+
+    Args:
+        sources (Iterable[Iterable[str]]): The lines of each blocklist, e.g.
+            open files, in hosts or plain domain format.
+        collapse (bool): Drop sites whose parent domain is listed too. The
+            output is then ordered by domain (labels from the right), which
+            keeps every domain next to its subdomains.
+        memory_mb (int): Roughly how many MiB of sites to hold at once.
+        temp_dir (str, optional): Where runs are spilled; defaults to the
+            system temporary directory.
+        rejected (list, optional): Collects the names that are not valid
+            sites, see subscriptions.parse_blocklist.
+
+    Yields:
+        str: Each distinct site, in order.
+    """
+    budget = max(memory_mb, 1) << 20
+    key = domain_key if collapse else str
+    with tempfile.TemporaryDirectory(prefix="blanc-all-", dir=temp_dir) as spill:
+        runs = []
+        run, used = [], 0
+        for source in sources:
+            for site in parse_blocklist(source, rejected):
+                site_key = key(site)
+                run.append(site_key)
+                used += len(site_key) + SITE_OVERHEAD
+                if used >= budget:
+                    run.sort()
+                    runs.append(_write_run(run, spill))
+                    run, used = [], 0
+        run.sort()
+        if runs:
+            if run:
+                runs.append(_write_run(run, spill))
+            run = None
+            while len(runs) > MERGE_FAN_IN:
+                runs = [
+                    _write_run(_merged_keys(runs[start:start + MERGE_FAN_IN]), spill)
+                    for start in range(0, len(runs), MERGE_FAN_IN)
+                ]
+            keys = _merged_keys(runs)
+        else:
+            keys = _unique(run)
+        if not collapse:
+            yield from keys
+            return
+        kept = None
+        for site_key in keys:
+            # Subdomains follow their parent's key and start with it
+            if kept is None or not site_key.startswith(kept):
+                kept = site_key
+                yield site_of_key(site_key)
@@ -0,0 +1,64 @@
+class PendingChanges:
+    """
+    Blocks and unblocks staged in memory until they are flushed together.
+
+    Staging the opposite of a pending change cancels it, so a site blocked
+    and unblocked again before the flush never touches the hosts file.
+    """
+
+    def __init__(self, blocking_manager):
+        self.blocking_manager = blocking_manager
+        self._changes = {}  # {site: True to block, False to unblock}
+
+    def __bool__(self):
+        return bool(self._changes)
+
+    def is_blocked(self, site) -> bool:
+        """Whether the site will be blocked once the changes are flushed."""
+        change = self._changes.get(site)
+        if change is None:
+            return self.blocking_manager.contains(site)
+        return change
+
+    def block(self, site):
+        if self._changes.get(site) is False:
+            del self._changes[site]
+        elif not self.blocking_manager.contains(site):
+            self._changes[site] = True
+
+    def unblock(self, site):
+        if self._changes.get(site) is True:
+            del self._changes[site]
+        elif self.blocking_manager.contains(site):
+            self._changes[site] = False
+
+    def blocked_sites(self) -> list[str]:
+        """Returns the blocked sites as they will be after the flush."""
+        changes = self._changes
+        contains = self.blocking_manager.contains
+        sites = [
+            site
+            for site in self.blocking_manager.iter_blocked()
+            if changes.get(site) is not False
+        ]
+        sites.extend(
+            site for site, block in changes.items() if block and not contains(site)
+        )
+        return sites
+
+    def flush(self):
+        """
+        Writes every staged change with a single hosts file write.
+
+        Returns:
+            tuple or None: The (added, removed) sites, or None on failure,
+            in which case the changes stay staged.
+        """
+        if not self._changes:
+            return [], set()
+        add = [site for site, block in self._changes.items() if block]
+        remove = [site for site, block in self._changes.items() if not block]
+        result = self.blocking_manager.apply_changes(add=add, remove=remove)
+        if result is not None:
+            self._changes.clear()
+        return result
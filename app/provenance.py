@@ -0,0 +1,155 @@
+MANUAL = "manual"
+SUBSCRIPTION_PREFIX = "subscription:"
+IMPORT_PREFIX = "import:"
+SCHEDULE_PREFIX = "schedule:"
+
+
+def is_saved_source(source) -> bool:
+    """
+    Whether a source's references must be saved: groups and subscriptions
+    are rebuilt from their own state; manual blocks, imports and the sites
+    a schedule window blocked are not.
+    """
+    return source == MANUAL or source.startswith((IMPORT_PREFIX, SCHEDULE_PREFIX))
+
+
+class SourceRefs:
+    """
+    Which sources (manual blocks, imports, schedules, groups,
+    subscriptions) hold each site.
+
+    Every source gets a small integer ID, reused once the source holds
+    nothing, and a site stores the sources holding it as a bit mask of
+    those IDs; the number of set bits is its reference count. Each source
+    also keeps its own members, so dropping a source visits only its sites.
+
+    Changes are planned first and committed once the hosts file write they
+    lead to has succeeded, like the rest of BlockingManager's state.
+    """
+
+    def __init__(self):
+        self._ids = {}  # {source: bit}
+        self._names = {}  # {bit: source}
+        self._masks = {}  # {site: mask of the bits of the sources holding it}
+        self._members = {}  # {bit: set of sites}
+
+    def __contains__(self, site):
+        return site in self._masks
+
+    def _bit(self, source):
+        bit = self._ids.get(source)
+        if bit is None:
+            bit = 0
+            while bit in self._names:
+                bit += 1
+            self._ids[source] = bit
+            self._names[bit] = source
+            self._members[bit] = set()
+        return bit
+
+    def sources(self, site) -> list[str]:
+        """Returns the sources holding a site, sorted."""
+        mask = self._masks.get(site, 0)
+        return sorted(name for bit, name in self._names.items() if mask >> bit & 1)
+
+    def members(self, source) -> set[str]:
+        bit = self._ids.get(source)
+        return set() if bit is None else set(self._members[bit])
+
+    def plan(self, add=(), remove=(), blocked=()):
+        """
+        Computes the masks of the sites that sources take or release.
+
+        Only the given sites are visited. A site in `blocked` that no source
+        holds was blocked by hand, so it starts out held by MANUAL and
+        survives the release of any source that takes it over later.
+
+        Args:
+            add (Iterable[tuple]): (source, sites) pairs to take.
+            remove (Iterable[tuple]): (source, sites) pairs to release.
+            blocked (Container[str]): The currently blocked sites.
+
+        Returns:
+            dict: {site: new mask}; 0 means no source holds it any more.
+        """
+        current = self._masks
+        masks = {}
+
+        def mask_of(site):
+            mask = masks.get(site)
+            if mask is None:
+                mask = current.get(site, 0)
+                if not mask and site in blocked:
+                    mask = 1 << self._bit(MANUAL)
+            return mask
+
+        for source, sites in add:
+            bit = 1 << self._bit(source)
+            for site in sites:
+                masks[site] = mask_of(site) | bit
+        for source, sites in remove:
+            bit = 1 << self._bit(source)
+            for site in sites:
+                masks[site] = mask_of(site) & ~bit
+        return masks
+
+    def commit(self, masks) -> bool:
+        """
+        Stores planned masks.
+
+        Returns:
+            bool: Whether the references that need saving changed (see
+            is_saved_source and to_state).
+        """
+        saved = 0
+        for source, bit in self._ids.items():
+            if is_saved_source(source):
+                saved |= 1 << bit
+        changed = False
+        for site, mask in masks.items():
+            old = self._masks.get(site, 0)
+            difference = old ^ mask
+            if not difference:
+                continue
+            if difference & saved:
+                changed = True
+            for bit, members in self._members.items():
+                if difference >> bit & 1:
+                    if mask >> bit & 1:
+                        members.add(site)
+                    else:
+                        members.discard(site)
+            if mask:
+                self._masks[site] = mask
+            else:
+                del self._masks[site]
+        for bit in [bit for bit, members in self._members.items() if not members]:
+            del self._ids[self._names.pop(bit)]
+            del self._members[bit]
+        return changed
+
+    def to_state(self):
+        """
+        The manual, import and schedule references worth saving.
+
+        Group and subscription references are rebuilt from their own state,
+        and a blocked site held by no source counts as manual anyway, so
+        only manual references to sites that another source holds too are
+        kept.
+
+        Returns:
+            tuple: (manual sites, {other saved source: sites}), sorted.
+        """
+        manual = []
+        saved = {}
+        for bit, source in sorted(self._names.items(), key=lambda item: item[1]):
+            if source == MANUAL:
+                only_manual = 1 << bit
+                manual = sorted(
+                    site
+                    for site in self._members[bit]
+                    if self._masks[site] != only_manual
+                )
+            elif is_saved_source(source):
+                saved[source] = sorted(self._members[bit])
+        return manual, saved
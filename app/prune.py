@@ -0,0 +1,343 @@
+import asyncio
+import json
+import os
+import random
+import struct
+import time
+
+try:
+    import winreg
+except ImportError:  # not Windows
+    winreg = None
+
+DNS_PORT = 53
+DNS_TIMEOUT = 2.0
+DNS_RETRIES = 2
+PRUNE_CONCURRENCY = 256
+TCPIP_PARAMETERS = r"SYSTEM\CurrentControlSet\Services\Tcpip\Parameters"
+DNS_CACHE_FILE_NAME = "dns-cache.json"
+# Bounds on how long a lookup result is trusted, whatever TTL it carried
+MIN_CACHE_TTL = 60
+MAX_CACHE_TTL = 86400
+NEGATIVE_TTL = 3600  # when an NXDOMAIN answer carries no SOA record
+
+ALIVE = "alive"
+DEAD = "dead"
+UNKNOWN = "unknown"
+
+RCODE_NOERROR = 0
+RCODE_NXDOMAIN = 3
+TYPE_A = 1
+TYPE_SOA = 6
+
+
+def _registry_nameservers(key):
+    """Yields the static, then the DHCP assigned DNS servers of a Tcpip key."""
+    for name in ("NameServer", "DhcpNameServer"):
+        try:
+            value, _ = winreg.QueryValueEx(key, name)
+        except OSError:
+            continue
+        yield from str(value).replace(",", " ").split()
+
+
+def _windows_resolver():
+    """
+    Returns the first DNS server configured in the registry, globally or on
+    any network interface, if there is one.
+    """
+    try:
+        parameters = winreg.OpenKey(winreg.HKEY_LOCAL_MACHINE, TCPIP_PARAMETERS)
+    except OSError:
+        return None
+    with parameters:
+        for server in _registry_nameservers(parameters):
+            return server
+        try:
+            interfaces = winreg.OpenKey(parameters, "Interfaces")
+        except OSError:
+            return None
+        with interfaces:
+            index = 0
+            while True:
+                try:
+                    name = winreg.EnumKey(interfaces, index)
+                except OSError:
+                    return None
+                index += 1
+                try:
+                    with winreg.OpenKey(interfaces, name) as interface:
+                        for server in _registry_nameservers(interface):
+                            return server
+                except OSError:
+                    continue
+
+
+def system_resolver() -> str | None:
+    """
+    Returns the system's DNS server: from the registry on Windows, otherwise
+    the first nameserver of /etc/resolv.conf. None if there is none.
+    """
+    if winreg:
+        return _windows_resolver()
+    try:
+        with open("/etc/resolv.conf", "r") as file:
+            for line in file:
+                parts = line.split()
+                if len(parts) >= 2 and parts[0] == "nameserver":
+                    return parts[1]
+    except OSError:
+        pass
+    return None
+
+
+def parse_resolver(resolver: str | None):
+    """
+    Turns 'host', 'host:port' or '[v6]:port' into a (host, port) pair.
+
+    Raises:
+        ValueError: If no resolver is given and the system's cannot be found.
+    """
+    if not resolver:
+        resolver = system_resolver()
+        if resolver is None:
+            raise ValueError("The system's DNS server could not be found.")
+        return resolver, DNS_PORT
+    if resolver.startswith("["):
+        host, _, port = resolver[1:].partition("]:")
+        return host.rstrip("]"), int(port or DNS_PORT)
+    if resolver.count(":") == 1:
+        host, port = resolver.split(":")
+        return host, int(port)
+    return resolver, DNS_PORT
+
+
+def build_query(query_id: int, name: str) -> bytes:
+    """
+    Encodes a recursive A query for a name.
+
+    Raises:
+        ValueError: If the name cannot be encoded as DNS labels.
+    """
+    labels = name.rstrip(".").split(".")
+    question = b""
+    for label in labels:
+        encoded = label.encode("ascii")
+        if not 0 < len(encoded) < 64:
+            raise ValueError(f"Invalid DNS name: {name}")
+        question += bytes((len(encoded),)) + encoded
+    header = struct.pack("!HHHHHH", query_id, 0x0100, 1, 0, 0, 0)
+    return header + question + b"\0" + struct.pack("!HH", TYPE_A, 1)
+
+
+def _skip_name(data: bytes, offset: int) -> int:
+    while True:
+        length = data[offset]
+        if length == 0:
+            return offset + 1
+        if length & 0xC0 == 0xC0:
+            return offset + 2
+        offset += length + 1
+
+
+def parse_response(data: bytes):
+    """
+    Extracts what a pruning decision needs from a DNS response.
+
+    Returns:
+        tuple: (query id, response code, TTL or None); for NXDOMAIN the TTL
+        is the negative caching time of the SOA record, if present.
+
+    Raises:
+        IndexError, struct.error: If the response is truncated.
+    """
+    query_id, flags, questions, answers, authorities, _ = struct.unpack_from(
+        "!HHHHHH", data
+    )
+    offset = 12
+    for _ in range(questions):
+        offset = _skip_name(data, offset) + 4
+    ttl = None
+    for _ in range(answers + authorities):
+        offset = _skip_name(data, offset)
+        record_type, _, record_ttl, length = struct.unpack_from("!HHIH", data, offset)
+        offset += 10
+        if record_type == TYPE_SOA:
+            # The SOA minimum field is the negative caching time
+            (minimum,) = struct.unpack_from("!I", data, offset + length - 4)
+            record_ttl = min(record_ttl, minimum)
+        offset += length
+        ttl = record_ttl if ttl is None else min(ttl, record_ttl)
+    return query_id, flags & 0x000F, ttl
+
+
+class _DnsProtocol(asyncio.DatagramProtocol):
+    def __init__(self):
+        self.pending = {}  # {query id: future}
+
+    def datagram_received(self, data, addr):
+        try:
+            query_id, rcode, ttl = parse_response(data)
+        except (IndexError, struct.error):
+            return
+        future = self.pending.pop(query_id, None)
+        if future is not None and not future.done():
+            future.set_result((rcode, ttl))
+
+    def error_received(self, exc):
+        pass
+
+
+class AsyncResolver:
+    """
+    A minimal asyncio DNS client multiplexing queries over one UDP socket.
+
+    Responses are matched to queries by their random 16-bit id, so any
+    number of lookups can be in flight without a socket each.
+    """
+
+    def __init__(self, resolver=None, timeout=DNS_TIMEOUT, retries=DNS_RETRIES):
+        self.address = parse_resolver(resolver)
+        self.timeout = timeout
+        self.retries = retries
+        self._transport = None
+        self._protocol = None
+
+    async def __aenter__(self):
+        loop = asyncio.get_running_loop()
+        self._transport, self._protocol = await loop.create_datagram_endpoint(
+            _DnsProtocol, remote_addr=self.address
+        )
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self._transport.close()
+
+    async def query(self, name: str):
+        """
+        Looks up the A record of a name.
+
+        Returns:
+            tuple or None: (response code, TTL or None), or None if every
+            attempt timed out or the name cannot be queried.
+        """
+        pending = self._protocol.pending
+        loop = asyncio.get_running_loop()
+        for _ in range(self.retries + 1):
+            query_id = random.getrandbits(16)
+            while query_id in pending:
+                query_id = random.getrandbits(16)
+            try:
+                packet = build_query(query_id, name)
+            except (ValueError, UnicodeError):
+                return None
+            future = pending[query_id] = loop.create_future()
+            self._transport.sendto(packet)
+            try:
+                return await asyncio.wait_for(future, self.timeout)
+            except asyncio.TimeoutError:
+                pending.pop(query_id, None)
+        return None
+
+
+class DnsCache:
+    """Lookup outcomes kept until their TTL runs out, saved as JSON."""
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}  # {name: [status, expiry timestamp]}
+        if path:
+            try:
+                with open(path, "r", encoding="utf-8") as file:
+                    self.entries = json.load(file)
+            except FileNotFoundError:
+                pass
+            except (IOError, json.JSONDecodeError) as e:
+                print(f"Error reading the DNS cache: {e}")
+
+    def get(self, name, now):
+        entry = self.entries.get(name)
+        if entry is not None and entry[1] > now:
+            return entry[0]
+        return None
+
+    def put(self, name, status, ttl, now):
+        ttl = min(max(ttl, MIN_CACHE_TTL), MAX_CACHE_TTL)
+        self.entries[name] = [status, now + ttl]
+
+    def save(self, now=None):
+        if not self.path:
+            return
+        now = time.time() if now is None else now
+        entries = {
+            name: entry for name, entry in self.entries.items() if entry[1] > now
+        }
+        temp_path = f"{self.path}.tmp"
+        try:
+            with open(temp_path, "w", encoding="utf-8") as file:
+                json.dump(entries, file)
+            os.replace(temp_path, self.path)
+        except IOError as e:
+            print(f"Error writing the DNS cache: {e}")
+
+
+async def check_domains(
+    domains,
+    resolver=None,
+    concurrency=PRUNE_CONCURRENCY,
+    cache=None,
+    timeout=DNS_TIMEOUT,
+):
+    """
+    Finds out which domains still resolve.
+
+    A fixed pool of `concurrency` workers shares one resolver socket, so
+    memory stays flat however many domains are checked. Only NXDOMAIN
+    counts as dead; timeouts and server failures are 'unknown' and are
+    not cached.
+
+    Args:
+        domains (Iterable[str]): The domains to check.
+        resolver (str, optional): 'host[:port]' of the DNS server; defaults
+            to the system resolver.
+        concurrency (int): The maximum number of lookups in flight.
+        cache (DnsCache, optional): Reused and updated lookup outcomes.
+        timeout (float): Seconds to wait for each attempt.
+
+    Returns:
+        dict: {domain: ALIVE, DEAD or UNKNOWN}
+    """
+    cache = cache or DnsCache()
+    now = time.time()
+    statuses = {}
+    to_check = []
+    for domain in domains:
+        status = cache.get(domain, now)
+        if status is None:
+            to_check.append(domain)
+        else:
+            statuses[domain] = status
+    remaining = iter(to_check)
+
+    async def worker(client):
+        for domain in remaining:
+            result = await client.query(domain)
+            if result is None:
+                statuses[domain] = UNKNOWN
+                continue
+            rcode, ttl = result
+            if rcode == RCODE_NOERROR:
+                status = ALIVE
+            elif rcode == RCODE_NXDOMAIN:
+                status = DEAD
+            else:
+                statuses[domain] = UNKNOWN
+                continue
+            statuses[domain] = status
+            cache.put(domain, status, NEGATIVE_TTL if ttl is None else ttl, now)
+
+    if to_check:
+        async with AsyncResolver(resolver, timeout) as client:
+            workers = min(concurrency, len(to_check))
+            await asyncio.gather(*(worker(client) for _ in range(workers)))
+    return statuses
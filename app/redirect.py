@@ -0,0 +1,40 @@
+import ipaddress
+
+DEFAULT_REDIRECT = "127.0.0.1"
+# Named strategies; 'null' addresses fail a connection attempt immediately on
+# most systems, while loopback ones reach any local server.
+REDIRECT_STRATEGIES = {
+    "null": ("0.0.0.0",),
+    "null-dual": ("0.0.0.0", "::"),
+    "loopback": ("127.0.0.1",),
+    "loopback-dual": ("127.0.0.1", "::1"),
+}
+
+
+def resolve_redirect(redirect: str) -> tuple[str, ...]:
+    """
+    Turns a redirect strategy into the addresses written for each site.
+
+    Args:
+        redirect (str): A name from REDIRECT_STRATEGIES, or one or more
+            comma separated IPv4/IPv6 addresses (e.g. '10.0.0.1,::1').
+
+    Returns:
+        tuple[str, ...]: The addresses, one hosts line each.
+
+    Raises:
+        ValueError: If the strategy is unknown or an address is invalid.
+    """
+    if redirect in REDIRECT_STRATEGIES:
+        return REDIRECT_STRATEGIES[redirect]
+    addresses = []
+    for address in redirect.split(","):
+        try:
+            addresses.append(str(ipaddress.ip_address(address.strip())))
+        except ValueError:
+            raise ValueError(f"Invalid redirect strategy or address: {address}")
+    # At most one address per family; a resolver would only use the first.
+    families = [ipaddress.ip_address(address).version for address in addresses]
+    if len(set(families)) != len(families):
+        raise ValueError(f"Use at most one IPv4 and one IPv6 address: {redirect}")
+    return tuple(addresses)
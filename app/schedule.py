@@ -0,0 +1,192 @@
+import datetime
+import heapq
+from bisect import bisect_right
+
+MINUTES_PER_DAY = 24 * 60
+MINUTES_PER_WEEK = 7 * MINUTES_PER_DAY
+WEEKDAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+GROUP_PREFIX = "group:"
+
+
+def parse_days(days: str) -> list[int]:
+    """
+    Parses a weekday specification such as 'mon-fri', 'sat,sun' or 'daily'.
+
+    Args:
+        days (str): Comma separated weekdays or weekday ranges.
+
+    Returns:
+        list[int]: The sorted weekday numbers (Monday is 0).
+
+    Raises:
+        ValueError: If a weekday name is not recognised.
+    """
+    days = days.strip().lower()
+    if days in ("daily", "*"):
+        return list(range(7))
+    result = set()
+    for part in days.split(","):
+        first, _, last = part.strip().partition("-")
+        try:
+            start = WEEKDAYS.index(first[:3])
+            end = WEEKDAYS.index(last[:3]) if last else start
+        except ValueError:
+            raise ValueError(f"Invalid weekday specification: {part}")
+        day = start
+        result.add(day)
+        while day != end:
+            day = (day + 1) % 7
+            result.add(day)
+    return sorted(result)
+
+
+def parse_time(value: str) -> int:
+    """
+    Parses a 'HH:MM' time of day into minutes after midnight.
+
+    Raises:
+        ValueError: If the time is not a valid 'HH:MM' value.
+    """
+    try:
+        hours, minutes = (int(part) for part in value.split(":"))
+    except ValueError:
+        raise ValueError(f"Invalid time of day: {value}")
+    if not (0 <= hours <= 24 and 0 <= minutes < 60) or hours * 60 + minutes > 1440:
+        raise ValueError(f"Invalid time of day: {value}")
+    return hours * 60 + minutes
+
+
+def make_rule(target: str, days: str, start: str, end: str) -> dict:
+    """Builds a validated, JSON serializable schedule rule."""
+    if parse_time(start) == parse_time(end):
+        raise ValueError("A schedule window cannot start and end at the same time.")
+    return {"target": target, "days": parse_days(days), "start": start, "end": end}
+
+
+def rule_intervals(rule: dict) -> list[tuple[int, int]]:
+    """
+    Expands a rule into half-open minute-of-week intervals.
+
+    Windows ending at or before their start time run past midnight, and a
+    window running past the end of the week is split at the week boundary.
+    """
+    start = parse_time(rule["start"])
+    end = parse_time(rule["end"])
+    length = end - start if end > start else end + MINUTES_PER_DAY - start
+    intervals = []
+    for day in rule["days"]:
+        begin = day * MINUTES_PER_DAY + start
+        finish = begin + length
+        if finish <= MINUTES_PER_WEEK:
+            intervals.append((begin, finish))
+        else:
+            intervals.append((begin, MINUTES_PER_WEEK))
+            intervals.append((0, finish - MINUTES_PER_WEEK))
+    return intervals
+
+
+def merge_intervals(intervals) -> list[int]:
+    """
+    Merges overlapping or touching intervals into a flat boundary list.
+
+    Returns:
+        list[int]: Sorted [start, end, start, end, ...] minutes, so a minute
+        is inside a window exactly when an odd number of boundaries are at
+        or before it.
+    """
+    boundaries = []
+    for start, end in sorted(intervals):
+        if boundaries and start <= boundaries[-1]:
+            boundaries[-1] = max(boundaries[-1], end)
+        else:
+            boundaries.extend((start, end))
+    return boundaries
+
+
+def week_start(moment: datetime.datetime) -> datetime.datetime:
+    """Returns midnight of the Monday starting the week of `moment`."""
+    monday = moment - datetime.timedelta(days=moment.weekday())
+    return monday.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def minute_of_week(moment: datetime.datetime) -> float:
+    return (
+        moment.weekday() * MINUTES_PER_DAY
+        + moment.hour * 60
+        + moment.minute
+        + (moment.second + moment.microsecond / 1e6) / 60
+    )
+
+
+class Scheduler:
+    """
+    Evaluates weekly block windows for many targets.
+
+    The windows of each target are merged once up front; a heap keyed on the
+    next transition time of every target lets the caller sleep until the
+    earliest transition instead of polling.
+    """
+
+    def __init__(self, rules):
+        intervals = {}
+        for rule in rules:
+            intervals.setdefault(rule["target"], []).extend(rule_intervals(rule))
+        self._boundaries = {
+            target: merge_intervals(target_intervals)
+            for target, target_intervals in intervals.items()
+        }
+        self._heap = []
+
+    @property
+    def targets(self):
+        return self._boundaries.keys()
+
+    def is_active(self, target, moment: datetime.datetime) -> bool:
+        boundaries = self._boundaries[target]
+        return bisect_right(boundaries, minute_of_week(moment)) % 2 == 1
+
+    def next_transition(self, target, moment: datetime.datetime):
+        """Returns the first moment after `moment` at which `target` toggles."""
+        boundaries = self._boundaries[target]
+        if not boundaries:
+            return None
+        index = bisect_right(boundaries, minute_of_week(moment))
+        if index < len(boundaries):
+            offset = boundaries[index]
+        else:
+            offset = boundaries[0] + MINUTES_PER_WEEK
+        # Anchoring on the week start keeps transitions on exact minutes.
+        return week_start(moment) + datetime.timedelta(minutes=offset)
+
+    def reset(self, moment: datetime.datetime) -> dict:
+        """
+        Rebuilds the transition heap from `moment`.
+
+        Returns:
+            dict: {target: active} for every target at `moment`.
+        """
+        self._heap = []
+        for target in self._boundaries:
+            when = self.next_transition(target, moment)
+            if when is not None:
+                self._heap.append((when, target))
+        heapq.heapify(self._heap)
+        return {target: self.is_active(target, moment) for target in self._boundaries}
+
+    def peek(self):
+        """Returns the time of the earliest pending transition, if any."""
+        return self._heap[0][0] if self._heap else None
+
+    def pop_due(self, moment: datetime.datetime) -> dict:
+        """
+        Pops every transition due at or before `moment`.
+
+        Returns:
+            dict: {target: active} for the targets that toggled.
+        """
+        due = {}
+        while self._heap and self._heap[0][0] <= moment:
+            _, target = heapq.heappop(self._heap)
+            due[target] = self.is_active(target, moment)
+            heapq.heappush(self._heap, (self.next_transition(target, moment), target))
+        return due
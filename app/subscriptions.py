@@ -0,0 +1,123 @@
+import io
+import ipaddress
+import os
+import urllib.error
+import urllib.request
+
+from utils import LOCAL_NAMES
+from utils import is_valid_site
+from utils import normalize_site
+
+FETCH_TIMEOUT = 30
+
+
+def is_url(source: str) -> bool:
+    return source.startswith(("http://", "https://"))
+
+
+def _is_ip_address(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def parse_blocklist(lines, rejected=None):
+    """
+    Extracts the hostnames of a blocklist in hosts or plain domain format.
+
+    Comments ('#' anywhere, '!' at the start of a line) are skipped, and
+    names are normalized and validated like user input. The first word of
+    a line is only taken for an address if it is an IP address, so plain
+    lists may hold several names per line, separated by spaces or commas.
+    IP literals and LOCAL_NAMES are never sites and are skipped.
+
+    Args:
+        lines (Iterable[str]): The lines of the blocklist.
+        rejected (list, optional): Collects the names that are not valid
+            sites, so callers can report them.
+
+    Yields:
+        str: Each valid hostname; duplicates are not removed.
+    """
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if not line or line.startswith("!"):
+            continue
+        names = line.replace(",", " ").split()
+        if len(names) > 1 and _is_ip_address(names[0]):
+            names = names[1:]
+        for name in names:
+            site = normalize_site(name)
+            if site in LOCAL_NAMES or (site and _is_ip_address(site)):
+                continue
+            if is_valid_site(site):
+                yield site
+            elif rejected is not None:
+                rejected.append(name)
+
+
+def fetch_subscription(source: str, etag=None, last_modified=None):
+    """
+    Fetches a blocklist unless it is unchanged since the last fetch.
+
+    URLs are requested with If-None-Match/If-Modified-Since; local files are
+    compared by modification time.
+
+    Args:
+        source (str): An http(s) URL or a local file path.
+        etag (str, optional): The ETag returned by the last fetch.
+        last_modified (str, optional): The Last-Modified value of the last
+            fetch, or the file's modification time for local sources.
+
+    Returns:
+        tuple: (sites, etag, last_modified), where sites is None if the
+        source has not changed.
+
+    Raises:
+        OSError: If the source cannot be read.
+    """
+    if not is_url(source):
+        modified = str(os.stat(source).st_mtime_ns)
+        if modified == last_modified:
+            return None, etag, last_modified
+        with open(source, "r", encoding="utf-8", errors="replace") as file:
+            return set(parse_blocklist(file)), None, modified
+
+    request = urllib.request.Request(source)
+    if etag:
+        request.add_header("If-None-Match", etag)
+    if last_modified:
+        request.add_header("If-Modified-Since", last_modified)
+    try:
+        with urllib.request.urlopen(request, timeout=FETCH_TIMEOUT) as response:
+            lines = io.TextIOWrapper(response, encoding="utf-8", errors="replace")
+            return (
+                set(parse_blocklist(lines)),
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+            )
+    except urllib.error.HTTPError as e:
+        if e.code == 304:
+            return None, etag, last_modified
+        raise
+
+
+def refresh_subscription(blocking_manager, name: str):
+    """
+    Refreshes one subscription and applies what changed since last time.
+
+    Returns:
+        tuple, False or None: The (added, removed) sites, False if the source
+        was unchanged, or None if the hosts file could not be written.
+    """
+    subscription = blocking_manager.subscriptions[name]
+    sites, etag, last_modified = fetch_subscription(
+        subscription["source"],
+        subscription.get("etag"),
+        subscription.get("last_modified"),
+    )
+    if sites is None:
+        return False
+    return blocking_manager.apply_subscription(name, sites, etag, last_modified)
@@ -1,12 +1,72 @@
 import datetime
+import fnmatch
+import functools
 import json
 import os
 import platform
+import re
 import shutil
 import sys
+from typing import NamedTuple
 from urllib.parse import urlparse
 
 QUOTES_RELATIVE_PATH = "../data/quotes.json"
+NORMALIZE_CACHE_SIZE = 65536
+BLOCK_MARKER = "blocked by blanc-all"
+# Addresses that make a hosts entry a block rather than a name mapping; other
+# loopback addresses such as Debian's '127.0.1.1 <hostname>' are real mappings
+SINKHOLE_ADDRESSES = (
+    "0.0.0.0",
+    "127.0.0.1",
+    "::",
+    "::1",
+    "0:0:0:0:0:0:0:0",
+    "0:0:0:0:0:0:0:1",
+)
+# Names that system hosts files map to loopback on purpose
+LOCAL_NAMES = (
+    "localhost",
+    "localhost.localdomain",
+    "local",
+    "broadcasthost",
+    "ip6-localhost",
+    "ip6-loopback",
+    "0.0.0.0",
+)
+# Dotted names of valid labels, which is_valid_site accepts without further
+# checks; anything else takes the slow path
+PLAIN_HOSTNAME = re.compile(
+    r"(?:[A-Za-z0-9](?:[A-Za-z0-9-]{0,61}[A-Za-z0-9])?\.)+"
+    r"[A-Za-z0-9][A-Za-z0-9-]{0,61}[A-Za-z0-9]"
+)
+
+
+class HostsEntry(NamedTuple):
+    """A parsed hosts file line; blank and comment-only lines have no address."""
+
+    address: str | None
+    names: tuple[str, ...]
+    comment: str | None
+    span: tuple[int, int]
+
+    def is_block(self) -> bool:
+        """
+        Whether the entry blocks its names rather than mapping them.
+
+        Names in LOCAL_NAMES are mapped to loopback on purpose, so an entry
+        of nothing but those (e.g. '127.0.0.1 localhost') is no block.
+        """
+        if all(name in LOCAL_NAMES for name in self.names):
+            return False
+        return is_sinkhole_address(self.address) or (
+            self.comment is not None and BLOCK_MARKER in self.comment
+        )
+
+    def blocked_names(self) -> tuple[str, ...]:
+        """The names the entry blocks; LOCAL_NAMES never count."""
+        if not self.is_block():
+            return ()
+        return tuple(name for name in self.names if name not in LOCAL_NAMES)
 
 
 def get_hosts_path():
@@ -45,6 +105,78 @@ def copy_file(source: str | os.PathLike, destination: str | os.PathLike):
             print(f"An unexpected error occurred: {e}")
 
 
+def is_sinkhole_address(address: str) -> bool:
+    return address in SINKHOLE_ADDRESSES
+
+
+def parse_hosts(content: str):
+    """
+    Parses hosts file content in a single pass.
+
+    Args:
+        content (str): The full text of a hosts file.
+
+    Yields:
+        HostsEntry: One entry per line, with every hostname of the line, the
+        inline comment (without '#') and the (start, end) offsets of the line
+        including its line ending.
+    """
+    start = 0
+    for line in content.splitlines(keepends=True):
+        end = start + len(line)
+        data, separator, comment = line.partition("#")
+        parts = data.split()
+        yield HostsEntry(
+            parts[0] if parts else None,
+            tuple(parts[1:]),
+            comment.strip() if separator else None,
+            (start, end),
+        )
+        start = end
+
+
+def parse_blocked_sites(content: str, marked=None) -> dict:
+    """
+    Collects the hostnames of the block entries of a hosts file.
+
+    Applies the same rules as parse_hosts and HostsEntry.blocked_names,
+    inlined so that large hosts files load without building an entry per
+    line: only lines containing a '#' pay for comment handling, and
+    LOCAL_NAMES are dropped once at the end rather than per name.
+
+    Args:
+        content (str): The full text of a hosts file.
+        marked (set, optional): Collects the hostnames of the entries
+            carrying BLOCK_MARKER, the ones blanc-all wrote itself.
+
+    Returns:
+        dict: {site: 0} for every blocked hostname, in file order.
+    """
+    blocked = {}
+    for line in content.splitlines():
+        if "#" in line:
+            data, _, comment = line.partition("#")
+            parts = data.split()
+            is_marked = BLOCK_MARKER in comment
+            if len(parts) < 2 or not (is_sinkhole_address(parts[0]) or is_marked):
+                continue
+            if is_marked and marked is not None:
+                marked.update(parts[1:])
+        else:
+            parts = line.split()
+            if len(parts) < 2 or parts[0] not in SINKHOLE_ADDRESSES:
+                continue
+        if len(parts) == 2:
+            blocked[parts[1]] = 0
+        else:
+            blocked.update(dict.fromkeys(parts[1:], 0))
+    for name in LOCAL_NAMES:
+        blocked.pop(name, None)
+    if marked:
+        marked.difference_update(LOCAL_NAMES)
+    return blocked
+
+
 def extract_blocked_site(hosts_line: str):
     """
     Extracts the blocked website from a line in the hosts file.
@@ -53,14 +185,10 @@ def extract_blocked_site(hosts_line: str):
         hosts_line (str): A single line from the hosts file.
 
     Returns:
-        str or None: The extracted blocked website if found, otherwise None.
+        str or None: The first hostname of the line if found, otherwise None.
     """
-    hosts_line = hosts_line.strip()
-    if not hosts_line.startswith("#"):
-        parts = hosts_line.split()
-        if len(parts) >= 2:
-            if "#" not in parts[0] and "#" not in parts[1]:
-                return parts[1]
+    for entry in parse_hosts(hosts_line):
+        return entry.names[0] if entry.names else None
     return None
 
 
@@ -83,6 +211,10 @@ def is_valid_site(url_or_domain: str):
     if len(url_or_domain) > 255:  # Maximum length of a hostname
         return False
 
+    # Plain hostnames, by far the most common input, skip the checks below
+    if PLAIN_HOSTNAME.fullmatch(url_or_domain):
+        return True
+
     # Check for common invalid characters
     invalid_chars = [
         " ",
@@ -150,6 +282,94 @@ def is_valid_site(url_or_domain: str):
     return False
 
 
+@functools.lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_site(url_or_domain: str):
+    """
+    Reduces a URL or domain to the canonical hostname written to the hosts file.
+
+    The scheme, credentials, port, path, query and trailing dots are dropped,
+    the name is lowercased and internationalized names are converted to
+    punycode. Results are cached, since bulk imports repeat names a lot.
+
+    Args:
+        url_or_domain (str): A URL such as 'https://Example.com:443/path'
+            or a bare domain.
+
+    Returns:
+        str or None: The hostname (e.g. 'example.com'), or None if no
+        hostname can be extracted.
+    """
+    if not url_or_domain or not isinstance(url_or_domain, str):
+        return None
+    site = url_or_domain.strip()
+    if "://" in site:
+        site = site.split("://", 1)[1]
+    for separator in "/?#":
+        site = site.split(separator, 1)[0]
+    site = site.rpartition("@")[2]
+    if site.startswith("["):
+        # Bracketed IPv6 literal, optionally followed by a port
+        site = site[1:].partition("]")[0]
+    elif site.count(":") == 1:
+        site = site.partition(":")[0]
+    site = site.rstrip(".").lower()
+    if not site:
+        return None
+    if not site.isascii():
+        try:
+            site = site.encode("idna").decode("ascii")
+        except UnicodeError:
+            return None
+    return site
+
+
+def normalize_sites(urls_or_domains):
+    """
+    Normalizes many sites, dropping the ones without a hostname and duplicates.
+
+    Args:
+        urls_or_domains (Iterable[str]): URLs or domains.
+
+    Yields:
+        str: Each distinct hostname, in first-seen order.
+    """
+    seen = set()
+    for url_or_domain in urls_or_domains:
+        site = normalize_site(url_or_domain)
+        if site and site not in seen:
+            seen.add(site)
+            yield site
+
+
+def compile_site_pattern(pattern: str, regex: bool = False):
+    """
+    Compiles a glob (e.g. '*.cdn.*') or regular expression matching sites.
+
+    Globs must match the whole site; regular expressions match anywhere
+    unless anchored. Both are case-insensitive.
+
+    Args:
+        pattern (str): The glob or regular expression.
+        regex (bool): Treat the pattern as a regular expression.
+
+    Returns:
+        Callable[[str], bool]: Tells whether a site matches.
+
+    Raises:
+        ValueError: If the regular expression is invalid.
+    """
+    try:
+        if regex:
+            compiled = re.compile(pattern, re.IGNORECASE)
+        else:
+            compiled = re.compile(fnmatch.translate(pattern), re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid pattern {pattern}: {e}")
+    if regex:
+        return lambda site: compiled.search(site) is not None
+    return lambda site: compiled.match(site) is not None
+
+
 def get_quote(filepath: str | os.PathLike = QUOTES_RELATIVE_PATH):
     """
     Retrieves a quote from a JSON file based on the current day.
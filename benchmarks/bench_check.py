@@ -0,0 +1,62 @@
+"""
+Measures 'check' lookup throughput against a large blocked set.
+
+Usage:
+    python benchmarks/bench_check.py [number_of_blocked_sites]
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from check import BlockedSiteIndex  # noqa: E402
+from check import read_domains  # noqa: E402
+
+TOP_LABELS = ["com", "net", "org", "io", "de"]
+
+
+def make_domains(rng, count, prefix):
+    return [
+        f"{prefix}{rng.randrange(10**9)}.example{rng.randrange(1000)}."
+        f"{rng.choice(TOP_LABELS)}"
+        for _ in range(count)
+    ]
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    rng = random.Random(0)
+    blocked = make_domains(rng, size, "ads")
+    queries = (
+        rng.sample(blocked, 100_000)
+        + [f"cdn.{site}" for site in rng.sample(blocked, 100_000)]
+        + make_domains(rng, 600_000, "www")
+        + [f"host{i}.intranet.lan" for i in range(200_000)]
+    )
+    rng.shuffle(queries)
+    lines = [f"{query}\n" for query in queries]
+
+    for subdomains in (False, True):
+        index = BlockedSiteIndex(blocked, subdomains)
+        mode = "suffix walk" if subdomains else "exact"
+        best = min(
+            timeit.repeat(
+                lambda: sum(1 for _ in index.filter(queries)), number=1, repeat=5
+            )
+        )
+        print(f"{mode:<12} lookups only     {len(queries) / best / 1e6:6.2f} M/s")
+        best = min(
+            timeit.repeat(
+                lambda: sum(1 for _ in index.filter(read_domains(lines))),
+                number=1,
+                repeat=5,
+            )
+        )
+        print(f"{mode:<12} with line input  {len(queries) / best / 1e6:6.2f} M/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Compares hosts file parsing against the previous strip/split line loop.
+
+Usage:
+    python benchmarks/bench_parse_hosts.py [number_of_lines]
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from utils import parse_blocked_sites  # noqa: E402
+from utils import parse_hosts  # noqa: E402
+
+
+def legacy_extract_blocked_site(hosts_line):
+    hosts_line = hosts_line.strip()
+    if not hosts_line.startswith("#"):
+        parts = hosts_line.split()
+        if len(parts) >= 2:
+            if "#" not in parts[0] and "#" not in parts[1]:
+                return parts[1]
+    return None
+
+
+def legacy_load(content):
+    blocked = {}
+    for line in content.splitlines():
+        blocked_site = legacy_extract_blocked_site(line)
+        if blocked_site:
+            blocked[blocked_site] = blocked.get(blocked_site, 0)
+    return blocked
+
+
+def make_corpus(size):
+    """A mix of upstream blocklist lines, blanc-all lines and comments."""
+    rng = random.Random(0)
+    lines = ["# Title: benchmark corpus", "127.0.0.1 localhost", "::1 localhost"]
+    for i in range(size):
+        roll = rng.random()
+        if roll < 0.05:
+            lines.append(f"# section {i}")
+        elif roll < 0.08:
+            lines.append("")
+        elif roll < 0.75:
+            lines.append(f"0.0.0.0 ads{i}.tracker{i % 97}.com")
+        else:
+            lines.append(f"127.0.0.1 site{i}.example.com  # blocked by blanc-all")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 500_000
+    content = make_corpus(size)
+    cases = {
+        "legacy strip/split loop": lambda: legacy_load(content),
+        "parse_blocked_sites": lambda: parse_blocked_sites(content),
+        "parse_hosts (structured)": lambda: sum(1 for _ in parse_hosts(content)),
+    }
+    timings = {name: [] for name in cases}
+    # Interleave the runs so machine noise affects every case alike
+    for _ in range(7):
+        for name, case in cases.items():
+            timings[name].append(timeit.timeit(case, number=1))
+    print(f"{size} lines, best of 7")
+    for name, runs in timings.items():
+        best = min(runs)
+        print(f"{name:<28} {best * 1000:8.1f} ms  {size / best / 1e6:6.2f} M lines/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Measures how fast a connection to each redirect strategy fails.
+
+A browser opening a blocked site connects to the address the hosts file
+gives it; the sooner that connection fails, the sooner the page gives up.
+Each address is tried on the usual web ports with nothing listening, and
+the time to failure is reported along with the outcome.
+
+Usage:
+    python benchmarks/bench_redirect.py [attempts] [timeout_seconds]
+"""
+
+import errno
+import os
+import socket
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "app"))
+
+from redirect import REDIRECT_STRATEGIES  # noqa: E402
+
+PORTS = (80, 443)
+# A documentation-only address, standing in for a custom redirect that
+# nothing answers on (firewalled or unrouted hosts behave the same way)
+UNROUTED = "192.0.2.1"
+
+
+def connect_failure(address, port, timeout):
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
+    start = time.perf_counter()
+    try:
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            sock.settimeout(timeout)
+            sock.connect((address, port))
+        outcome = "connected"
+    except socket.timeout:
+        outcome = "timeout"
+    except OSError as e:
+        outcome = errno.errorcode.get(e.errno, str(e))
+    return time.perf_counter() - start, outcome
+
+
+def main():
+    attempts = int(sys.argv[1]) if len(sys.argv) > 1 else 50
+    timeout = float(sys.argv[2]) if len(sys.argv) > 2 else 2.0
+    addresses = {
+        address: name
+        for name, pair in reversed(REDIRECT_STRATEGIES.items())
+        for address in pair
+    }
+    addresses[UNROUTED] = "custom"
+    for address, name in addresses.items():
+        for port in PORTS:
+            results = [
+                connect_failure(address, port, timeout)
+                for _ in range(attempts if address != UNROUTED else 1)
+            ]
+            latencies = [latency * 1000 for latency, _ in results]
+            outcomes = sorted({outcome for _, outcome in results})
+            print(
+                f"{name:<14} {address:<12} port {port:<4} "
+                f"median {statistics.median(latencies):9.3f} ms  "
+                f"max {max(latencies):9.3f} ms  {', '.join(outcomes)}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -4,3 +4,23 @@ import os
 current_dir = os.path.dirname(os.path.abspath(__file__))
 app_dir = os.path.join(current_dir, "..", "app")
 sys.path.insert(0, app_dir)
+
+import pytest
+
+from app.block import BlockingManager
+from app.utils import copy_file
+from tests.utils import FAKE_HOSTS_PATH
+
+
+@pytest.fixture
+def fake_hosts_file(tmp_path):
+    """Fixture to create a fake hosts file with initial content."""
+    hosts_path = tmp_path / "hosts"
+    copy_file(FAKE_HOSTS_PATH, hosts_path)
+    return str(hosts_path)
+
+
+@pytest.fixture
+def blocking_manager(fake_hosts_file):
+    """Fixture to create a BlockingManager instance with the fake hosts file."""
+    return BlockingManager(fake_hosts_file)
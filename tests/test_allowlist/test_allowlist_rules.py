@@ -0,0 +1,40 @@
+from app.allowlist import Allowlist
+
+
+def test_exact_rules_match_only_the_name():
+    allowlist = Allowlist()
+    allowlist.add("login.example.com")
+
+    assert allowlist.allows("login.example.com")
+    assert not allowlist.allows("a.login.example.com")
+    assert not allowlist.allows("example.com")
+
+
+def test_suffix_rules_match_the_domain_and_its_subdomains():
+    allowlist = Allowlist()
+    allowlist.add("*.cdn.net")
+
+    assert allowlist.allows("cdn.net")
+    assert allowlist.allows("img.eu.cdn.net")
+    assert not allowlist.allows("mycdn.net")
+    assert not allowlist.allows("cdn.net.evil.com")
+
+
+def test_remove_and_state_round_trip():
+    allowlist = Allowlist()
+    allowlist.add("*.cdn.net")
+    allowlist.add("auth.io")
+
+    restored = Allowlist.from_state(allowlist.to_state())
+    assert restored.rules() == ["*.cdn.net", "auth.io"]
+    assert restored.remove("*.cdn.net")
+    assert not restored.remove("*.cdn.net")
+    assert not restored.allows("cdn.net")
+
+
+def test_blockable_keeps_order():
+    allowlist = Allowlist(suffix=["cdn.net"])
+    sites = ["b.com", "x.cdn.net", "a.com"]
+
+    assert list(allowlist.blockable(sites)) == ["b.com", "a.com"]
+    assert list(Allowlist().blockable(sites)) == sites
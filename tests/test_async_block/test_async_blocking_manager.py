@@ -0,0 +1,91 @@
+import asyncio
+
+
+from app.async_block import AsyncBlockingManager
+from app.block import BlockingManager
+from tests.utils import NR_OF_BLOCKED_SITES
+from tests.utils import spy_writes
+
+
+def count_writes(manager):
+    return spy_writes(manager.blocking_manager)
+
+
+def test_concurrent_requests_share_one_write(fake_hosts_file):
+    async def main():
+        async with await AsyncBlockingManager.open(fake_hosts_file) as manager:
+            writes = count_writes(manager)
+            results = await asyncio.gather(
+                *(manager.block(f"site{index}.com") for index in range(50)),
+                manager.unblock("example1.com"),
+                manager.block_many(["example2.com", "new.com"]),
+            )
+            return writes, results, await manager.count()
+
+    writes, results, count = asyncio.run(main())
+
+    assert len(writes) == 1
+    assert results[0] == (["site0.com"], set())
+    assert results[50] == ([], {"example1.com"})
+    assert results[51] == (["new.com"], set())
+    assert count == NR_OF_BLOCKED_SITES + 50
+    assert len(BlockingManager(fake_hosts_file).blocked) == count
+
+
+def test_later_requests_override_earlier_ones(fake_hosts_file):
+    async def main():
+        async with await AsyncBlockingManager.open(fake_hosts_file) as manager:
+            blocked, unblocked = await asyncio.gather(
+                manager.block("x.com"), manager.unblock("x.com")
+            )
+            return blocked, unblocked, await manager.contains("x.com")
+
+    assert asyncio.run(main()) == (([], set()), ([], set()), False)
+
+
+def test_durations_are_written_separately(fake_hosts_file):
+    async def main():
+        async with await AsyncBlockingManager.open(fake_hosts_file) as manager:
+            writes = count_writes(manager)
+            await asyncio.gather(
+                manager.block("a.com"),
+                manager.block("b.com", duration=4102444800),
+                manager.block("c.com"),
+            )
+            return writes, manager.blocking_manager.blocked
+
+    writes, blocked = asyncio.run(main())
+
+    assert [call["duration"] for call in writes] == [0, 4102444800]
+    assert (blocked["a.com"], blocked["b.com"], blocked["c.com"]) == (
+        0,
+        4102444800,
+        0,
+    )
+
+
+def test_loop_keeps_running_while_a_write_waits(fake_hosts_file):
+    async def main():
+        async with await AsyncBlockingManager.open(fake_hosts_file) as manager:
+            # The executor thread waits for this lock, the loop must not
+            manager.blocking_manager._write_lock.acquire()
+            try:
+                write = asyncio.ensure_future(manager.block("late.com"))
+                ticks = 0
+                for _ in range(5):
+                    await asyncio.sleep(0.01)
+                    ticks += 1
+                assert not write.done()
+            finally:
+                manager.blocking_manager._write_lock.release()
+            return ticks, await write
+
+    assert asyncio.run(main()) == (5, (["late.com"], set()))
+
+
+def test_sorted_page(fake_hosts_file):
+    async def main():
+        async with await AsyncBlockingManager.open(fake_hosts_file) as manager:
+            return await manager.list_blocked(sort=True, limit=2)
+
+    assert asyncio.run(main()) == sorted(BlockingManager(fake_hosts_file).blocked)[:2]
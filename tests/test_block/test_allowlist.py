@@ -0,0 +1,54 @@
+from app.block import BlockingManager
+from tests.utils import spy_writes
+
+
+def read_hosts(blocking_manager):
+    with open(blocking_manager.hosts_path, "r") as file:
+        return file.read()
+
+
+def test_allowlisted_sites_are_never_written(blocking_manager):
+    blocking_manager.add_allow_rule("*.cdn.net")
+    blocking_manager.add_allow_rule("auth.io")
+
+    blocking_manager.block("img.cdn.net")
+    blocking_manager.block_many(["auth.io", "ads.com", "cdn.net"])
+
+    assert "ads.com" in blocking_manager.blocked
+    for site in ("img.cdn.net", "auth.io", "cdn.net"):
+        assert site not in blocking_manager.blocked
+        assert site not in read_hosts(blocking_manager)
+
+
+def test_reconcile_and_subscriptions_skip_allowlisted_sites(blocking_manager):
+    blocking_manager.add_allow_rule("*.cdn.net")
+
+    to_add, _ = blocking_manager.reconcile(["a.com", "x.cdn.net"])
+    assert to_add == ["a.com"]
+
+    added, _ = blocking_manager.apply_subscription("list", {"b.com", "y.cdn.net"})
+    assert added == {"b.com"}
+    assert "y.cdn.net" not in blocking_manager.blocked
+
+
+def test_purge_unblocks_matches_in_one_write(blocking_manager):
+    blocking_manager.block_many(["a.cdn.net", "b.cdn.net", "keep.com"])
+    blocking_manager.add_allow_rule("*.cdn.net")
+
+    writes = spy_writes(blocking_manager)
+
+    assert blocking_manager.purge_allowed(dry_run=True) == ["a.cdn.net", "b.cdn.net"]
+    assert "a.cdn.net" in blocking_manager.blocked
+    assert blocking_manager.purge_allowed() == ["a.cdn.net", "b.cdn.net"]
+    assert len(writes) == 1
+    assert "keep.com" in blocking_manager.blocked
+    assert "cdn.net" not in read_hosts(blocking_manager)
+
+
+def test_allowlist_is_persisted(blocking_manager):
+    blocking_manager.add_allow_rule("*.cdn.net")
+
+    reloaded = BlockingManager(blocking_manager.hosts_path)
+    assert reloaded.allowlist.allows("a.cdn.net")
+    assert reloaded.remove_allow_rule("*.cdn.net")
+    assert not BlockingManager(blocking_manager.hosts_path).allowlist
@@ -0,0 +1,140 @@
+import threading
+
+import pytest
+
+import app.block as block
+from app.block import BlockingManager
+from app.events import ADDED
+from app.events import LOADED
+
+
+def write_hosts(tmp_path, count):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text(
+        "127.0.0.1 localhost\n"
+        + "".join(f"0.0.0.0 site{index}.com\n" for index in range(count))
+    )
+    return str(hosts_path)
+
+
+def load(hosts_path, **options):
+    manager = BlockingManager(hosts_path, background=True)
+    batches = []
+    subscription = manager.events.subscribe(batches.append, kinds=(LOADED,))
+    manager.load_in_background(**options).join()
+    subscription.close(wait=True)
+    return manager, batches
+
+
+def test_batches_match_a_synchronous_load(tmp_path):
+    hosts_path = write_hosts(tmp_path, 1000)
+
+    manager, batches = load(hosts_path, batch_size=1000)
+
+    assert len(batches) > 10
+    loaded = [site for batch in batches for site in batch.sites]
+    assert loaded == BlockingManager(hosts_path).get_blocked_sites()
+    assert manager.loaded
+    assert manager.get_blocked_sites() == loaded
+
+
+def test_writes_after_the_load(tmp_path):
+    hosts_path = write_hosts(tmp_path, 100)
+    manager, _ = load(hosts_path, batch_size=100)
+
+    assert manager.apply_changes(add=["new.com"], remove=["site1.com"]) == (
+        ["new.com"],
+        {"site1.com"},
+    )
+    assert BlockingManager(hosts_path).get_blocked_sites() == (
+        manager.get_blocked_sites()
+    )
+
+
+@pytest.fixture
+def paused_load(tmp_path, monkeypatch):
+    """A background load held after its first batch until `resume` is set."""
+    hosts_path = write_hosts(tmp_path, 100)
+    resume = threading.Event()
+    parse = block.parse_blocked_sites
+    calls = []
+
+    def parse_then_wait(content, *args):
+        calls.append(content)
+        if len(calls) == 2:
+            assert resume.wait(5)
+        return parse(content, *args)
+
+    monkeypatch.setattr(block, "parse_blocked_sites", parse_then_wait)
+    manager = BlockingManager(hosts_path, background=True)
+    thread = manager.load_in_background(batch_size=100)
+    while len(calls) < 2:
+        threading.Event().wait(0.001)
+    yield manager, resume
+    resume.set()
+    thread.join()
+
+
+def test_reads_see_the_sites_loaded_so_far(paused_load):
+    manager, resume = paused_load
+
+    assert not manager.loaded
+    first = list(manager.iter_blocked())
+    assert 0 < manager.count() == len(first) < 100
+    assert manager.contains(first[0])
+    assert list(manager.iter_blocked(sort=True, limit=2)) == sorted(first)[:2]
+
+    resume.set()
+    assert manager.wait_loaded(5)
+    assert manager.count() == 100
+
+
+def test_blocks_append_during_the_load(paused_load):
+    manager, resume = paused_load
+
+    assert manager.block_many(["new.com", "site0.com"]) == (["new.com"], set())
+    assert not manager.loaded
+    assert manager.contains("new.com")
+
+    resume.set()
+    assert manager.wait_loaded(5)
+    sites = manager.get_blocked_sites()
+    assert sites.count("new.com") == 1
+    assert sorted(sites) == sorted(BlockingManager(manager.hosts_path).blocked)
+    assert manager.apply_changes(remove=["new.com"]) == ([], {"new.com"})
+    assert not BlockingManager(manager.hosts_path).contains("new.com")
+
+
+def test_blocks_of_unparsed_sites_are_not_appended(paused_load):
+    manager, resume = paused_load
+    added = []
+    subscription = manager.events.subscribe(added.append, kinds=(ADDED,))
+    with open(manager.hosts_path) as file:
+        before = file.read()
+
+    # site99.com is in a batch the load has not parsed yet
+    assert "site99.com" not in list(manager.iter_blocked())
+    assert manager.block_many(["site99.com", "site9.co"]) == (["site9.co"], set())
+
+    resume.set()
+    assert manager.wait_loaded(5)
+    subscription.close(wait=True)
+    assert [list(event.sites) for event in added] == [["site9.co"]]
+    with open(manager.hosts_path) as file:
+        assert file.read().count("site99.com") == before.count("site99.com") == 1
+    assert manager.get_blocked_sites().count("site99.com") == 1
+
+
+def test_apply_changes_appends_during_the_load(paused_load):
+    manager, resume = paused_load
+
+    assert manager.apply_changes(add=["new.com", "site99.com"]) == (
+        ["new.com"],
+        set(),
+    )
+    assert not manager.loaded
+    assert manager.contains("new.com")
+
+    resume.set()
+    assert manager.wait_loaded(5)
+    assert manager.get_blocked_sites().count("site99.com") == 1
@@ -1,25 +1,5 @@
-import pytest
-
 from app.block import BlockingManager
-from app.utils import copy_file
-
-
-FAKE_HOSTS_PATH = "tests/data/fake_hosts"
-NR_OF_BLOCKED_SITES = 12
-
-
-@pytest.fixture
-def fake_hosts_file(tmp_path):
-    """Fixture to create a fake hosts file with initial content."""
-    hosts_path = tmp_path / "hosts"
-    copy_file(FAKE_HOSTS_PATH, hosts_path)
-    return str(hosts_path)
-
-
-@pytest.fixture
-def blocking_manager(fake_hosts_file):
-    """Fixture to create a BlockingManager instance with the fake hosts file."""
-    return BlockingManager(fake_hosts_file)
+from tests.utils import NR_OF_BLOCKED_SITES
 
 
 def test_initialization(blocking_manager, tmp_path):
@@ -63,3 +43,17 @@ def test_block_unblock(blocking_manager):
     blocking_manager.unblock("www.example00.com")
     assert "www.example00.com" not in blocking_manager.blocked
     assert len(blocking_manager.blocked) == NR_OF_BLOCKED_SITES
+
+
+def test_unblock_keeps_other_names_on_line(tmp_path):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text(
+        "127.0.0.1 localhost\n0.0.0.0 a.com b.com c.com  # shared\n192.168.1.2 b.com\n"
+    )
+    blocking_manager = BlockingManager(str(hosts_path))
+    assert sorted(blocking_manager.blocked) == ["a.com", "b.com", "c.com"]
+    blocking_manager.unblock("b.com")
+    assert hosts_path.read_text() == (
+        "127.0.0.1 localhost\n0.0.0.0 a.com c.com  # shared\n192.168.1.2 b.com\n"
+    )
+    assert sorted(blocking_manager.blocked) == ["a.com", "c.com"]
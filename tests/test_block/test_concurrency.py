@@ -0,0 +1,67 @@
+import threading
+
+import pytest
+
+from app.block import BlockingManager
+
+
+WRITERS = 4
+READERS = 4
+ROUNDS = 10
+
+
+def test_readers_only_see_whole_writes(blocking_manager):
+    initial = len(blocking_manager.blocked)
+    stop = threading.Event()
+    errors = []
+
+    def writer(number):
+        try:
+            for round_number in range(ROUNDS):
+                pair = [f"a{number}-{round_number}.com", f"b{number}-{round_number}.com"]
+                blocking_manager.block_many(pair)
+                if round_number % 2:
+                    blocking_manager.unblock_many(pair)
+        except Exception as e:  # pragma: no cover - reported below
+            errors.append(e)
+
+    def reader():
+        while not stop.is_set():
+            snapshot = blocking_manager.blocked
+            sites = blocking_manager.get_blocked_sites()
+            try:
+                # Each pair is written and removed in one write, so a
+                # snapshot holds both sites or neither.
+                for site in snapshot:
+                    if site.startswith("a"):
+                        assert "b" + site[1:] in snapshot
+                assert len(sites) >= initial
+            except AssertionError as e:
+                errors.append(e)
+                return
+
+    readers = [threading.Thread(target=reader) for _ in range(READERS)]
+    writers = [threading.Thread(target=writer, args=(n,)) for n in range(WRITERS)]
+    for thread in readers + writers:
+        thread.start()
+    for thread in writers:
+        thread.join()
+    stop.set()
+    for thread in readers:
+        thread.join()
+
+    assert errors == []
+    expected = initial + WRITERS * 2 * (ROUNDS - ROUNDS // 2)
+    assert len(blocking_manager.blocked) == expected
+    assert dict(BlockingManager(blocking_manager.hosts_path).blocked) == dict(
+        blocking_manager.blocked
+    )
+
+
+def test_snapshots_are_read_only(blocking_manager):
+    snapshot = blocking_manager.blocked
+    with pytest.raises(TypeError):
+        snapshot["new.com"] = 0
+    blocking_manager.block("new.com")
+    assert "new.com" not in snapshot
+    assert "new.com" in blocking_manager.blocked
@@ -0,0 +1,52 @@
+from app.block import BlockingManager
+from app.events import ADDED
+from app.events import BlockingEvent
+from app.events import EXPIRED
+from app.events import RELOADED
+from app.events import REMOVED
+
+
+def collect(blocking_manager, action):
+    received = []
+    subscription = blocking_manager.events.subscribe(received.append)
+    action()
+    subscription.close(wait=True)
+    return received
+
+
+def test_one_event_per_kind_and_write(blocking_manager):
+    events = collect(
+        blocking_manager,
+        lambda: blocking_manager.apply_changes(
+            add=["a.com", "b.com"], remove=["example1.com"]
+        ),
+    )
+    assert events == [
+        BlockingEvent(ADDED, ("a.com", "b.com")),
+        BlockingEvent(REMOVED, ("example1.com",)),
+    ]
+
+
+def test_no_op_writes_are_silent(blocking_manager):
+    assert collect(blocking_manager, lambda: blocking_manager.block_many([])) == []
+
+
+def test_expired_sites(blocking_manager):
+    blocking_manager.block("a.com", duration=100)
+    blocking_manager.block("b.com", duration=300)
+
+    events = collect(blocking_manager, lambda: blocking_manager.expire_sites(now=200))
+
+    assert events == [BlockingEvent(EXPIRED, ("a.com",))]
+    assert blocking_manager.contains("b.com")
+
+
+def test_external_changes_are_reloaded(blocking_manager):
+    other = BlockingManager(blocking_manager.hosts_path)
+    other.apply_changes(add=["x.com"], remove=["example1.com"])
+
+    events = collect(blocking_manager, lambda: blocking_manager.block("a.com"))
+
+    assert events[0].kind == RELOADED
+    assert sorted(events[0].sites) == ["example1.com", "x.com"]
+    assert events[1] == BlockingEvent(ADDED, ("a.com",))
@@ -0,0 +1,67 @@
+import pytest
+
+from app.block import BlockingManager
+from tests.utils import NR_OF_BLOCKED_SITES
+from tests.utils import read_mock_state
+from tests.utils import spy_writes
+
+
+@pytest.fixture
+def blocking_manager(fake_hosts_file):
+    """Fixture to create a BlockingManager with two overlapping groups."""
+    manager = BlockingManager(fake_hosts_file)
+    manager.set_group("social", ["facebook.com", "twitter.com", "shared.com"])
+    manager.set_group("news", ["news.com", "shared.com"])
+    return manager
+
+
+def test_state_file_next_to_hosts(blocking_manager, tmp_path):
+    assert blocking_manager.state_file == str(tmp_path / "blanc-all.json")
+    state = read_mock_state(blocking_manager)
+    assert state["groups"]["news"] == ["news.com", "shared.com"]
+
+
+def test_block_group_single_write(blocking_manager):
+    calls = spy_writes(blocking_manager)
+    blocking_manager.block_group("social")
+    assert len(calls) == 1
+    assert {"facebook.com", "twitter.com", "shared.com"} <= set(
+        blocking_manager.blocked
+    )
+    assert len(blocking_manager.blocked) == NR_OF_BLOCKED_SITES + 3
+
+
+def test_shared_site_kept_until_last_group_released(blocking_manager):
+    blocking_manager.block_group("social")
+    blocking_manager.block_group("news")
+    blocking_manager.unblock_group("social")
+    assert "shared.com" in blocking_manager.blocked
+    assert "facebook.com" not in blocking_manager.blocked
+    blocking_manager.unblock_group("news")
+    assert "shared.com" not in blocking_manager.blocked
+    assert len(blocking_manager.blocked) == NR_OF_BLOCKED_SITES
+
+
+def test_active_groups_survive_reload(blocking_manager, fake_hosts_file):
+    blocking_manager.block_group("social")
+    blocking_manager.block_group("news")
+    reloaded = BlockingManager(fake_hosts_file)
+    assert reloaded.active_groups == {"social", "news"}
+    reloaded.unblock_group("news")
+    assert "shared.com" in reloaded.blocked
+    assert "news.com" not in reloaded.blocked
+
+
+def test_redefining_active_group_writes_delta(blocking_manager):
+    blocking_manager.block_group("social")
+    blocking_manager.set_group("social", ["facebook.com", "instagram.com"])
+    assert "instagram.com" in blocking_manager.blocked
+    assert "twitter.com" not in blocking_manager.blocked
+    assert "facebook.com" in blocking_manager.blocked
+
+
+def test_delete_active_group_unblocks_it(blocking_manager):
+    blocking_manager.block_group("news")
+    blocking_manager.delete_group("news")
+    assert "news" not in blocking_manager.groups
+    assert "news.com" not in blocking_manager.blocked
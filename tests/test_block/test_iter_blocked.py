@@ -0,0 +1,52 @@
+import pytest
+
+from app.block import BlockingManager
+
+
+SITES = ["b.com", "ads.net", "a.com", "ad.org", "adserver.io", "c.org"]
+
+
+@pytest.fixture
+def blocking_manager(tmp_path):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text("".join(f"0.0.0.0 {site}\n" for site in SITES))
+    return BlockingManager(str(hosts_path))
+
+
+def test_insertion_order_pages(blocking_manager):
+    assert list(blocking_manager.iter_blocked()) == SITES
+    assert list(blocking_manager.iter_blocked(offset=2, limit=2)) == ["a.com", "ad.org"]
+    assert list(blocking_manager.iter_blocked(prefix="ad", limit=2)) == [
+        "ads.net",
+        "ad.org",
+    ]
+
+
+def test_sorted_prefix_pages(blocking_manager):
+    assert list(blocking_manager.iter_blocked(sort=True)) == sorted(SITES)
+    assert list(blocking_manager.iter_blocked(prefix="ad", sort=True)) == [
+        "ad.org",
+        "ads.net",
+        "adserver.io",
+    ]
+    assert list(
+        blocking_manager.iter_blocked(prefix="ad", offset=1, limit=1, sort=True)
+    ) == ["ads.net"]
+    assert list(blocking_manager.iter_blocked(prefix="zz", sort=True)) == []
+    assert list(blocking_manager.iter_blocked(offset=10, sort=True)) == []
+
+
+def test_sorted_order_is_reused_until_the_next_write(blocking_manager):
+    blocking_manager.iter_blocked(sort=True)
+    cached = blocking_manager._sorted_cache[1]
+    blocking_manager.iter_blocked(sort=True, limit=1)
+    assert blocking_manager._sorted_cache[1] is cached
+
+    blocking_manager.block("0.com")
+    assert next(blocking_manager.iter_blocked(sort=True)) == "0.com"
+
+
+def test_count_and_contains(blocking_manager):
+    assert blocking_manager.count() == len(SITES)
+    assert blocking_manager.contains("ads.net")
+    assert not blocking_manager.contains("www.ads.net")
@@ -0,0 +1,90 @@
+import os
+import threading
+
+
+from app.block import BlockingManager
+from tests.utils import NR_OF_BLOCKED_SITES
+
+
+def read_sites(hosts_path):
+    with open(hosts_path, "r") as file:
+        return [line.split()[1] for line in file if line.strip() and line[0] != "#"]
+
+
+def test_stale_manager_merges_instead_of_clobbering(fake_hosts_file):
+    first = BlockingManager(fake_hosts_file)
+    second = BlockingManager(fake_hosts_file)
+    first.block("first.com")
+    second.block("second.com")
+    assert "first.com" in second.blocked
+    first.unblock("www.example1.com")
+    assert "second.com" in first.blocked
+    sites = read_sites(fake_hosts_file)
+    assert "first.com" in sites
+    assert "second.com" in sites
+    assert "www.example1.com" not in sites
+
+
+def test_stale_manager_sees_external_removal(fake_hosts_file):
+    first = BlockingManager(fake_hosts_file)
+    second = BlockingManager(fake_hosts_file)
+    first.unblock("example1.com")
+    second.block("new.com")
+    assert "example1.com" not in second.blocked
+    assert "example1.com" not in read_sites(fake_hosts_file)
+
+
+def test_same_size_rewrite_detected_by_hash(fake_hosts_file):
+    manager = BlockingManager(fake_hosts_file)
+    stat = os.stat(fake_hosts_file)
+    with open(fake_hosts_file, "r") as file:
+        content = file.read()
+    with open(fake_hosts_file, "w") as file:
+        file.write(content.replace("example3.com\n", "example9.com\n", 1))
+    os.utime(fake_hosts_file, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    manager.block("new.com")
+    assert "example9.com" in manager.blocked
+    assert "example3.com" not in manager.blocked
+
+
+def test_lock_timeout_leaves_state_untouched(fake_hosts_file):
+    holder = BlockingManager(fake_hosts_file)
+    waiter = BlockingManager(fake_hosts_file, lock_timeout=0.05)
+    with holder._locked():
+        waiter.block("new.com")
+    assert "new.com" not in waiter.blocked
+    assert "new.com" not in read_sites(fake_hosts_file)
+
+
+def test_concurrent_managers_do_not_lose_writes(fake_hosts_file):
+    def worker(index):
+        manager = BlockingManager(fake_hosts_file)
+        for i in range(20):
+            manager.block(f"site{index}-{i}.com")
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    manager = BlockingManager(fake_hosts_file)
+    assert len(manager.blocked) == NR_OF_BLOCKED_SITES + 80
+
+
+def test_stale_manager_merges_the_state_file(fake_hosts_file):
+    gui = BlockingManager(fake_hosts_file)
+    cli = BlockingManager(fake_hosts_file)
+    cli.add_allow_rule("*.cdn.net")
+    cli.set_group("social", ["facebook.com"])
+    gui.set_group("news", ["cnn.com"])
+    gui.delete_group("news")
+    gui.set_group("video", ["youtube.com"])
+
+    state = BlockingManager(fake_hosts_file)
+    assert set(state.groups) == {"social", "video"}
+    assert state.allowlist.allows("img.cdn.net")
+    assert set(gui.groups) == {"social", "video"}
+    cli.remove_allow_rule("*.cdn.net")
+    assert not BlockingManager(fake_hosts_file).allowlist.allows("img.cdn.net")
+    assert set(BlockingManager(fake_hosts_file).groups) == {"social", "video"}
@@ -0,0 +1,94 @@
+import pytest
+
+from app.block import BlockingManager
+from app.commands import ApplyCommand
+from app.commands import BlockMatchingCommand
+from tests.utils import read_mock_state
+
+
+@pytest.fixture
+def blocking_manager(fake_hosts_file):
+    """Fixture to create a BlockingManager with a group over a blocked site."""
+    manager = BlockingManager(fake_hosts_file)
+    manager.set_group("work", ["example1.com", "news.com"])
+    return manager
+
+
+def test_why_lists_every_source(blocking_manager):
+    blocking_manager.block_group("work")
+    blocking_manager.apply_subscription("list", {"news.com", "ads.net"})
+
+    assert blocking_manager.why("example1.com") == ["group:work", "manual"]
+    assert blocking_manager.why("news.com") == ["group:work", "subscription:list"]
+    assert blocking_manager.why("ads.net") == ["subscription:list"]
+    assert blocking_manager.why("example2.com") == ["manual"]
+    assert blocking_manager.why("unknown.com") == []
+
+
+def test_manual_block_survives_group_release(blocking_manager):
+    blocking_manager.block_group("work")
+    blocking_manager.unblock_group("work")
+
+    assert blocking_manager.contains("example1.com")
+    assert not blocking_manager.contains("news.com")
+
+
+def test_manual_block_of_group_site_survives_release(blocking_manager):
+    blocking_manager.block_group("work")
+    blocking_manager.block_many(["news.com"])
+
+    blocking_manager.unblock_group("work")
+
+    assert blocking_manager.why("news.com") == ["manual"]
+
+
+def test_subscription_removal_keeps_sites_other_sources_need(blocking_manager):
+    blocking_manager.block_group("work")
+    blocking_manager.apply_subscription("list", {"news.com", "ads.net", "example2.com"})
+
+    blocking_manager.apply_subscription("list", set())
+
+    assert blocking_manager.why("news.com") == ["group:work"]
+    assert blocking_manager.why("example2.com") == ["manual"]
+    assert not blocking_manager.contains("ads.net")
+
+
+def test_manual_unblock_drops_every_reference(blocking_manager):
+    blocking_manager.block_group("work")
+    blocking_manager.unblock("example1.com")
+    blocking_manager.block_many(["example1.com"])
+
+    assert blocking_manager.why("example1.com") == ["manual"]
+
+
+def test_sources_survive_reload(blocking_manager):
+    blocking_manager.block_group("work")
+    blocking_manager.block_many(["news.com"])
+
+    assert read_mock_state(blocking_manager)["manual"] == ["example1.com", "news.com"]
+    reloaded = BlockingManager(blocking_manager.hosts_path)
+    assert reloaded.why("news.com") == ["group:work", "manual"]
+    reloaded.unblock_group("work")
+    assert reloaded.contains("example1.com")
+    assert reloaded.contains("news.com")
+
+
+def test_imports_are_their_own_source(blocking_manager, tmp_path):
+    blocklist = tmp_path / "ads.txt"
+    blocklist.write_text("ads.com\ntracker.ads.com\nexample1.com\n")
+
+    ApplyCommand(blocking_manager, str(blocklist)).execute()
+    BlockMatchingCommand(blocking_manager, "*.net", str(blocklist)).execute()
+    blocklist.write_text("cdn.net\n")
+    BlockMatchingCommand(blocking_manager, "*.net", str(blocklist)).execute()
+
+    assert blocking_manager.why("ads.com") == ["import:ads.txt"]
+    assert blocking_manager.why("cdn.net") == ["import:ads.txt"]
+    assert blocking_manager.why("example1.com") == ["import:ads.txt", "manual"]
+    assert read_mock_state(blocking_manager)["sources"] == {
+        "import:ads.txt": ["ads.com", "cdn.net", "example1.com", "tracker.ads.com"]
+    }
+    reloaded = BlockingManager(blocking_manager.hosts_path)
+    assert reloaded.why("tracker.ads.com") == ["import:ads.txt"]
+    reloaded.unblock("ads.com")
+    assert "ads.com" not in read_mock_state(reloaded)["sources"]["import:ads.txt"]
@@ -0,0 +1,77 @@
+from app.block import BlockingManager
+
+
+# Entries of the fake hosts file without the blanc-all marker
+UNMARKED = [
+    "example3.com",
+    "www.example3.com",
+    "www.example3.com/page_name1",
+    "www.example3.com/page_name2",
+]
+
+
+def test_reconcile_minimal_diff(blocking_manager):
+    desired = ["example1.com", "www.example1.com", "new.com"]
+    to_add, to_remove = blocking_manager.reconcile(desired)
+    assert to_add == ["new.com"]
+    assert len(to_remove) == 6
+    assert sorted(blocking_manager.blocked) == sorted(desired + UNMARKED)
+
+
+def test_reconcile_dry_run_writes_nothing(blocking_manager):
+    before = dict(blocking_manager.blocked)
+    to_add, to_remove = blocking_manager.reconcile(["new.com"], dry_run=True)
+    assert to_add == ["new.com"]
+    assert len(to_remove) == 8
+    assert blocking_manager.blocked == before
+
+
+def test_reapply_is_zero_write_noop(blocking_manager):
+    blocking_manager.reconcile(["a.com", "b.com"])
+    with open(blocking_manager.hosts_path, "r") as file:
+        content = file.read()
+    blocking_manager._locked = None  # any write attempt would fail
+    assert blocking_manager.reconcile(["b.com", "a.com"]) == ([], [])
+    with open(blocking_manager.hosts_path, "r") as file:
+        assert file.read() == content
+
+
+def test_reconcile_keeps_entries_it_did_not_write(tmp_path):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text(
+        "127.0.0.1 localhost\n"
+        "127.0.1.1 devbox.lan devbox\n"
+        "::1 localhost ip6-localhost ip6-loopback\n"
+        "0.0.0.0 old.com  # blocked by blanc-all\n"
+    )
+    blocking_manager = BlockingManager(str(hosts_path))
+
+    assert blocking_manager.reconcile({"ads.com", "new.com"}) == (
+        ["ads.com", "new.com"],
+        ["old.com"],
+    )
+    content = hosts_path.read_text()
+    assert "127.0.1.1 devbox.lan devbox\n" in content
+    assert "127.0.0.1 localhost\n" in content
+    assert "old.com" not in content
+
+
+def test_reconcile_decides_removals_under_the_lock(blocking_manager):
+    other = BlockingManager(blocking_manager.hosts_path)
+    other.block("late.com")
+    desired = ["example1.com", "www.example1.com", "new.com"]
+
+    to_add, to_remove = blocking_manager.reconcile(desired)
+
+    assert to_add == ["new.com"]
+    assert "late.com" in to_remove
+    assert "late.com" not in BlockingManager(blocking_manager.hosts_path).blocked
+
+
+def test_dry_run_uses_the_cache(blocking_manager, tmp_path):
+    blocking_manager.hosts_path = str(tmp_path / "missing")
+
+    to_add, to_remove = blocking_manager.reconcile(["new.com"], dry_run=True)
+
+    assert to_add == ["new.com"]
+    assert len(to_remove) == 8
@@ -0,0 +1,59 @@
+import pytest
+
+from app.block import BlockingManager
+from tests.utils import spy_writes
+
+
+def entries(blocking_manager, site):
+    with open(blocking_manager.hosts_path, "r") as file:
+        return [line.split()[0] for line in file if site in line.split()[1:2]]
+
+
+def test_dual_stack_entries(tmp_path):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text("127.0.0.1 localhost\n")
+    blocking_manager = BlockingManager(str(hosts_path), redirect="null-dual")
+
+    blocking_manager.block("ads.com")
+    assert entries(blocking_manager, "ads.com") == ["0.0.0.0", "::"]
+
+    reloaded = BlockingManager(str(hosts_path))
+    assert list(reloaded.iter_blocked()) == ["ads.com"]
+    reloaded.unblock("ads.com")
+    assert entries(reloaded, "ads.com") == []
+
+
+def test_migration_rewrites_once(blocking_manager):
+    writes = spy_writes(blocking_manager)
+    before = list(blocking_manager.iter_blocked())
+
+    rewritten = blocking_manager.set_redirect("null")
+
+    assert len(writes) == 1
+    assert sorted(rewritten) == sorted(before)
+    assert entries(blocking_manager, "example1.com") == ["0.0.0.0"]
+    assert sorted(BlockingManager(blocking_manager.hosts_path).blocked) == sorted(
+        before
+    )
+
+
+def test_per_site_strategy_survives_manager_migration(blocking_manager):
+    blocking_manager.set_redirect("10.0.0.1,::1", sites=["example1.com"])
+    blocking_manager.set_redirect("null")
+    blocking_manager.block("new.com")
+
+    assert entries(blocking_manager, "example1.com") == ["10.0.0.1", "::1"]
+    assert entries(blocking_manager, "new.com") == ["0.0.0.0"]
+
+    reloaded = BlockingManager(blocking_manager.hosts_path)
+    assert reloaded.redirect == "null"
+    assert reloaded.site_redirects == {"example1.com": "10.0.0.1,::1"}
+
+    reloaded.set_redirect(None, sites=["example1.com"])
+    assert entries(reloaded, "example1.com") == ["0.0.0.0"]
+
+
+def test_invalid_strategy_changes_nothing(blocking_manager):
+    with pytest.raises(ValueError):
+        blocking_manager.set_redirect("nowhere")
+    assert blocking_manager.redirect == "127.0.0.1"
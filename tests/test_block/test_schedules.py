@@ -0,0 +1,81 @@
+import datetime
+
+import pytest
+
+from app.block import BlockingManager
+from tests.utils import spy_writes
+
+
+# 2024-01-01 is a Monday.
+MONDAY = datetime.datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def blocking_manager(fake_hosts_file):
+    """Fixture to create a BlockingManager with a site and a group schedule."""
+    manager = BlockingManager(fake_hosts_file)
+    manager.set_group("video", ["youtube.com", "vimeo.com"])
+    manager.add_schedule("group:video", "mon-fri", "09:00", "17:00")
+    manager.add_schedule("news.com", "mon", "12:00", "13:00")
+    return manager
+
+
+def test_apply_schedules_in_one_write(blocking_manager):
+    calls = spy_writes(blocking_manager)
+    blocking_manager.apply_schedules(MONDAY.replace(hour=12, minute=30))
+    assert len(calls) == 1
+    assert {"youtube.com", "vimeo.com", "news.com"} <= set(blocking_manager.blocked)
+    assert blocking_manager.active_groups == {"video"}
+
+
+def test_schedule_state_recomputed_after_restart(blocking_manager, fake_hosts_file):
+    blocking_manager.apply_schedules(MONDAY.replace(hour=12, minute=30))
+    restarted = BlockingManager(fake_hosts_file)
+    restarted.apply_schedules(MONDAY.replace(hour=18))
+    assert "youtube.com" not in restarted.blocked
+    assert "news.com" not in restarted.blocked
+    assert restarted.active_groups == set()
+
+
+def test_due_transitions_applied_as_batch(blocking_manager):
+    blocking_manager.apply_schedules(MONDAY.replace(hour=8))
+    assert "youtube.com" not in blocking_manager.blocked
+    scheduler = blocking_manager._scheduler
+    assert scheduler.peek() == MONDAY.replace(hour=9)
+    now = MONDAY.replace(hour=9)
+    blocking_manager.apply_schedules(now, scheduler.pop_due(now))
+    assert "youtube.com" in blocking_manager.blocked
+    assert "news.com" not in blocking_manager.blocked
+
+
+def test_site_held_by_active_group_survives_schedule(blocking_manager):
+    blocking_manager.set_group("news", ["news.com"])
+    blocking_manager.block_group("news")
+    blocking_manager.apply_schedules(MONDAY.replace(hour=18))
+    assert "news.com" in blocking_manager.blocked
+
+
+def test_manual_block_survives_schedule_end_and_restart(
+    blocking_manager, fake_hosts_file
+):
+    blocking_manager.block("video.com")
+    blocking_manager.add_schedule("video.com", "mon-fri", "09:00", "17:00")
+    blocking_manager.apply_schedules(MONDAY.replace(hour=10))
+    assert blocking_manager.why("video.com") == ["manual", "schedule:video.com"]
+
+    blocking_manager.apply_schedules(MONDAY.replace(hour=18))
+    assert "video.com" in blocking_manager.blocked
+    assert blocking_manager.why("video.com") == ["manual"]
+
+    restarted = BlockingManager(fake_hosts_file)
+    restarted.apply_schedules(MONDAY + datetime.timedelta(days=5))
+    assert "video.com" in restarted.blocked
+
+
+def test_scheduled_site_is_released_after_restart(blocking_manager, fake_hosts_file):
+    blocking_manager.apply_schedules(MONDAY.replace(hour=12, minute=30))
+    assert blocking_manager.why("news.com") == ["schedule:news.com"]
+
+    restarted = BlockingManager(fake_hosts_file)
+    restarted.apply_schedules(MONDAY + datetime.timedelta(days=5))
+    assert "news.com" not in restarted.blocked
@@ -0,0 +1,56 @@
+import threading
+
+from app import bulk
+from app.bulk import validate_lines
+
+
+def test_accepts_domains_urls_and_hosts_lines():
+    lines = [
+        "Example.com",
+        "https://www.tracker.net/pixel.gif",
+        "0.0.0.0 ads.io  # from a list",
+        "",
+        "# comment",
+        "example.com",
+        "not a site!",
+        "-invalid-.com",
+    ]
+
+    result = validate_lines(lines)
+
+    assert result.accepted == ["example.com", "www.tracker.net", "ads.io"]
+    assert result.rejected == ["not a site!", "-invalid-.com"]
+
+
+def test_every_name_of_a_line_counts():
+    lines = [
+        "a.com b.com",
+        "c.com, d.com",
+        "0.0.0.0",
+        "127.0.0.1 localhost",
+        "e.com bad_name!",
+    ]
+
+    result = validate_lines(lines)
+
+    assert result.accepted == ["a.com", "b.com", "c.com", "d.com", "e.com"]
+    assert result.rejected == ["0.0.0.0", "127.0.0.1 localhost", "e.com bad_name!"]
+
+
+def test_reports_progress(monkeypatch):
+    monkeypatch.setattr(bulk, "PROGRESS_INTERVAL", 2)
+    reports = []
+
+    validate_lines(["a.com", "b.com", "c.com"], lambda *args: reports.append(args))
+
+    assert reports == [(2, 3), (3, 3)]
+
+
+def test_cancel_returns_none(monkeypatch):
+    monkeypatch.setattr(bulk, "PROGRESS_INTERVAL", 1)
+    cancel_event = threading.Event()
+
+    def progress(done, total):
+        cancel_event.set()
+
+    assert validate_lines(["a.com", "b.com"], progress, cancel_event) is None
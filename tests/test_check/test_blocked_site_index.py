@@ -0,0 +1,44 @@
+from app.check import BlockedSiteIndex
+from app.check import read_domains
+
+
+def test_exact_and_subdomain_matches():
+    index = BlockedSiteIndex(["ads.example.com", "tracker.net"])
+
+    assert index.contains("ads.example.com")
+    assert index.contains("cdn.ads.example.com")
+    assert index.contains("a.b.tracker.net")
+    assert not index.contains("example.com")
+    assert not index.contains("myads.example.com")
+    assert not index.contains("tracker.org")
+    assert not index.contains("localhost")
+
+
+def test_exact_mode_ignores_parent_blocks():
+    index = BlockedSiteIndex(["tracker.net"], subdomains=False)
+
+    assert index.contains("tracker.net")
+    assert not index.contains("www.tracker.net")
+
+
+def test_single_label_blocks_cover_the_whole_top_level_domain():
+    index = BlockedSiteIndex(["zip"])
+
+    assert index.contains("download.zip")
+    assert index.contains("a.b.zip")
+    assert not index.contains("zip.com")
+
+
+def test_filter_and_invert():
+    index = BlockedSiteIndex(["tracker.net"])
+    domains = ["tracker.net", "example.com", "www.tracker.net"]
+
+    assert list(index.filter(domains)) == ["tracker.net", "www.tracker.net"]
+    assert list(index.filter(domains, invert=True)) == ["example.com"]
+    assert len(index) == 1
+
+
+def test_read_domains_normalizes_lines():
+    lines = ["WWW.Example.COM.\n", "\n", "  tracker.net  \r\n"]
+
+    assert list(read_domains(lines)) == ["www.example.com", "tracker.net"]
@@ -0,0 +1,107 @@
+import csv
+import io
+import json
+
+import pytest
+
+from app.block import BlockingManager
+from app.commands import ListBlockedSitesCommand
+
+
+def make_manager(tmp_path, sites):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text("".join(f"0.0.0.0 {site}\n" for site in sites))
+    return BlockingManager(str(hosts_path))
+
+
+@pytest.fixture
+def blocking_manager(tmp_path):
+    return make_manager(
+        tmp_path, ["b.com", "img.cdn.example.com", "a.com", "static.cdn.net", "c.org"]
+    )
+
+
+def run(capsys, blocking_manager, **options):
+    ListBlockedSitesCommand(blocking_manager, **options).execute()
+    return capsys.readouterr().out
+
+
+def test_text_output_unchanged(capsys, blocking_manager):
+    output = run(capsys, blocking_manager)
+    assert output.splitlines() == [
+        "Currently blocked sites:",
+        "- b.com",
+        "- img.cdn.example.com",
+        "- a.com",
+        "- static.cdn.net",
+        "- c.org",
+    ]
+
+
+def test_text_output_empty(capsys, tmp_path):
+    assert run(capsys, make_manager(tmp_path, [])) == "No sites are currently blocked.\n"
+
+
+def test_sorted_page_as_json(capsys, blocking_manager):
+    output = run(
+        capsys, blocking_manager, output_format="json", sort=True, offset=1, limit=2
+    )
+    assert json.loads(output) == ["b.com", "c.org"]
+
+
+def test_ndjson_with_glob(capsys, blocking_manager):
+    output = run(capsys, blocking_manager, output_format="ndjson", pattern="*.cdn.*")
+    assert [json.loads(line) for line in output.splitlines()] == [
+        "img.cdn.example.com",
+        "static.cdn.net",
+    ]
+
+
+def test_csv_with_regex(capsys, blocking_manager):
+    output = run(
+        capsys, blocking_manager, output_format="csv", pattern=r"\.com$", regex=True
+    )
+    rows = list(csv.reader(io.StringIO(output)))
+    assert rows == [["site"], ["b.com"], ["img.cdn.example.com"], ["a.com"]]
+
+
+def test_count_fast_path(capsys, blocking_manager):
+    assert run(capsys, blocking_manager, count=True) == "5\n"
+    assert run(capsys, blocking_manager, count=True, pattern="*.com") == "3\n"
+
+
+def test_count_respects_the_page_with_or_without_a_filter(capsys, blocking_manager):
+    assert run(capsys, blocking_manager, count=True, offset=1, limit=2) == "2\n"
+    assert run(capsys, blocking_manager, count=True, offset=4, limit=2) == "1\n"
+    assert run(capsys, blocking_manager, count=True, offset=9) == "0\n"
+    output = run(capsys, blocking_manager, count=True, pattern="*.*", offset=4, limit=2)
+    assert output == "1\n"
+
+
+@pytest.mark.parametrize("page", [{"offset": -1}, {"limit": -1}])
+@pytest.mark.parametrize("sort", [False, True])
+def test_negative_page_is_rejected(capsys, blocking_manager, page, sort):
+    output = run(capsys, blocking_manager, sort=sort, **page)
+    assert output == "The offset and limit cannot be negative.\n"
+    with pytest.raises(ValueError):
+        blocking_manager.iter_blocked(sort=sort, **page)
+
+
+def test_prefix_and_glob_ignore_case_alike(capsys, tmp_path):
+    blocking_manager = make_manager(tmp_path, ["Ads.com", "ads.net", "b.com"])
+    for sort in (False, True):
+        for pattern in ("ADS*", "ads.*"):
+            output = run(capsys, blocking_manager, pattern=pattern, sort=sort)
+            assert output.splitlines()[1:] == ["- Ads.com", "- ads.net"]
+
+
+def test_prefix_glob_uses_sorted_prefix_range(capsys, blocking_manager):
+    output = run(capsys, blocking_manager, pattern="IMG*", sort=True)
+    assert output.splitlines() == ["Currently blocked sites:", "- img.cdn.example.com"]
+    assert run(capsys, blocking_manager, pattern="*.com*", count=True) == "3\n"
+
+
+def test_unknown_format(capsys, blocking_manager):
+    assert "Please specify a list format" in run(
+        capsys, blocking_manager, output_format="xml"
+    )
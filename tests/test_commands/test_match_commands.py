@@ -0,0 +1,97 @@
+import pytest
+
+from app.block import BlockingManager
+from app.commands import BlockMatchingCommand
+from app.commands import UnblockMatchingCommand
+from tests.utils import spy_writes
+
+
+@pytest.fixture
+def blocking_manager(tmp_path):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text(
+        "".join(
+            f"0.0.0.0 {site}\n"
+            for site in ["a.com", "img.cdn.example.com", "static.cdn.net", "c.org"]
+        )
+    )
+    return BlockingManager(str(hosts_path))
+
+
+@pytest.fixture
+def writes(blocking_manager):
+    return spy_writes(blocking_manager)
+
+
+def test_unblock_matching_glob_in_one_write(capsys, blocking_manager, writes):
+    UnblockMatchingCommand(blocking_manager, "*.cdn.*").execute()
+
+    assert capsys.readouterr().out == "Unblocked 2 sites matching *.cdn.*.\n"
+    assert len(writes) == 1
+    assert sorted(BlockingManager(blocking_manager.hosts_path).blocked) == [
+        "a.com",
+        "c.org",
+    ]
+
+
+def test_unblock_matching_dry_run(capsys, blocking_manager, writes):
+    UnblockMatchingCommand(blocking_manager, r"\.com$", True, True).execute()
+
+    assert capsys.readouterr().out.splitlines() == [
+        "- a.com",
+        "- img.cdn.example.com",
+        "Would unblock 2 sites matching \\.com$.",
+    ]
+    assert writes == []
+
+
+def test_invalid_regex(capsys, blocking_manager, writes):
+    UnblockMatchingCommand(blocking_manager, "(", regex=True).execute()
+
+    assert "Invalid pattern" in capsys.readouterr().out
+    assert writes == []
+
+
+def test_block_matching_input_list(capsys, tmp_path, blocking_manager, writes):
+    blocking_manager.add_allow_rule("*.ok.cdn.net")
+    input_path = tmp_path / "input.txt"
+    input_path.write_text(
+        "0.0.0.0 new.cdn.net\nnew.cdn.net\nstatic.cdn.net\nother.org\n"
+        "js.ok.cdn.net\n"
+    )
+
+    BlockMatchingCommand(blocking_manager, "*.cdn.net", str(input_path)).execute()
+
+    assert capsys.readouterr().out == "Blocked 1 sites matching *.cdn.net.\n"
+    assert len(writes) == 1
+    assert BlockingManager(blocking_manager.hosts_path).contains("new.cdn.net")
+    assert not blocking_manager.contains("other.org")
+
+
+def test_block_matching_dry_run(capsys, tmp_path, blocking_manager, writes):
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("x.cdn.net\na.com\ny.cdn.net\n")
+
+    BlockMatchingCommand(
+        blocking_manager, "*.cdn.net", str(input_path), dry_run=True
+    ).execute()
+
+    assert capsys.readouterr().out.splitlines() == [
+        "+ x.cdn.net",
+        "+ y.cdn.net",
+        "Would block 2 sites matching *.cdn.net.",
+    ]
+    assert writes == []
+
+
+def test_block_matching_reports_invalid_names(capsys, tmp_path, blocking_manager):
+    input_path = tmp_path / "input.txt"
+    input_path.write_text("a.cdn.net b.cdn.net\nc.cdn.net, bad_name!\n0.0.0.0\n")
+
+    BlockMatchingCommand(blocking_manager, "*.cdn.net", str(input_path)).execute()
+
+    assert capsys.readouterr().out.splitlines() == [
+        "Skipped 1 invalid names: bad_name!",
+        "Blocked 3 sites matching *.cdn.net.",
+    ]
+    assert not BlockingManager(blocking_manager.hosts_path).contains("0.0.0.0")
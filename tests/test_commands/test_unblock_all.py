@@ -0,0 +1,13 @@
+from app.block import BlockingManager
+from app.commands import UnblockAllSitesCommand
+from tests.utils import spy_writes
+
+
+def test_unblock_all_in_one_write(capsys, blocking_manager):
+    writes = spy_writes(blocking_manager)
+
+    UnblockAllSitesCommand(blocking_manager).execute()
+
+    assert len(writes) == 1
+    assert capsys.readouterr().out.endswith("Access to all sites has been unblocked.\n")
+    assert BlockingManager(blocking_manager.hosts_path).count() == 0
@@ -0,0 +1,53 @@
+import threading
+
+from app.events import ADDED
+from app.events import BlockingEvent
+from app.events import EventHub
+from app.events import REMOVED
+
+
+def test_events_are_filtered_by_kind():
+    hub = EventHub()
+    received = []
+    subscription = hub.subscribe(received.append, kinds=[ADDED])
+
+    hub.publish(ADDED, ["a.com", "b.com"])
+    hub.publish(REMOVED, ["c.com"])
+    hub.publish(ADDED, [])
+    subscription.close(wait=True)
+
+    assert received == [BlockingEvent(ADDED, ("a.com", "b.com"))]
+    assert not hub
+
+
+def test_slow_subscriber_does_not_block_publishers():
+    hub = EventHub()
+    release = threading.Event()
+    fast = []
+    slow = hub.subscribe(lambda event: release.wait())
+    quick = hub.subscribe(fast.append)
+
+    for number in range(100):
+        hub.publish(ADDED, [f"{number}.com"])
+    quick.close(wait=True)
+
+    assert len(fast) == 100
+    release.set()
+    slow.close(wait=True)
+
+
+def test_failing_subscriber_keeps_receiving(capsys):
+    hub = EventHub()
+    received = []
+
+    def callback(event):
+        received.append(event)
+        raise RuntimeError("boom")
+
+    subscription = hub.subscribe(callback)
+    hub.publish(ADDED, ["a.com"])
+    hub.publish(ADDED, ["b.com"])
+    subscription.close(wait=True)
+
+    assert len(received) == 2
+    assert "boom" in capsys.readouterr().out
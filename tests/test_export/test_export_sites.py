@@ -0,0 +1,99 @@
+import io
+import json
+
+import pytest
+
+from app.export import collapse_subdomains
+from app.export import export_sites
+from app.export import write_sites
+
+BLOCKED = {
+    "example.com": 0,
+    "www.example.com": 0,
+    "ads.tracker.net": 0,
+    "EXAMPLE.com": 0,
+    "www.example1.com/channel-name1": 0,
+}
+
+
+def export(export_format, collapse=False):
+    output = io.StringIO()
+    count = export_sites(BLOCKED, output, export_format, collapse=collapse)
+    return count, output.getvalue()
+
+
+@pytest.mark.parametrize(
+    "export_format, expected",
+    [
+        (
+            "hosts",
+            "0.0.0.0 example.com\n0.0.0.0 www.example.com\n"
+            "0.0.0.0 ads.tracker.net\n0.0.0.0 www.example1.com\n",
+        ),
+        (
+            "dnsmasq",
+            "address=/example.com/0.0.0.0\naddress=/ads.tracker.net/0.0.0.0\n"
+            "address=/www.example1.com/0.0.0.0\n",
+        ),
+        (
+            "unbound",
+            'server:\n    local-zone: "example.com" always_nxdomain\n'
+            '    local-zone: "ads.tracker.net" always_nxdomain\n'
+            '    local-zone: "www.example1.com" always_nxdomain\n',
+        ),
+        (
+            "adblock",
+            "[Adblock Plus 2.0]\n||example.com^\n||ads.tracker.net^\n"
+            "||www.example1.com^\n",
+        ),
+    ],
+)
+def test_export_formats_with_collapse(export_format, expected):
+    _, content = export(export_format, collapse=True)
+    assert content == expected
+
+
+def test_collapse_ignored_for_hosts_format():
+    count, _ = export("hosts", collapse=True)
+    assert count == 4
+
+
+def test_export_json_is_valid():
+    count, content = export("json")
+    assert json.loads(content) == [
+        "example.com",
+        "www.example.com",
+        "ads.tracker.net",
+        "www.example1.com",
+    ]
+    assert count == 4
+
+
+def test_export_empty_json():
+    output = io.StringIO()
+    assert export_sites({}, output, "json") == 0
+    assert json.loads(output.getvalue()) == []
+
+
+def test_export_unknown_format():
+    with pytest.raises(ValueError):
+        export_sites(BLOCKED, io.StringIO(), "bind")
+
+
+def test_collapse_is_lazy():
+    sites = iter(["a.example.com", "b.other.com"])
+    collapsed = collapse_subdomains(sites, {"example.com"})
+    assert next(collapsed) == "b.other.com"
+
+
+@pytest.mark.parametrize(
+    "export_format, expected",
+    [
+        (None, "a.com\nb.com\n"),
+        ("adblock", "[Adblock Plus 2.0]\n||a.com^\n||b.com^\n"),
+    ],
+)
+def test_write_sites_counts_sites_not_lines(export_format, expected):
+    output = io.StringIO()
+    assert write_sites(iter(["a.com", "b.com"]), output, export_format) == 2
+    assert output.getvalue() == expected
@@ -0,0 +1,69 @@
+import pytest
+
+from app.block import BlockingManager
+from app import fleet
+from app.fleet import push_fleet
+from app.utils import copy_file
+from tests.utils import FAKE_HOSTS_PATH
+
+
+DESIRED = ["example1.com", "ads.com", "tracker.com"]
+
+
+@pytest.fixture
+def targets(tmp_path):
+    """Fixture to create one hosts file per machine directory."""
+    paths = []
+    for machine in range(5):
+        directory = tmp_path / f"machine{machine}"
+        directory.mkdir()
+        copy_file(FAKE_HOSTS_PATH, directory / "hosts")
+        paths.append(str(directory / "hosts"))
+    return paths
+
+
+def test_push_reconciles_every_target(targets):
+    results = list(push_fleet(targets, DESIRED, workers=3))
+    assert [result.target for result in results] == targets
+    for result in results:
+        assert result.error is None
+        assert result.added == ["ads.com", "tracker.com"]
+        # Only the 8 marked entries are blanc-all's to remove
+        assert len(result.removed) == 7
+        assert set(DESIRED) <= BlockingManager(result.target).blocked.keys()
+
+
+def test_push_second_run_is_noop(targets):
+    list(push_fleet(targets, DESIRED))
+    results = list(push_fleet(targets, DESIRED))
+    assert all(not result.added and not result.removed for result in results)
+
+
+def test_push_reports_failed_target(targets, tmp_path, monkeypatch):
+    monkeypatch.setattr(fleet, "RETRY_DELAY", 0)
+    missing = str(tmp_path / "offline" / "hosts")
+    results = list(push_fleet(targets + [missing], DESIRED, retries=1))
+    assert results[-1].error == "hosts file is missing"
+    assert results[-1].attempts == 2
+    assert all(result.error is None for result in results[:-1])
+
+
+def test_push_dry_run_writes_nothing(targets):
+    results = list(push_fleet(targets, DESIRED, dry_run=True))
+    assert results[0].added == ["ads.com", "tracker.com"]
+    assert len(BlockingManager(targets[0]).blocked) == 12
+
+
+def test_push_keeps_machine_hostname(tmp_path):
+    target = tmp_path / "hosts"
+    target.write_text(
+        "127.0.0.1 localhost\n"
+        "127.0.1.1 lab-pc-07.lan lab-pc-07\n"
+        "0.0.0.0 old.com  # blocked by blanc-all\n"
+    )
+
+    (result,) = push_fleet([str(target)], DESIRED)
+
+    assert result.removed == ["old.com"]
+    assert "127.0.1.1 lab-pc-07.lan lab-pc-07\n" in target.read_text()
+    assert sorted(BlockingManager(str(target)).blocked) == sorted(DESIRED)
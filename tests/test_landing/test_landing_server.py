@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+from app.landing import LandingPageServer
+
+
+def write_quotes(tmp_path):
+    quote_path = tmp_path / "quotes.json"
+    quote_path.write_text(json.dumps([{"quote": "Stay <focused>", "author": "Me"}]))
+    return str(quote_path)
+
+
+async def read_response(reader):
+    header = await reader.readuntil(b"\r\n\r\n")
+    length = int(header.split(b"Content-Length: ")[1].split(b"\r\n")[0])
+    body = await reader.readexactly(length) if b"HEAD" not in header else b""
+    return header, body
+
+
+def run_client(server, client):
+    async def main():
+        await server.start()
+        port = server._server.sockets[0].getsockname()[1]
+        try:
+            return await client(port)
+        finally:
+            server._server.close()
+            await server._server.wait_closed()
+
+    return asyncio.run(main())
+
+
+def test_serves_page_with_quote_over_keep_alive(tmp_path):
+    server = LandingPageServer("127.0.0.1", 0, write_quotes(tmp_path))
+
+    async def client(port):
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        responses = []
+        for path in ("/ad.js", "/pixel.gif", "/"):
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: ads.com\r\n\r\n".encode())
+            responses.append(await read_response(reader))
+        writer.close()
+        return responses
+
+    responses = run_client(server, client)
+    assert len(responses) == 3
+    for header, body in responses:
+        assert header.startswith(b"HTTP/1.1 200 OK")
+        assert b"Connection: keep-alive" in header
+        assert b"Stay &lt;focused&gt;" in body
+        assert b"- Me" in body
+
+
+def test_connection_close_and_http10(tmp_path):
+    server = LandingPageServer("127.0.0.1", 0, write_quotes(tmp_path))
+
+    async def client(port):
+        results = []
+        for request in (
+            b"GET / HTTP/1.1\r\nConnection: close\r\n\r\n",
+            b"GET / HTTP/1.0\r\n\r\n",
+        ):
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(request)
+            response = await reader.read()
+            writer.close()
+            results.append(response)
+        return results
+
+    for response in run_client(server, client):
+        assert b"Connection: close" in response
+        assert b"This site is blocked" in response
+
+
+def test_page_is_rendered_once_per_day(tmp_path):
+    server = LandingPageServer("127.0.0.1", 0, write_quotes(tmp_path))
+    first = server.responses()
+    assert server.responses() is first
+    server._expires = 0.0
+    assert server.responses() is not first
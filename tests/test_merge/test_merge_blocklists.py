@@ -0,0 +1,72 @@
+import os
+import random
+
+import pytest
+
+import app.merge as merge
+from app.commands import MergeCommand
+from app.merge import domain_key
+from app.merge import merge_blocklists
+
+
+def test_sorted_and_deduplicated_across_lists():
+    first = ["0.0.0.0 b.com", "A.com", "# comment", "c.org"]
+    second = ["c.org", "http://b.com/path", "0.0.0.0 localhost.invalid"]
+
+    assert list(merge_blocklists([first, second])) == [
+        "a.com",
+        "b.com",
+        "c.org",
+        "localhost.invalid",
+    ]
+
+
+def test_spilled_runs_match_an_in_memory_merge(tmp_path, monkeypatch):
+    sites = [f"site{index}.example{index % 7}.com" for index in range(3000)]
+    lists = [random.Random(seed).sample(sites, 2000) for seed in range(3)]
+    # A run holds only a few sites, and runs are merged a few at a time
+    monkeypatch.setattr(merge, "SITE_OVERHEAD", 1 << 17)
+    monkeypatch.setattr(merge, "MERGE_FAN_IN", 4)
+
+    merged = list(merge_blocklists(lists, memory_mb=1, temp_dir=str(tmp_path)))
+
+    assert merged == sorted(set().union(*lists))
+    assert os.listdir(tmp_path) == []
+
+
+def test_collapse_drops_subdomains_of_listed_parents(monkeypatch):
+    sites = [
+        "ads.example.com",
+        "example.com",
+        "example-cdn.com",
+        "img.example-cdn.com",
+        "cdn.example.com",
+        "example.com.au",
+        "ads.net",
+        "x.ads.net",
+    ]
+    monkeypatch.setattr(merge, "SITE_OVERHEAD", 1 << 19)
+
+    for memory_mb in (1, 64):
+        merged = list(merge_blocklists([sites], collapse=True, memory_mb=memory_mb))
+        assert merged == ["example.com.au", "example-cdn.com", "example.com", "ads.net"]
+
+
+def test_domain_key_groups_subdomains():
+    assert domain_key("ads.example.com") == "com.example.ads."
+    assert domain_key("ads.example.com").startswith(domain_key("example.com"))
+
+
+@pytest.mark.parametrize(
+    "export_format, expected",
+    [(None, "a.com\nb.com\n"), ("hosts", "0.0.0.0 a.com\n0.0.0.0 b.com\n")],
+)
+def test_merge_command_output(capsys, tmp_path, export_format, expected):
+    first, second, output = tmp_path / "1.txt", tmp_path / "2.txt", tmp_path / "out"
+    first.write_text("b.com\na.com\n")
+    second.write_text("0.0.0.0 a.com\n")
+
+    MergeCommand([str(first), str(second)], str(output), export_format).execute()
+
+    assert output.read_text() == expected
+    assert capsys.readouterr().out == f"Merged 2 lists into 2 sites in {output}.\n"
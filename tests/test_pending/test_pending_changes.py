@@ -0,0 +1,47 @@
+import pytest
+
+from app.pending import PendingChanges
+from tests.utils import spy_writes
+
+
+@pytest.fixture
+def writes(blocking_manager):
+    return spy_writes(blocking_manager)
+
+
+def test_staged_changes_are_visible_before_the_flush(blocking_manager, writes):
+    pending = PendingChanges(blocking_manager)
+    pending.block("new.com")
+    pending.unblock("example1.com")
+
+    sites = pending.blocked_sites()
+    assert "new.com" in sites
+    assert "example1.com" not in sites
+    assert pending.is_blocked("new.com")
+    assert not pending.is_blocked("example1.com")
+    assert "new.com" not in blocking_manager.blocked
+    assert writes == []
+
+
+def test_flush_writes_everything_once(blocking_manager, writes):
+    pending = PendingChanges(blocking_manager)
+    for site in ("a.com", "b.com", "c.com"):
+        pending.block(site)
+    pending.unblock("example1.com")
+
+    assert pending.flush() == (["a.com", "b.com", "c.com"], {"example1.com"})
+    assert len(writes) == 1
+    assert not pending
+    assert sorted(pending.blocked_sites()) == sorted(blocking_manager.blocked)
+
+
+def test_net_zero_changes_never_touch_disk(blocking_manager, writes):
+    pending = PendingChanges(blocking_manager)
+    pending.block("new.com")
+    pending.unblock("new.com")
+    pending.unblock("example1.com")
+    pending.block("example1.com")
+
+    assert not pending
+    assert pending.flush() == ([], set())
+    assert writes == []
@@ -0,0 +1,59 @@
+from app.provenance import MANUAL
+from app.provenance import SourceRefs
+
+
+def commit(refs, add=(), remove=(), blocked=()):
+    return refs.commit(refs.plan(add, remove, blocked))
+
+
+def test_site_is_held_until_its_last_source_is_released():
+    refs = SourceRefs()
+    commit(refs, add=[("group:a", ["x.com", "y.com"]), ("group:b", ["y.com"])])
+
+    masks = refs.plan(remove=[("group:a", refs.members("group:a"))])
+
+    assert masks["x.com"] == 0
+    assert masks["y.com"] != 0
+    refs.commit(masks)
+    assert "x.com" not in refs
+    assert refs.sources("y.com") == ["group:b"]
+
+
+def test_plan_does_not_change_anything_until_committed():
+    refs = SourceRefs()
+    refs.plan(add=[("group:a", ["x.com"])])
+
+    assert "x.com" not in refs
+    assert refs.members("group:a") == set()
+
+
+def test_blocked_site_without_sources_counts_as_manual():
+    refs = SourceRefs()
+
+    assert commit(refs, add=[("group:a", ["x.com", "y.com"])], blocked={"x.com"})
+
+    assert refs.sources("x.com") == ["group:a", MANUAL]
+    assert refs.sources("y.com") == ["group:a"]
+    assert refs.to_state() == (["x.com"], {})
+
+
+def test_ids_of_released_sources_are_reused():
+    refs = SourceRefs()
+    commit(refs, add=[("group:a", ["x.com"]), ("group:b", ["y.com"])])
+    commit(refs, remove=[("group:a", ["x.com"])])
+    commit(refs, add=[("group:c", ["z.com"])])
+
+    assert refs._ids == {"group:b": 1, "group:c": 0}
+    assert refs.sources("y.com") == ["group:b"]
+    assert refs.sources("z.com") == ["group:c"]
+
+
+def test_import_references_are_saved():
+    refs = SourceRefs()
+
+    assert commit(refs, add=[("import:list.txt", ["x.com"]), ("group:a", ["y.com"])])
+    assert not commit(refs, add=[("group:a", ["x.com"])])
+
+    assert refs.to_state() == ([], {"import:list.txt": ["x.com"]})
+    assert commit(refs, remove=[("import:list.txt", ["x.com"])])
+    assert refs.to_state() == ([], {})
@@ -0,0 +1,142 @@
+import asyncio
+import socket
+import struct
+import threading
+
+import pytest
+
+import app.commands as commands
+from app.block import BlockingManager
+from app.commands import PruneCommand
+from app.prune import ALIVE
+from app.prune import DEAD
+from app.prune import DnsCache
+from app.prune import UNKNOWN
+from app.prune import check_domains
+from tests.utils import spy_writes
+
+
+ALIVE_NAMES = {"ads.com", "www.tracker.net"}
+SILENT_NAMES = {"slow.test"}
+
+
+def question_name(data):
+    labels, offset = [], 12
+    while data[offset]:
+        length = data[offset]
+        labels.append(data[offset + 1:offset + 1 + length].decode())
+        offset += length + 1
+    return ".".join(labels), offset + 5
+
+
+class StandInDnsServer:
+    """Answers A queries: known names resolve, the rest are NXDOMAIN."""
+
+    def __init__(self):
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.socket.bind(("127.0.0.1", 0))
+        self.address = "127.0.0.1:%d" % self.socket.getsockname()[1]
+        self.queries = []
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                data, client = self.socket.recvfrom(512)
+            except OSError:
+                return
+            name, end = question_name(data)
+            self.queries.append(name)
+            if name in SILENT_NAMES:
+                continue
+            question = data[12:end]
+            query_id = data[:2]
+            if name in ALIVE_NAMES:
+                header = query_id + struct.pack("!HHHHH", 0x8180, 1, 1, 0, 0)
+                answer = b"\xc0\x0c" + struct.pack("!HHIH", 1, 1, 300, 4)
+                answer += bytes((93, 184, 216, 34))
+            else:
+                header = query_id + struct.pack("!HHHHH", 0x8183, 1, 0, 1, 0)
+                soa = b"\x02ns\x00\x05admin\x00" + struct.pack("!IIIII", 1, 2, 3, 4, 900)
+                answer = b"\x00" + struct.pack("!HHIH", 6, 1, 1800, len(soa)) + soa
+            self.socket.sendto(header + question + answer, client)
+
+    def close(self):
+        self.socket.close()
+
+
+@pytest.fixture
+def dns_server():
+    server = StandInDnsServer()
+    yield server
+    server.close()
+
+
+def test_statuses_and_cache(dns_server, tmp_path):
+    cache = DnsCache(str(tmp_path / "dns-cache.json"))
+    domains = ["ads.com", "gone.example", "www.tracker.net", "slow.test", "bad..name"]
+
+    statuses = asyncio.run(
+        check_domains(domains, dns_server.address, concurrency=3, cache=cache, timeout=0.2)
+    )
+
+    assert statuses == {
+        "ads.com": ALIVE,
+        "gone.example": DEAD,
+        "www.tracker.net": ALIVE,
+        "slow.test": UNKNOWN,
+        "bad..name": UNKNOWN,
+    }
+    assert cache.entries["gone.example"][0] == DEAD
+    assert "slow.test" not in cache.entries
+    cache.save()
+
+    dns_server.queries.clear()
+    reloaded = DnsCache(cache.path)
+    statuses = asyncio.run(
+        check_domains(["ads.com", "gone.example"], dns_server.address, cache=reloaded)
+    )
+    assert statuses == {"ads.com": ALIVE, "gone.example": DEAD}
+    assert dns_server.queries == []
+
+
+def test_many_domains_with_bounded_concurrency(dns_server):
+    domains = [f"host{number}.example" for number in range(2000)] + ["ads.com"]
+
+    statuses = asyncio.run(check_domains(domains, dns_server.address, concurrency=50))
+
+    assert len(statuses) == 2001
+    assert statuses["ads.com"] == ALIVE
+    assert sum(status == DEAD for status in statuses.values()) == 2000
+
+
+def test_prune_command_removes_dead_sites_in_one_write(dns_server, tmp_path, capsys):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text(
+        "".join(f"0.0.0.0 {site}\n" for site in ["ads.com", "gone.com", "old.net"])
+    )
+    blocking_manager = BlockingManager(str(hosts_path))
+    writes = spy_writes(blocking_manager)
+
+    PruneCommand(blocking_manager, dns_server.address, 10).execute()
+
+    assert list(blocking_manager.iter_blocked()) == ["ads.com"]
+    assert len(writes) == 1
+    output = capsys.readouterr().out
+    assert "1 resolve, 2 do not exist, 0 could not be checked." in output
+    assert "Unblocked 2 dead sites." in output
+
+
+def test_prune_command_requires_a_resolver_if_none_is_found(
+    tmp_path, capsys, monkeypatch
+):
+    hosts_path = tmp_path / "hosts"
+    hosts_path.write_text("0.0.0.0 ads.com\n")
+    blocking_manager = BlockingManager(str(hosts_path))
+    monkeypatch.setattr(commands, "system_resolver", lambda: None)
+
+    PruneCommand(blocking_manager, None, 10).execute()
+
+    assert "pass one with --resolver" in capsys.readouterr().out
+    assert list(blocking_manager.iter_blocked()) == ["ads.com"]
@@ -0,0 +1,18 @@
+import pytest
+
+from app.redirect import resolve_redirect
+
+
+def test_named_strategies():
+    assert resolve_redirect("null") == ("0.0.0.0",)
+    assert resolve_redirect("loopback-dual") == ("127.0.0.1", "::1")
+
+
+def test_custom_addresses_are_normalized():
+    assert resolve_redirect("10.0.0.1, 0:0:0:0:0:0:0:1") == ("10.0.0.1", "::1")
+
+
+@pytest.mark.parametrize("redirect", ["nowhere", "10.0.0.300", "1.1.1.1,2.2.2.2"])
+def test_invalid_strategies(redirect):
+    with pytest.raises(ValueError):
+        resolve_redirect(redirect)
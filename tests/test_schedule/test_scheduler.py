@@ -0,0 +1,87 @@
+import datetime
+
+import pytest
+
+from app.schedule import Scheduler
+from app.schedule import make_rule
+from app.schedule import merge_intervals
+from app.schedule import parse_days
+from app.schedule import rule_intervals
+
+# 2024-01-01 is a Monday.
+MONDAY = datetime.datetime(2024, 1, 1)
+
+
+@pytest.mark.parametrize(
+    "days, expected",
+    [
+        ("mon-fri", [0, 1, 2, 3, 4]),
+        ("sat,sun", [5, 6]),
+        ("fri-mon", [0, 4, 5, 6]),
+        ("daily", [0, 1, 2, 3, 4, 5, 6]),
+        ("Wednesday", [2]),
+    ],
+)
+def test_parse_days(days, expected):
+    assert parse_days(days) == expected
+
+
+@pytest.mark.parametrize("days", ["funday", "mon-xyz"])
+def test_parse_invalid_days(days):
+    with pytest.raises(ValueError):
+        parse_days(days)
+
+
+def test_make_rule_rejects_empty_window():
+    with pytest.raises(ValueError):
+        make_rule("example.com", "mon", "09:00", "09:00")
+
+
+def test_overnight_window_wraps_past_week_end():
+    rule = make_rule("example.com", "sun", "22:00", "06:00")
+    assert rule_intervals(rule) == [(6 * 1440 + 1320, 7 * 1440), (0, 360)]
+
+
+def test_merge_intervals():
+    assert merge_intervals([(10, 20), (0, 5), (15, 30), (30, 40)]) == [0, 5, 10, 40]
+
+
+def test_transitions_across_overlapping_rules():
+    scheduler = Scheduler(
+        [
+            make_rule("video.com", "mon-fri", "09:00", "12:00"),
+            make_rule("video.com", "mon", "11:00", "17:00"),
+        ]
+    )
+    state = scheduler.reset(MONDAY.replace(hour=8))
+    assert state == {"video.com": False}
+    assert scheduler.peek() == MONDAY.replace(hour=9)
+
+    assert scheduler.pop_due(MONDAY.replace(hour=9)) == {"video.com": True}
+    assert scheduler.peek() == MONDAY.replace(hour=17)
+    assert scheduler.pop_due(MONDAY.replace(hour=16)) == {}
+    assert scheduler.pop_due(MONDAY.replace(hour=17)) == {"video.com": False}
+    assert scheduler.peek() == MONDAY.replace(day=2, hour=9)
+
+
+def test_next_transition_wraps_to_next_week():
+    scheduler = Scheduler([make_rule("video.com", "mon", "09:00", "10:00")])
+    moment = MONDAY.replace(day=3, hour=12)
+    assert scheduler.next_transition("video.com", moment) == MONDAY.replace(
+        day=8, hour=9
+    )
+
+
+def test_many_rules_share_one_heap():
+    rules = [
+        make_rule(f"site{i}.com", "mon-fri", f"{i % 24:02d}:00", f"{i % 24:02d}:30")
+        for i in range(2000)
+    ]
+    scheduler = Scheduler(rules)
+    state = scheduler.reset(MONDAY)
+    assert sum(state.values()) == 2000 // 24 + 1
+    assert scheduler.peek() == MONDAY.replace(minute=30)
+    due = scheduler.pop_due(MONDAY.replace(minute=30))
+    assert len(due) == 2000 // 24 + 1
+    assert not any(due.values())
+    assert scheduler.peek() == MONDAY.replace(hour=1)
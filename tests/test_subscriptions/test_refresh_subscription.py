@@ -0,0 +1,137 @@
+import threading
+from http.server import BaseHTTPRequestHandler
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from app.block import BlockingManager
+from app.commands import RefreshSubscriptionsCommand
+from app.subscriptions import parse_blocklist
+from app.subscriptions import refresh_subscription
+from tests.utils import spy_writes
+
+
+class BlocklistHandler(BaseHTTPRequestHandler):
+    """Serves `server.body` with `server.etag`, honouring If-None-Match."""
+
+    def do_GET(self):
+        self.server.requests += 1
+        if self.headers.get("If-None-Match") == self.server.etag:
+            self.send_response(304)
+            self.end_headers()
+            return
+        body = self.server.body.encode()
+        self.send_response(200)
+        self.send_header("ETag", self.server.etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def blocklist_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), BlocklistHandler)
+    server.requests = 0
+    server.etag = '"v1"'
+    server.body = "# upstream list\n0.0.0.0 ads.com\n0.0.0.0 tracker.com\n"
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_parse_blocklist_formats():
+    lines = [
+        "! adblock style comment",
+        "0.0.0.0 0.0.0.0",
+        "0.0.0.0 a.com b.com  # two names",
+        "https://C.com/path",
+        "localhost",
+        "",
+    ]
+    assert list(parse_blocklist(lines)) == ["a.com", "b.com", "c.com"]
+
+
+def test_parse_blocklist_only_skips_addresses_and_local_names():
+    lines = [
+        "a.com b.com",
+        "c.com, d.com",
+        "0.0.0.0",
+        "::1 localhost ip6-localhost",
+        "192.168.1.10",
+        "e.com bad_name! [::1]",
+    ]
+    rejected = []
+
+    sites = list(parse_blocklist(lines, rejected))
+
+    assert sites == ["a.com", "b.com", "c.com", "d.com", "e.com"]
+    assert rejected == ["bad_name!"]
+
+
+def test_refresh_applies_delta(blocking_manager, blocklist_server):
+    url = f"http://127.0.0.1:{blocklist_server.server_port}/list.txt"
+    blocking_manager.add_subscription("ads", url)
+    added, removed = refresh_subscription(blocking_manager, "ads")
+    assert added == {"ads.com", "tracker.com"}
+    assert removed == set()
+    assert "ads.com" in blocking_manager.blocked
+
+    blocklist_server.etag = '"v2"'
+    blocklist_server.body = "0.0.0.0 ads.com\n0.0.0.0 metrics.com\n"
+    calls = spy_writes(blocking_manager)
+    added, removed = refresh_subscription(blocking_manager, "ads")
+    assert added == {"metrics.com"}
+    assert removed == {"tracker.com"}
+    assert len(calls) == 1
+    assert "tracker.com" not in blocking_manager.blocked
+
+
+def test_unchanged_source_is_skipped(blocking_manager, blocklist_server):
+    url = f"http://127.0.0.1:{blocklist_server.server_port}/list.txt"
+    blocking_manager.add_subscription("ads", url)
+    refresh_subscription(blocking_manager, "ads")
+    assert refresh_subscription(blocking_manager, "ads") is False
+    assert blocklist_server.requests == 2
+
+    reloaded = BlockingManager(blocking_manager.hosts_path)
+    assert refresh_subscription(reloaded, "ads") is False
+
+
+def test_local_file_subscription(blocking_manager, tmp_path):
+    source = tmp_path / "list.txt"
+    source.write_text("ads.com\ntracker.com\n")
+    blocking_manager.add_subscription("local", str(source))
+    assert refresh_subscription(blocking_manager, "local") is not None
+    assert refresh_subscription(blocking_manager, "local") is False
+
+    blocking_manager.remove_subscription("local")
+    assert "ads.com" not in blocking_manager.blocked
+    assert "local" not in blocking_manager.subscriptions
+
+
+def test_only_newly_blocked_sites_count_as_added(blocking_manager, tmp_path):
+    source = tmp_path / "list.txt"
+    source.write_text("ads.com\nexample1.com\n")
+    blocking_manager.add_subscription("local", str(source))
+
+    assert refresh_subscription(blocking_manager, "local") == ({"ads.com"}, set())
+
+
+def test_failed_write_is_not_reported_as_up_to_date(
+    blocking_manager, tmp_path, capsys
+):
+    source = tmp_path / "list.txt"
+    source.write_text("ads.com\n")
+    blocking_manager.add_subscription("local", str(source))
+    blocking_manager._update_hosts = lambda **changes: None
+
+    assert refresh_subscription(blocking_manager, "local") is None
+    RefreshSubscriptionsCommand(blocking_manager, "local").execute()
+    output = capsys.readouterr().out
+    assert "Could not apply local." in output
+    assert "up to date" not in output
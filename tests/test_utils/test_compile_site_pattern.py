@@ -0,0 +1,23 @@
+import pytest
+from app.utils import compile_site_pattern
+
+
+@pytest.mark.parametrize(
+    "pattern, regex, site, expected",
+    [
+        ("*.cdn.*", False, "img.cdn.example.com", True),
+        ("*.cdn.*", False, "cdn.example.com", False),
+        ("*.COM", False, "example.com", True),
+        ("ads?.example.com", False, "ads1.example.com", True),
+        (r"^ads\d+\.", True, "ads12.tracker.net", True),
+        ("tracker", True, "ads.tracker.net", True),
+        ("^tracker", True, "ads.tracker.net", False),
+    ],
+)
+def test_compile_site_pattern(pattern, regex, site, expected):
+    assert compile_site_pattern(pattern, regex)(site) is expected
+
+
+def test_invalid_regex():
+    with pytest.raises(ValueError):
+        compile_site_pattern("(unclosed", regex=True)
@@ -44,3 +44,25 @@ def test_with_valid_sites(site, valid):
 )
 def test_with_invalid_sites(site, valid):
     assert is_valid_site(site) is valid
+
+
+@pytest.mark.parametrize(
+    "site, valid",
+    [
+        ("ex.a", False),
+        ("ex.ab", True),
+        ("a.com", True),
+        ("123.456", True),
+        ("1.2.3.4", True),
+        ("256.1.1.10", True),
+        ("256.1.1.1", False),
+        (f"{'a' * 63}.com", True),
+        (f"{'a' * 64}.com", False),
+        (f"example.{'a' * 63}", True),
+        (f"example.{'a' * 64}", False),
+        ("a-b.c-d", True),
+        ("example.com-", False),
+    ],
+)
+def test_on_label_boundaries(site, valid):
+    assert is_valid_site(site) is valid
@@ -0,0 +1,110 @@
+import pytest
+from app.utils import BLOCK_MARKER
+from app.utils import HostsEntry
+from app.utils import parse_blocked_sites
+from app.utils import parse_hosts
+
+
+# The cases of test_extract_blocked_site.py, checked against the full parser
+@pytest.mark.parametrize(
+    "hosts_line, expected_site",
+    [
+        ("127.0.0.1 www.facebook.com  # blocked this page", "www.facebook.com"),
+        ("127.0.0.1 facebook.com", "facebook.com"),
+        ("127.0.0.1 youtube.com", "youtube.com"),
+        ("127.0.0.1 www.youtube.com # some comment", "www.youtube.com"),
+        ("127.0.0.1 www.youtube.com/channel_name", "www.youtube.com/channel_name"),
+        ("127.0.0.1 www.facebook.com/page_name", "www.facebook.com/page_name"),
+        ("127.0.0.1 sub.domain.example.co.uk", "sub.domain.example.co.uk"),
+        ("127.0.0.1 123.456.789.012", "123.456.789.012"),
+        ("127.0.0.2 www.example.com", "www.example.com"),
+        ("127.0.0.1   another.site.com  # comment", "another.site.com"),
+    ],
+)
+def test_parse_matches_extract_cases(hosts_line, expected_site):
+    (entry,) = parse_hosts(hosts_line)
+    assert entry.names == (expected_site,)
+    blocked = [expected_site] if entry.is_block() else []
+    assert list(parse_blocked_sites(hosts_line)) == blocked
+
+
+@pytest.mark.parametrize(
+    "hosts_line", ["127.0.1.1 devbox.lan devbox", "127.0.0.2 www.example.com"]
+)
+def test_other_loopback_addresses_are_mappings(hosts_line):
+    (entry,) = parse_hosts(hosts_line)
+    assert not entry.is_block()
+    assert parse_blocked_sites(hosts_line) == {}
+
+
+@pytest.mark.parametrize(
+    "hosts_line",
+    ["# 127.0.0.1 another.com", "127.0.0.1", " ", "127.0.0.1  # comment"],
+)
+def test_parse_lines_without_names(hosts_line):
+    (entry,) = parse_hosts(hosts_line)
+    assert entry.names == ()
+    assert parse_blocked_sites(hosts_line) == {}
+
+
+def test_parse_every_line_with_spans():
+    content = "# header\n\n0.0.0.0 a.com b.com c.com  # group\r\n::1 localhost\n::  d.com"
+    entries = list(parse_hosts(content))
+    assert entries == [
+        HostsEntry(None, (), "header", (0, 9)),
+        HostsEntry(None, (), None, (9, 10)),
+        HostsEntry("0.0.0.0", ("a.com", "b.com", "c.com"), "group", (10, 46)),
+        HostsEntry("::1", ("localhost",), None, (46, 60)),
+        HostsEntry("::", ("d.com",), None, (60, 69)),
+    ]
+    assert "".join(content[slice(*entry.span)] for entry in entries) == content
+
+
+def test_parse_empty_content():
+    assert list(parse_hosts("")) == []
+
+
+def test_blocked_sites_skip_mappings_and_local_names():
+    content = (
+        "127.0.0.1 localhost\n"
+        "::1 localhost ip6-localhost ip6-loopback\n"
+        "ff02::1 ip6-allnodes\n"
+        "192.168.1.10 nas.lan\n"
+        "0.0.0.0 0.0.0.0\n"
+        "0.0.0.0 a.com b.com\n"
+        ":: a.com\n"
+        "10.0.0.1 landing.com  # blocked by blanc-all\n"
+    )
+    assert list(parse_blocked_sites(content)) == ["a.com", "b.com", "landing.com"]
+
+
+def test_blocked_sites_agree_with_structured_entries():
+    content = open("tests/data/fake_hosts").read() + (
+        "0.0.0.0 a.com b.com#c\n:: c.com\n10.0.0.1 d.com\n# 0.0.0.0 e.com\n"
+        "10.0.0.2 f.com g.com # blocked by blanc-all\n127.0.0.1 localhost\n"
+        "::1 localhost ip6-localhost ip6-loopback\n0.0.0.0 0.0.0.0\n"
+        "127.0.0.1 localhost h.com\n127.0.1.1 devbox\n"
+        "10.0.0.3 local  # blocked by blanc-all\n"
+    )
+    expected = [
+        name for entry in parse_hosts(content) for name in entry.blocked_names()
+    ]
+    marked = set()
+    assert list(parse_blocked_sites(content, marked)) == expected
+    assert marked == {
+        name
+        for entry in parse_hosts(content)
+        if entry.comment and BLOCK_MARKER in entry.comment
+        for name in entry.blocked_names()
+    }
+
+
+@pytest.mark.parametrize(
+    "hosts_line",
+    ["127.0.0.1 localhost", "::1 localhost ip6-localhost", "0.0.0.0 0.0.0.0"],
+)
+def test_local_names_are_not_blocks(hosts_line):
+    (entry,) = parse_hosts(hosts_line)
+    assert not entry.is_block()
+    assert entry.blocked_names() == ()
+    assert parse_blocked_sites(hosts_line) == {}
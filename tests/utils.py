@@ -1,6 +1,11 @@
 import json
 
 
+FAKE_HOSTS_PATH = "tests/data/fake_hosts"
+# Sites blocked by the fake hosts file
+NR_OF_BLOCKED_SITES = 12
+
+
 def read_mock_hosts(mock_file):
     """Helper function to read the content written to the mock hosts file."""
     calls = mock_file.mock_calls
@@ -19,3 +24,22 @@ def read_mock_state(blocking_manager):
         return {}
     except json.JSONDecodeError:
         return {}
+
+
+def spy_writes(blocking_manager):
+    """
+    Helper function to record the hosts file writes of a BlockingManager.
+
+    Returns:
+        list: The keyword arguments of each _update_hosts call, appended as
+        they happen.
+    """
+    calls = []
+    update_hosts = blocking_manager._update_hosts
+
+    def spy(*args, **kwargs):
+        calls.append(kwargs)
+        return update_hosts(*args, **kwargs)
+
+    blocking_manager._update_hosts = spy
+    return calls